@@ -0,0 +1,362 @@
+# =============================================================================
+# ĐO HIỆU NĂNG CỬA HÀNG SÁCH
+# =============================================================================
+# Mô tả: Sinh danh mục sách và đơn hàng giả lập rồi đo:
+#   - Thông lượng xử lý đơn của process_orders khi tăng số luồng (mô phỏng
+#     nhiều quầy POS)
+#   - Vi đo (micro-benchmark) từng hàm nóng: calculate_bill, check_stock,
+#     tinh_tong_tien_hoa_don, cap_nhat_so_luong_sach và các báo cáo bán chạy,
+#     với danh mục từ 1 nghìn tới 1 triệu đầu sách. Mỗi hàm được chạy khởi
+#     động trước rồi đo từng lần gọi để tính số thao tác/giây, p50 và p99.
+#     Kết quả ghi ra JSON để so sánh giữa các lần chạy.
+#
+# Cách chạy:
+#   python benchmark.py --so-sach 10000 --so-don 20000 --luong 1 2 4 8
+#   python benchmark.py --do-tre-ms 2   # giả lập độ trễ cổng thanh toán
+#   python benchmark.py --vi-mo --kich-thuoc 1000 100000 1000000 --json ket_qua.json
+#
+# Lưu ý: với CPython có GIL, phần tính toán thuần không tăng tốc khi thêm
+# luồng; thông lượng chỉ tăng khi mỗi đơn có thời gian chờ I/O (--do-tre-ms).
+# =============================================================================
+
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+import index
+from catalog import DanhMucSach
+from columnar_store import KhoSachDangCot
+
+# Kích thước danh mục mặc định của bộ vi đo
+CAC_KICH_THUOC_MAC_DINH = (1000, 10000, 100000, 1000000)
+
+
+def tao_danh_muc_gia_lap(so_sach, ton_kho=1000, seed=42):
+    """
+    Sinh danh sách sách giả lập
+
+    Args:
+        so_sach (int): Số đầu sách cần sinh
+        ton_kho (int, optional): Tồn kho ban đầu của mỗi cuốn. Mặc định là 1000.
+        seed (int, optional): Hạt giống ngẫu nhiên để kết quả lặp lại được
+
+    Returns:
+        list: Danh sách các dict sách giống danh_sach_sach
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "ten_sach": f"Sách {i:07d}",
+            "gia": float(rng.randrange(20, 300) * 1000),
+            "so_luong_ton_kho": ton_kho,
+            "so_luong_da_ban": rng.randrange(0, 500)
+        }
+        for i in range(so_sach)
+    ]
+
+
+def tao_don_hang_gia_lap(danh_sach, so_don, so_dong_toi_da=5, seed=7):
+    """
+    Sinh các đơn hàng giả lập từ một danh sách sách
+
+    Args:
+        danh_sach (list): Danh sách sách để chọn tên
+        so_don (int): Số đơn hàng cần sinh
+        so_dong_toi_da (int, optional): Số dòng tối đa mỗi giỏ. Mặc định là 5.
+        seed (int, optional): Hạt giống ngẫu nhiên để kết quả lặp lại được
+
+    Returns:
+        list: Các cặp (gio_hang, loai_khach_hang)
+    """
+    rng = random.Random(seed)
+    cac_ten = [sach["ten_sach"] for sach in danh_sach]
+    cac_don = []
+    for _ in range(so_don):
+        gio_hang = [
+            {"ten_sach": rng.choice(cac_ten), "so_luong": rng.randint(1, 3)}
+            for _ in range(rng.randint(1, so_dong_toi_da))
+        ]
+        cac_don.append((gio_hang, rng.choice(("VIP", "thường"))))
+    return cac_don
+
+
+def tao_kho_gia_lap(danh_sach, dang_cot=None):
+    """
+    Dựng danh mục từ bản sao của danh sách giả lập
+
+    Args:
+        danh_sach (list): Danh sách sách giả lập
+        dang_cot (bool, optional): True để dùng KhoSachDangCot. Mặc định theo
+                                   index.DUNG_KHO_DANG_COT.
+
+    Returns:
+        DanhMucSach hoặc KhoSachDangCot
+    """
+    if dang_cot is None:
+        dang_cot = index.DUNG_KHO_DANG_COT
+    if dang_cot:
+        return KhoSachDangCot(danh_sach)
+    return DanhMucSach([dict(sach) for sach in danh_sach])
+
+
+def do_process_orders(so_sach, so_don, cac_so_luong, do_tre_ms=0.0):
+    """
+    Đo thông lượng process_orders với nhiều mức số luồng
+
+    Mỗi lần đo dùng một danh mục mới để kết quả không phụ thuộc lần đo trước,
+    và kiểm tra không có sách nào bị bán vượt tồn kho.
+
+    Args:
+        so_sach (int): Số đầu sách trong danh mục giả lập
+        so_don (int): Số đơn hàng mỗi lần đo
+        cac_so_luong (list): Các mức số luồng cần đo
+        do_tre_ms (float, optional): Độ trễ giả lập (ms) cho mỗi đơn, ví dụ
+                                     thời gian chờ cổng thanh toán
+
+    Returns:
+        list: Mỗi phần tử là dict gồm workers, giay, don_moi_giay, thanh_cong,
+              tang_toc (so với mức số luồng đầu tiên)
+    """
+    danh_sach = tao_danh_muc_gia_lap(so_sach)
+    cac_don = tao_don_hang_gia_lap(danh_sach, so_don)
+
+    def xu_ly(gio_hang, loai_khach_hang):
+        if do_tre_ms:
+            time.sleep(do_tre_ms / 1000)
+        return index.checkout(gio_hang, loai_khach_hang)
+
+    ket_qua = []
+    for workers in cac_so_luong:
+        # Dựng lại kho để mỗi lần đo bắt đầu từ cùng một trạng thái
+        index.dat_kho_sach(tao_kho_gia_lap(danh_sach))
+
+        bat_dau = time.perf_counter()
+        cac_ket_qua = index.process_orders(cac_don, workers=workers, xu_ly=xu_ly)
+        giay = time.perf_counter() - bat_dau
+
+        # Kiểm tra tính đúng đắn: số đã bán tăng đúng bằng số trên các hóa đơn
+        so_cuon_hoa_don = sum(dong["so_luong"]
+                              for hoa_don, _ in cac_ket_qua if hoa_don
+                              for dong in hoa_don["cac_dong"])
+        so_cuon_da_ban = index.kho_sach.tong_da_ban() - sum(s["so_luong_da_ban"] for s in danh_sach)
+        if so_cuon_hoa_don != so_cuon_da_ban or any(s["so_luong_ton_kho"] < 0 for s in index.kho_sach):
+            raise RuntimeError("Phát hiện bán vượt tồn kho khi chạy song song!")
+
+        ket_qua.append({
+            "workers": workers,
+            "giay": giay,
+            "don_moi_giay": so_don / giay,
+            "thanh_cong": sum(1 for hoa_don, _ in cac_ket_qua if hoa_don)
+        })
+
+    for dong in ket_qua:
+        dong["tang_toc"] = dong["don_moi_giay"] / ket_qua[0]["don_moi_giay"]
+    return ket_qua
+
+
+# =============================================================================
+# VI ĐO TỪNG HÀM NÓNG
+# =============================================================================
+
+def phan_vi(cac_gia_tri_da_sap_xep, p):
+    """
+    Lấy phân vị theo hạng gần nhất
+
+    Args:
+        cac_gia_tri_da_sap_xep (list): Các giá trị đã sắp xếp tăng dần
+        p (float): Phân vị trong khoảng [0, 100]
+
+    Returns:
+        float: Giá trị tại phân vị p
+
+    Example:
+        >>> phan_vi([1, 2, 3, 4], 50)
+        2
+    """
+    if not cac_gia_tri_da_sap_xep:
+        return 0.0
+    hang = max(int(-(-p * len(cac_gia_tri_da_sap_xep) // 100)), 1)
+    return cac_gia_tri_da_sap_xep[min(hang, len(cac_gia_tri_da_sap_xep)) - 1]
+
+
+def do_ham(ham, cac_tham_so, so_lan_khoi_dong, so_lan_lap):
+    """
+    Đo độ trễ từng lần gọi của một hàm
+
+    Args:
+        ham (callable): Hàm cần đo
+        cac_tham_so (list): Các tuple tham số, dùng xoay vòng cho từng lần gọi
+        so_lan_khoi_dong (int): Số lần gọi trước khi đo (không tính kết quả)
+        so_lan_lap (int): Số lần gọi được đo
+
+    Returns:
+        dict: so_lan, ops_moi_giay, trung_binh_us, p50_us, p99_us, toi_da_us
+    """
+    so_bo = len(cac_tham_so)
+    for i in range(so_lan_khoi_dong):
+        ham(*cac_tham_so[i % so_bo])
+
+    dong_ho = time.perf_counter_ns
+    cac_do_tre = [0] * so_lan_lap
+    for i in range(so_lan_lap):
+        tham_so = cac_tham_so[(so_lan_khoi_dong + i) % so_bo]
+        bat_dau = dong_ho()
+        ham(*tham_so)
+        cac_do_tre[i] = dong_ho() - bat_dau
+
+    cac_do_tre.sort()
+    tong_ns = sum(cac_do_tre)
+    return {
+        "so_lan": so_lan_lap,
+        "ops_moi_giay": so_lan_lap * 1e9 / tong_ns if tong_ns else 0.0,
+        "trung_binh_us": tong_ns / so_lan_lap / 1000 if so_lan_lap else 0.0,
+        "p50_us": phan_vi(cac_do_tre, 50) / 1000,
+        "p99_us": phan_vi(cac_do_tre, 99) / 1000,
+        "toi_da_us": cac_do_tre[-1] / 1000 if cac_do_tre else 0.0
+    }
+
+
+def _im_lang(ham):
+    """Bọc hàm in ra màn hình để phần in không làm sai kết quả đo"""
+    def ham_im_lang(*tham_so):
+        with redirect_stdout(io.StringIO()):
+            return ham(*tham_so)
+    return ham_im_lang
+
+
+def do_vi_mo(cac_kich_thuoc=CAC_KICH_THUOC_MAC_DINH, so_lan_khoi_dong=200,
+             so_lan_lap=2000, dang_cot=None, seed=42):
+    """
+    Vi đo các hàm nóng của cửa hàng với nhiều kích thước danh mục
+
+    Với mỗi kích thước, danh mục giả lập được dựng mới một lần và dùng chung cho
+    mọi hàm. Hàm trừ kho (cap_nhat_so_luong_sach) đo sau cùng để không làm thay
+    đổi dữ liệu của các hàm chỉ đọc. Báo cáo duyệt cả danh mục
+    (thong_ke_sach_ban_chay) chỉ được đo số lần bằng 1% so_lan_lap.
+
+    Args:
+        cac_kich_thuoc (iterable): Các số đầu sách cần đo
+        so_lan_khoi_dong (int, optional): Số lần gọi khởi động mỗi hàm
+        so_lan_lap (int, optional): Số lần gọi được đo mỗi hàm
+        dang_cot (bool, optional): True để đo KhoSachDangCot. Mặc định theo
+                                   index.DUNG_KHO_DANG_COT.
+        seed (int, optional): Hạt giống ngẫu nhiên để kết quả lặp lại được
+
+    Returns:
+        dict: moi_truong, tham_so và ket_qua (danh sách dict, mỗi dict là một
+              cặp kích thước - hàm kèm số liệu của do_ham)
+    """
+    if dang_cot is None:
+        dang_cot = index.DUNG_KHO_DANG_COT
+    kho_ban_dau = index.kho_sach
+    so_bo_tham_so = max(so_lan_khoi_dong + so_lan_lap, 1)
+
+    ket_qua = []
+    try:
+        for so_sach in cac_kich_thuoc:
+            danh_sach = tao_danh_muc_gia_lap(so_sach, seed=seed)
+            index.dat_kho_sach(tao_kho_gia_lap(danh_sach, dang_cot))
+
+            rng = random.Random(seed + so_sach)
+            cac_ten = [sach["ten_sach"] for sach in danh_sach]
+            cac_gio = [gio for gio, _ in tao_don_hang_gia_lap(danh_sach, so_bo_tham_so, seed=seed + 1)]
+            cac_loai = [rng.choice(("VIP", "thường")) for _ in range(so_bo_tham_so)]
+            cac_dong = [(rng.choice(cac_ten), rng.randint(1, 3), loai) for loai in cac_loai]
+
+            # (tên hàm, hàm, tham số từng lần gọi, hệ số số lần lặp)
+            cac_ham = [
+                ("calculate_bill", index.calculate_bill, cac_dong, 1),
+                ("check_stock", index.check_stock, [dong[:2] for dong in cac_dong], 1),
+                ("tinh_tong_tien_hoa_don", index.tinh_tong_tien_hoa_don,
+                 list(zip(cac_gio, cac_loai)), 1),
+                ("in_danh_sach_sach_ban_chay", _im_lang(index.in_danh_sach_sach_ban_chay), [(3,)], 1),
+                ("tim_sach_ban_chay_nhat", _im_lang(index.tim_sach_ban_chay_nhat), [()], 1),
+                ("thong_ke_sach_ban_chay", _im_lang(index.thong_ke_sach_ban_chay), [()], 0.01),
+                ("cap_nhat_so_luong_sach", index.cap_nhat_so_luong_sach, [(gio,) for gio in cac_gio], 1),
+            ]
+            for ten_ham, ham, cac_tham_so, he_so in cac_ham:
+                so_lan = max(int(so_lan_lap * he_so), 1)
+                khoi_dong = max(int(so_lan_khoi_dong * he_so), 1) if so_lan_khoi_dong else 0
+                so_lieu = do_ham(ham, cac_tham_so, khoi_dong, so_lan)
+                ket_qua.append({"so_sach": so_sach, "ham": ten_ham, **so_lieu})
+    finally:
+        index.dat_kho_sach(kho_ban_dau)
+
+    return {
+        "moi_truong": {
+            "python": platform.python_version(),
+            "trinh_thong_dich": platform.python_implementation(),
+            "he_dieu_hanh": platform.platform(),
+            "dang_cot": bool(dang_cot),
+            "thoi_diem": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        },
+        "tham_so": {
+            "cac_kich_thuoc": list(cac_kich_thuoc),
+            "so_lan_khoi_dong": so_lan_khoi_dong,
+            "so_lan_lap": so_lan_lap,
+            "seed": seed
+        },
+        "ket_qua": ket_qua
+    }
+
+
+def in_ket_qua_vi_mo(bao_cao):
+    """
+    In bảng kết quả vi đo ra màn hình
+
+    Args:
+        bao_cao (dict): Kết quả của do_vi_mo
+    """
+    print(f"=== VI ĐO CÁC HÀM NÓNG (dạng cột: {bao_cao['moi_truong']['dang_cot']}) ===")
+    print(f"{'Số sách':<10} {'Hàm':<28} {'Lần đo':<8} {'Thao tác/giây':<15} {'p50 (µs)':<10} {'p99 (µs)':<10}")
+    print("-" * 86)
+    for dong in bao_cao["ket_qua"]:
+        print(f"{dong['so_sach']:<10,} {dong['ham']:<28} {dong['so_lan']:<8} {dong['ops_moi_giay']:<15,.0f} "
+              f"{dong['p50_us']:<10.2f} {dong['p99_us']:<10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo hiệu năng cửa hàng sách")
+    parser.add_argument("--so-sach", type=int, default=10000, help="Số đầu sách giả lập")
+    parser.add_argument("--so-don", type=int, default=20000, help="Số đơn hàng mỗi lần đo")
+    parser.add_argument("--luong", type=int, nargs="+", default=[1, 2, 4, 8], help="Các mức số luồng")
+    parser.add_argument("--do-tre-ms", type=float, default=0.0, help="Độ trễ giả lập mỗi đơn (ms)")
+    parser.add_argument("--vi-mo", action="store_true", help="Vi đo từng hàm nóng thay vì đo process_orders")
+    parser.add_argument("--kich-thuoc", type=int, nargs="+", default=list(CAC_KICH_THUOC_MAC_DINH),
+                        help="Các kích thước danh mục cho vi đo")
+    parser.add_argument("--khoi-dong", type=int, default=200, help="Số lần gọi khởi động mỗi hàm")
+    parser.add_argument("--lap", type=int, default=2000, help="Số lần gọi được đo mỗi hàm")
+    parser.add_argument("--dang-cot", action="store_true", help="Vi đo với KhoSachDangCot")
+    parser.add_argument("--json", help="Ghi kết quả vi đo ra file JSON ('-' để ghi ra màn hình)")
+    args = parser.parse_args()
+
+    if args.vi_mo:
+        bao_cao = do_vi_mo(args.kich_thuoc, args.khoi_dong, args.lap,
+                           dang_cot=args.dang_cot or None)
+        if args.json == "-":
+            json.dump(bao_cao, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+            return
+        in_ket_qua_vi_mo(bao_cao)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(bao_cao, f, ensure_ascii=False, indent=2)
+            print(f"\nĐã ghi kết quả vào {args.json}")
+        return
+
+    print(f"=== ĐO THÔNG LƯỢNG process_orders ({args.so_sach} sách, {args.so_don} đơn, "
+          f"độ trễ {args.do_tre_ms} ms) ===")
+    print(f"{'Số luồng':<10} {'Thời gian (s)':<15} {'Đơn/giây':<15} {'Thành công':<12} {'Tăng tốc':<10}")
+    print("-" * 65)
+    for dong in do_process_orders(args.so_sach, args.so_don, args.luong, args.do_tre_ms):
+        print(f"{dong['workers']:<10} {dong['giay']:<15.3f} {dong['don_moi_giay']:<15,.0f} "
+              f"{dong['thanh_cong']:<12} {dong['tang_toc']:<10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# =============================================================================
+# BẢNG XẾP HẠNG SÁCH BÁN CHẠY
+# =============================================================================
+# Mô tả: Duy trì thứ hạng sách theo số lượng đã bán bằng một max-heap:
+#   - Mỗi lần bán/cập nhật chỉ đẩy thêm một phần tử vào heap: O(log n)
+#   - Phần tử cũ không xóa ngay mà bị bỏ qua khi lấy ra (xóa lười)
+#   - Lấy top K: O(K log n) thay vì sắp xếp cả danh mục O(n log n)
+# Khi số phần tử cũ trong heap quá nhiều, heap được dựng lại để tiết kiệm bộ nhớ.
+# Heap được bảo vệ bởi một khóa riêng vì nhiều luồng thanh toán cùng cập nhật.
+# =============================================================================
+
+import heapq
+import threading
+
+
+class BangXepHangBanChay:
+    """
+    Bảng xếp hạng sách theo số lượng đã bán (giảm dần)
+
+    Sách bán bằng nhau được xếp theo thứ tự thêm vào bảng, giống sorted() ổn định.
+    """
+
+    def __init__(self):
+        # heap gồm các bộ (-so_luong_da_ban, thu_tu, ten_sach)
+        self._heap = []
+        # ten_sach -> (so_luong_da_ban, thu_tu) hiện tại
+        self._hien_tai = {}
+        self._thu_tu_tiep = 0
+        self._khoa = threading.Lock()
+
+    @classmethod
+    def tu_du_lieu(cls, cac_cap):
+        """
+        Dựng bảng xếp hạng từ nhiều sách cùng lúc trong O(n)
+
+        Args:
+            cac_cap (iterable): Các cặp (ten_sach, so_luong_da_ban)
+
+        Returns:
+            BangXepHangBanChay: Bảng xếp hạng mới
+        """
+        bang = cls()
+        cac_cap = list(cac_cap)
+        bang._hien_tai = {ten_sach: (da_ban, thu_tu)
+                          for thu_tu, (ten_sach, da_ban) in enumerate(cac_cap)}
+        bang._heap = [(-da_ban, thu_tu, ten_sach)
+                      for thu_tu, (ten_sach, da_ban) in enumerate(cac_cap)]
+        bang._thu_tu_tiep = len(cac_cap)
+        heapq.heapify(bang._heap)
+        return bang
+
+    def __len__(self):
+        return len(self._hien_tai)
+
+    # -------------------------------------------------------------------------
+    # Cập nhật
+    # -------------------------------------------------------------------------
+
+    def them(self, ten_sach, so_luong_da_ban):
+        """
+        Thêm một cuốn sách vào bảng xếp hạng
+
+        Args:
+            ten_sach (str): Tên sách
+            so_luong_da_ban (int): Số lượng đã bán hiện tại
+        """
+        with self._khoa:
+            thu_tu = self._thu_tu_tiep
+            self._thu_tu_tiep += 1
+            self._day_vao(ten_sach, so_luong_da_ban, thu_tu)
+
+    def cap_nhat(self, ten_sach, so_luong_da_ban):
+        """
+        Cập nhật số lượng đã bán của một cuốn sách trong O(log n)
+
+        Args:
+            ten_sach (str): Tên sách đã có trong bảng
+            so_luong_da_ban (int): Số lượng đã bán mới
+
+        Raises:
+            KeyError: Nếu sách chưa có trong bảng
+        """
+        with self._khoa:
+            da_ban_cu, thu_tu = self._hien_tai[ten_sach]
+            if da_ban_cu != so_luong_da_ban:
+                self._day_vao(ten_sach, so_luong_da_ban, thu_tu)
+
+    def doi_ten(self, ten_cu, ten_moi):
+        """
+        Đổi tên một cuốn sách, giữ nguyên thứ hạng
+
+        Args:
+            ten_cu (str): Tên sách hiện tại
+            ten_moi (str): Tên sách mới
+        """
+        with self._khoa:
+            da_ban, thu_tu = self._hien_tai.pop(ten_cu)
+            self._day_vao(ten_moi, da_ban, thu_tu)
+
+    def xoa(self, ten_sach):
+        """
+        Xóa một cuốn sách khỏi bảng xếp hạng
+
+        Args:
+            ten_sach (str): Tên sách cần xóa
+        """
+        with self._khoa:
+            self._hien_tai.pop(ten_sach, None)
+            self._don_dep_neu_can()
+
+    # -------------------------------------------------------------------------
+    # Truy vấn
+    # -------------------------------------------------------------------------
+
+    def ban_chay_nhat(self):
+        """
+        Lấy cuốn sách bán chạy nhất
+
+        Returns:
+            tuple: (ten_sach, so_luong_da_ban), hoặc None nếu bảng rỗng
+        """
+        with self._khoa:
+            heap = self._heap
+            while heap:
+                am_da_ban, thu_tu, ten_sach = heap[0]
+                if self._con_hieu_luc(am_da_ban, thu_tu, ten_sach):
+                    return ten_sach, -am_da_ban
+                # Phần tử cũ nằm trên đỉnh thì bỏ luôn
+                heapq.heappop(heap)
+            return None
+
+    def top_k(self, k):
+        """
+        Lấy K cuốn sách bán chạy nhất
+
+        Args:
+            k (int): Số lượng sách cần lấy
+
+        Returns:
+            list: Các cặp (ten_sach, so_luong_da_ban) theo thứ tự giảm dần
+
+        Example:
+            >>> bang = BangXepHangBanChay.tu_du_lieu([("A", 5), ("B", 9), ("C", 7)])
+            >>> bang.cap_nhat("A", 10)
+            >>> bang.top_k(2)
+            [('A', 10), ('B', 9)]
+        """
+        ket_qua = []
+        da_lay = []
+        da_gap = set()
+
+        with self._khoa:
+            heap = self._heap
+            while heap and len(ket_qua) < k:
+                phan_tu = heapq.heappop(heap)
+                am_da_ban, thu_tu, ten_sach = phan_tu
+                # Bỏ phần tử cũ và phần tử trùng (khi số bán quay về giá trị cũ)
+                if ten_sach in da_gap or not self._con_hieu_luc(am_da_ban, thu_tu, ten_sach):
+                    continue
+                da_gap.add(ten_sach)
+                da_lay.append(phan_tu)
+                ket_qua.append((ten_sach, -am_da_ban))
+
+            # Trả lại các phần tử còn hiệu lực vào heap
+            for phan_tu in da_lay:
+                heapq.heappush(heap, phan_tu)
+        return ket_qua
+
+    # -------------------------------------------------------------------------
+    # Hàm nội bộ
+    # -------------------------------------------------------------------------
+
+    def _day_vao(self, ten_sach, so_luong_da_ban, thu_tu):
+        self._hien_tai[ten_sach] = (so_luong_da_ban, thu_tu)
+        heapq.heappush(self._heap, (-so_luong_da_ban, thu_tu, ten_sach))
+        self._don_dep_neu_can()
+
+    def _con_hieu_luc(self, am_da_ban, thu_tu, ten_sach):
+        return self._hien_tai.get(ten_sach) == (-am_da_ban, thu_tu)
+
+    def _don_dep_neu_can(self):
+        # Dựng lại heap khi phần tử cũ chiếm hơn một nửa
+        if len(self._heap) > 2 * len(self._hien_tai) + 64:
+            self._heap = [(-da_ban, thu_tu, ten_sach)
+                          for ten_sach, (da_ban, thu_tu) in self._hien_tai.items()]
+            heapq.heapify(self._heap)
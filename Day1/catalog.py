@@ -0,0 +1,365 @@
+# =============================================================================
+# DANH MỤC SÁCH CÓ CHỈ MỤC THEO TÊN
+# =============================================================================
+# Mô tả: Lưu trữ các cuốn sách của cửa hàng kèm chỉ mục băm:
+#   - Chỉ mục chính: ten_sach -> bản ghi sách (tra cứu O(1))
+#   - Chỉ mục chuẩn hóa (tùy chọn): tên viết thường, bỏ dấu -> các bản ghi,
+#     dựng ở lần tìm gần đúng đầu tiên (chuẩn hóa từng tên khá chậm, không
+#     nên trả giá đó mỗi lần nạp danh mục lớn)
+# Các chỉ mục luôn được đồng bộ khi thêm/cập nhật/xóa sách, cùng với bảng
+# xếp hạng sách bán chạy (BangXepHangBanChay).
+# =============================================================================
+
+import unicodedata
+
+from bestseller import BangXepHangBanChay
+
+
+def chuan_hoa_ten(ten_sach):
+    """
+    Chuẩn hóa tên sách để tra cứu không phân biệt hoa/thường và dấu tiếng Việt
+
+    Args:
+        ten_sach (str): Tên sách gốc
+
+    Returns:
+        str: Tên sách đã chuẩn hóa (viết thường, bỏ dấu, gộp khoảng trắng)
+
+    Example:
+        >>> chuan_hoa_ten("  Đắc Nhân  Tâm ")
+        'dac nhan tam'
+    """
+    # Tách dấu ra khỏi chữ cái (NFD) rồi bỏ các ký tự dấu
+    ten = unicodedata.normalize("NFD", ten_sach.casefold())
+    ten = "".join(ky_tu for ky_tu in ten if not unicodedata.combining(ky_tu))
+    # Chữ "đ" không có dạng tách dấu nên phải thay thủ công
+    ten = ten.replace("đ", "d")
+    return " ".join(ten.split())
+
+
+class DanhMucSach:
+    """
+    Danh mục sách với chỉ mục theo tên, giữ nguyên thứ tự thêm vào
+
+    Mỗi bản ghi là một dictionary giống phần tử của danh_sach_sach:
+    ten_sach, gia, so_luong_ton_kho, so_luong_da_ban.
+
+    Lưu ý: mọi thay đổi (giá, tồn kho, số lượng đã bán) phải đi qua
+    ghi_nhan_ban() hoặc cap_nhat_sach() để bảng xếp hạng bán chạy và những
+    nơi đăng ký theo_doi() được cập nhật.
+    """
+
+    def __init__(self, danh_sach=None, chi_muc_chuan_hoa=True):
+        """
+        Khởi tạo danh mục từ một danh sách sách có sẵn
+
+        Args:
+            danh_sach (list, optional): Danh sách các dict sách ban đầu
+            chi_muc_chuan_hoa (bool, optional): Có cho phép tìm gần đúng bằng
+                                                chỉ mục tên chuẩn hóa hay không
+                                                (chỉ mục được dựng ở lần tìm đầu
+                                                tiên). Mặc định là True.
+
+        Raises:
+            ValueError: Nếu danh sách ban đầu có tên sách trùng nhau
+        """
+        # dict giữ thứ tự thêm vào nên vừa là chỉ mục vừa là nơi lưu trữ
+        self._chi_muc = {}
+        self._cho_phep_chuan_hoa = chi_muc_chuan_hoa
+        self._chi_muc_chuan_hoa = None
+        self._nguoi_theo_doi = []
+        self._nguoi_theo_doi_danh_muc = []
+
+        for sach in danh_sach or []:
+            if sach["ten_sach"] in self._chi_muc:
+                raise ValueError(f"Sách '{sach['ten_sach']}' đã tồn tại trong danh mục")
+            self._chi_muc[sach["ten_sach"]] = sach
+        # Dựng bảng xếp hạng một lần cho cả danh sách thay vì đẩy vào heap từng cuốn
+        self.xep_hang = BangXepHangBanChay.tu_du_lieu(
+            (sach["ten_sach"], sach["so_luong_da_ban"]) for sach in self._chi_muc.values())
+
+    def __len__(self):
+        return len(self._chi_muc)
+
+    def __iter__(self):
+        return iter(self._chi_muc.values())
+
+    def __contains__(self, ten_sach):
+        return ten_sach in self._chi_muc
+
+    def theo_doi(self, ham):
+        """
+        Đăng ký hàm được gọi mỗi khi một cuốn sách thay đổi
+        (thêm, sửa, bán, xóa), ví dụ để xóa bộ nhớ đệm
+
+        Args:
+            ham (callable): Hàm nhận một tham số là tên sách bị thay đổi
+        """
+        self._nguoi_theo_doi.append(ham)
+
+    def _bao_thay_doi(self, ten_sach):
+        for ham in self._nguoi_theo_doi:
+            ham(ten_sach)
+
+    def theo_doi_danh_muc(self, ham):
+        """
+        Đăng ký hàm được gọi sau mỗi thay đổi danh mục (không gồm bán hàng),
+        ví dụ để ghi nhật ký lưu trữ
+
+        Args:
+            ham (callable): Hàm nhận (loai, ten_sach, du_lieu) với loai là
+                            "them" (du_lieu: bản ghi sách), "cap_nhat" (du_lieu:
+                            dict các trường đã đổi), "doi_ten" (du_lieu: tên mới)
+                            hoặc "xoa" (du_lieu: None)
+        """
+        self._nguoi_theo_doi_danh_muc.append(ham)
+
+    def _bao_thay_doi_danh_muc(self, loai, ten_sach, du_lieu=None):
+        for ham in self._nguoi_theo_doi_danh_muc:
+            ham(loai, ten_sach, du_lieu)
+
+    # -------------------------------------------------------------------------
+    # Tra cứu
+    # -------------------------------------------------------------------------
+
+    def tim_sach(self, ten_sach):
+        """
+        Tìm sách theo đúng tên
+
+        Args:
+            ten_sach (str): Tên sách cần tìm
+
+        Returns:
+            dict: Bản ghi sách, hoặc None nếu không tìm thấy
+        """
+        return self._chi_muc.get(ten_sach)
+
+    def tim_sach_gan_dung(self, ten_sach):
+        """
+        Tìm sách theo tên không phân biệt hoa/thường và dấu
+
+        Args:
+            ten_sach (str): Tên sách cần tìm (có thể viết thường, không dấu)
+
+        Returns:
+            list: Các bản ghi sách có tên chuẩn hóa trùng khớp
+
+        Example:
+            >>> kho = DanhMucSach([{"ten_sach": "Nhà Giả Kim", "gia": 65000.0,
+            ...                     "so_luong_ton_kho": 5, "so_luong_da_ban": 120}])
+            >>> [s["ten_sach"] for s in kho.tim_sach_gan_dung("nha gia kim")]
+            ['Nhà Giả Kim']
+        """
+        if not self._cho_phep_chuan_hoa:
+            raise RuntimeError("Danh mục không được tạo với chỉ mục chuẩn hóa")
+        if self._chi_muc_chuan_hoa is None:
+            chi_muc = {}
+            for sach in self._chi_muc.values():
+                chi_muc.setdefault(chuan_hoa_ten(sach["ten_sach"]), []).append(sach)
+            self._chi_muc_chuan_hoa = chi_muc
+        return list(self._chi_muc_chuan_hoa.get(chuan_hoa_ten(ten_sach), ()))
+
+    # -------------------------------------------------------------------------
+    # Thêm / cập nhật / xóa
+    # -------------------------------------------------------------------------
+
+    def them_sach(self, sach):
+        """
+        Thêm một cuốn sách mới vào danh mục
+
+        Args:
+            sach (dict): Bản ghi sách cần thêm
+
+        Returns:
+            dict: Chính bản ghi vừa thêm
+
+        Raises:
+            ValueError: Nếu tên sách đã tồn tại trong danh mục
+        """
+        ten_sach = sach["ten_sach"]
+        if ten_sach in self._chi_muc:
+            raise ValueError(f"Sách '{ten_sach}' đã tồn tại trong danh mục")
+
+        self._chi_muc[ten_sach] = sach
+        self._them_chi_muc_chuan_hoa(sach)
+        self.xep_hang.them(ten_sach, sach["so_luong_da_ban"])
+        self._bao_thay_doi(ten_sach)
+        self._bao_thay_doi_danh_muc("them", ten_sach, sach)
+        return sach
+
+    def cap_nhat_sach(self, ten_sach, /, **thay_doi):
+        """
+        Cập nhật các trường của một cuốn sách (kể cả đổi tên)
+
+        Args:
+            ten_sach (str): Tên sách cần cập nhật
+            **thay_doi: Các trường cần thay đổi, ví dụ gia=90000.0
+
+        Returns:
+            dict: Bản ghi sách sau khi cập nhật
+
+        Raises:
+            KeyError: Nếu không tìm thấy sách
+            ValueError: Nếu đổi sang một tên đã tồn tại
+        """
+        sach = self._chi_muc[ten_sach]
+        ten_moi = thay_doi.get("ten_sach", ten_sach)
+
+        if ten_moi != ten_sach:
+            if ten_moi in self._chi_muc:
+                raise ValueError(f"Sách '{ten_moi}' đã tồn tại trong danh mục")
+            self._xoa_chi_muc_chuan_hoa(sach)
+            # Đổi tên thì đưa về cuối danh mục giống như thêm mới
+            del self._chi_muc[ten_sach]
+            sach.update(thay_doi)
+            self._chi_muc[ten_moi] = sach
+            self._them_chi_muc_chuan_hoa(sach)
+            self.xep_hang.doi_ten(ten_sach, ten_moi)
+            self._bao_thay_doi(ten_moi)
+        else:
+            sach.update(thay_doi)
+
+        if "so_luong_da_ban" in thay_doi:
+            self.xep_hang.cap_nhat(ten_moi, sach["so_luong_da_ban"])
+        self._bao_thay_doi(ten_sach)
+
+        if ten_moi != ten_sach:
+            self._bao_thay_doi_danh_muc("doi_ten", ten_sach, ten_moi)
+        cac_truong = {truong: gia_tri for truong, gia_tri in thay_doi.items() if truong != "ten_sach"}
+        if cac_truong:
+            self._bao_thay_doi_danh_muc("cap_nhat", ten_moi, cac_truong)
+        return sach
+
+    def ghi_nhan_ban(self, ten_sach, so_luong):
+        """
+        Ghi nhận một lần bán: giảm tồn kho, tăng số lượng đã bán
+
+        Args:
+            ten_sach (str): Tên sách đã bán
+            so_luong (int): Số lượng đã bán
+
+        Returns:
+            bool: True nếu cập nhật thành công, False nếu không tìm thấy sách
+                  hoặc không đủ tồn kho
+        """
+        sach = self._chi_muc.get(ten_sach)
+        if sach is None or sach["so_luong_ton_kho"] < so_luong:
+            return False
+        sach["so_luong_ton_kho"] -= so_luong
+        sach["so_luong_da_ban"] += so_luong
+        self.xep_hang.cap_nhat(ten_sach, sach["so_luong_da_ban"])
+        self._bao_thay_doi(ten_sach)
+        return True
+
+    def xoa_sach(self, ten_sach):
+        """
+        Xóa một cuốn sách khỏi danh mục
+
+        Args:
+            ten_sach (str): Tên sách cần xóa
+
+        Returns:
+            dict: Bản ghi sách đã xóa
+
+        Raises:
+            KeyError: Nếu không tìm thấy sách
+        """
+        sach = self._chi_muc.pop(ten_sach)
+        self._xoa_chi_muc_chuan_hoa(sach)
+        self.xep_hang.xoa(ten_sach)
+        self._bao_thay_doi(ten_sach)
+        self._bao_thay_doi_danh_muc("xoa", ten_sach)
+        return sach
+
+    # -------------------------------------------------------------------------
+    # Thống kê (cùng giao diện với KhoSachDangCot)
+    # -------------------------------------------------------------------------
+
+    def sach_ban_tren(self, nguong):
+        """
+        Lấy các cuốn sách có số lượng đã bán lớn hơn ngưỡng
+
+        Args:
+            nguong (int): Ngưỡng số lượng đã bán
+
+        Returns:
+            list: Các bản ghi sách thỏa mãn, theo thứ tự trong danh mục
+        """
+        return [sach for sach in self if sach["so_luong_da_ban"] > nguong]
+
+    def sach_het_hang(self):
+        """
+        Lấy các cuốn sách đã hết hàng (tồn kho bằng 0)
+
+        Returns:
+            list: Các bản ghi sách hết hàng, theo thứ tự trong danh mục
+        """
+        return [sach for sach in self if sach["so_luong_ton_kho"] <= 0]
+
+    def sach_ban_chay_nhat(self):
+        """
+        Tìm cuốn sách có số lượng đã bán lớn nhất (cuốn đầu tiên nếu bằng nhau)
+
+        Returns:
+            dict: Bản ghi sách bán chạy nhất, hoặc None nếu danh mục rỗng
+        """
+        dau_bang = self.xep_hang.ban_chay_nhat()
+        if dau_bang is None:
+            return None
+        return self._chi_muc[dau_bang[0]]
+
+    def top_ban_chay(self, k):
+        """
+        Lấy K cuốn sách bán chạy nhất từ bảng xếp hạng (không sắp xếp lại)
+
+        Args:
+            k (int): Số lượng sách cần lấy
+
+        Returns:
+            list: Các bản ghi sách theo số lượng đã bán giảm dần
+        """
+        return [self._chi_muc[ten_sach] for ten_sach, _ in self.xep_hang.top_k(k)]
+
+    def tong_ton_kho(self):
+        """Tổng số cuốn sách còn trong kho"""
+        return sum(sach["so_luong_ton_kho"] for sach in self)
+
+    def tong_da_ban(self):
+        """Tổng số cuốn sách đã bán"""
+        return sum(sach["so_luong_da_ban"] for sach in self)
+
+    def tong_gia_tri_ton_kho(self):
+        """Tổng giá trị (VNĐ) của số sách còn trong kho"""
+        return sum(sach["gia"] * sach["so_luong_ton_kho"] for sach in self)
+
+    def cac_cot(self):
+        """
+        Xuất dữ liệu danh mục theo cột (dùng khi ghi ảnh chụp ra đĩa)
+
+        Returns:
+            tuple: (list tên sách, list giá, list tồn kho, list đã bán)
+        """
+        ds_sach = list(self)
+        return ([sach["ten_sach"] for sach in ds_sach],
+                [sach["gia"] for sach in ds_sach],
+                [sach["so_luong_ton_kho"] for sach in ds_sach],
+                [sach["so_luong_da_ban"] for sach in ds_sach])
+
+    # -------------------------------------------------------------------------
+    # Đồng bộ chỉ mục chuẩn hóa
+    # -------------------------------------------------------------------------
+
+    def _them_chi_muc_chuan_hoa(self, sach):
+        if self._chi_muc_chuan_hoa is None:
+            return
+        khoa = chuan_hoa_ten(sach["ten_sach"])
+        self._chi_muc_chuan_hoa.setdefault(khoa, []).append(sach)
+
+    def _xoa_chi_muc_chuan_hoa(self, sach):
+        if self._chi_muc_chuan_hoa is None:
+            return
+        khoa = chuan_hoa_ten(sach["ten_sach"])
+        ds_trung = self._chi_muc_chuan_hoa[khoa]
+        ds_trung.remove(sach)
+        if not ds_trung:
+            del self._chi_muc_chuan_hoa[khoa]
@@ -0,0 +1,537 @@
+# =============================================================================
+# KHO SÁCH DẠNG CỘT (NUMPY)
+# =============================================================================
+# Mô tả: Lưu danh mục sách theo cột thay vì mỗi cuốn một dictionary:
+#   - gia, so_luong_ton_kho, so_luong_da_ban: mảng NumPy liên tục
+#   - ten_sach: bảng tên đã intern, chỉ mục ten_sach -> vị trí dòng
+# Mỗi dòng được truy cập qua BanGhiSach, một "view" dùng như dict nên các hàm
+# trong index.py không cần biết dữ liệu nằm ở đâu. Các truy vấn thống kê
+# (bán > N, tổng, hết hàng, bán chạy nhất) chạy bằng phép toán vector.
+#
+# Chỉ mục tên chuẩn hóa (tìm gần đúng) và bảng xếp hạng bán chạy tốn thêm bộ
+# nhớ cho từng cuốn nên chỉ được dựng ở lần dùng đầu tiên, ở cả hai loại danh
+# mục. Đo bằng tracemalloc với 200.000 đầu sách (tính cả chuỗi tên sách, tên
+# dài khoảng 20 ký tự), trước / sau lần tìm gần đúng và xem bán chạy đầu tiên:
+#   - DanhMucSach (mỗi cuốn một dict):  khoảng 615 / 857 byte/đầu sách
+#   - KhoSachDangCot(danh_sach):        khoảng 267 / 793 byte/đầu sách
+#   - KhoSachDangCot.tu_mang(...):      khoảng 220 / 747 byte/đầu sách
+# Nghĩa là kho dạng cột chỉ tiết kiệm bộ nhớ khi hai chỉ mục trên chưa được
+# dựng; một khi đã tìm gần đúng và xem bán chạy, nó tốn gần bằng DanhMucSach.
+# =============================================================================
+
+import sys
+import threading
+from collections.abc import MutableMapping
+
+from bestseller import BangXepHangBanChay
+from catalog import chuan_hoa_ten
+
+# NumPy là thư viện tùy chọn: danh mục mặc định (DanhMucSach) không cần nó
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Các trường của một bản ghi sách, theo đúng thứ tự trong danh_sach_sach
+CAC_TRUONG = ("ten_sach", "gia", "so_luong_ton_kho", "so_luong_da_ban")
+
+
+class BanGhiSach(MutableMapping):
+    """
+    View dạng dict trỏ tới một dòng của KhoSachDangCot
+
+    Đọc/ghi gia, so_luong_ton_kho, so_luong_da_ban đi thẳng vào mảng NumPy.
+    View chỉ còn hợp lệ cho tới lần gọi KhoSachDangCot.nen() tiếp theo.
+    """
+
+    __slots__ = ("_kho", "_dong")
+
+    def __init__(self, kho, dong):
+        self._kho = kho
+        self._dong = dong
+
+    def __getitem__(self, truong):
+        kho, dong = self._kho, self._dong
+        if truong == "ten_sach":
+            return kho._ten[dong]
+        if truong == "gia":
+            return float(kho._gia[dong])
+        if truong == "so_luong_ton_kho":
+            return int(kho._ton_kho[dong])
+        if truong == "so_luong_da_ban":
+            return int(kho._da_ban[dong])
+        raise KeyError(truong)
+
+    def __setitem__(self, truong, gia_tri):
+        kho, dong = self._kho, self._dong
+        if truong == "ten_sach":
+            # Đổi tên phải đi qua kho để cập nhật chỉ mục
+            kho.cap_nhat_sach(kho._ten[dong], ten_sach=gia_tri)
+        elif truong == "gia":
+            kho._gia[dong] = gia_tri
+            kho._bao_thay_doi(kho._ten[dong])
+        elif truong == "so_luong_ton_kho":
+            kho._ton_kho[dong] = gia_tri
+            kho._bao_thay_doi(kho._ten[dong])
+        elif truong == "so_luong_da_ban":
+            kho._da_ban[dong] = gia_tri
+            kho._cap_nhat_xep_hang("cap_nhat", kho._ten[dong], int(gia_tri))
+            kho._bao_thay_doi(kho._ten[dong])
+        else:
+            raise KeyError(truong)
+        if truong != "ten_sach":
+            kho._bao_thay_doi_danh_muc("cap_nhat", kho._ten[dong], {truong: gia_tri})
+
+    def __delitem__(self, truong):
+        raise TypeError("Không thể xóa trường của bản ghi sách dạng cột")
+
+    def __iter__(self):
+        return iter(CAC_TRUONG)
+
+    def __len__(self):
+        return len(CAC_TRUONG)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class KhoSachDangCot:
+    """
+    Danh mục sách lưu theo cột bằng NumPy, cùng giao diện với DanhMucSach
+
+    Xóa sách chỉ đánh dấu dòng là không còn hiệu lực; gọi nen() để thu gọn
+    mảng khi số dòng đã xóa lớn.
+    """
+
+    def __init__(self, danh_sach=None, suc_chua=1024, chi_muc_chuan_hoa=True):
+        """
+        Khởi tạo kho dạng cột
+
+        Args:
+            danh_sach (iterable, optional): Các dict sách ban đầu
+            suc_chua (int, optional): Số dòng cấp phát sẵn. Mặc định là 1024.
+            chi_muc_chuan_hoa (bool, optional): Có cho phép tìm gần đúng bằng
+                                                chỉ mục tên chuẩn hóa hay không
+                                                (chỉ mục được dựng ở lần tìm đầu
+                                                tiên). Mặc định là True.
+
+        Raises:
+            ImportError: Nếu chưa cài đặt NumPy
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("Kho sách dạng cột cần NumPy: pip install numpy")
+
+        suc_chua = max(int(suc_chua), 1)
+        self._gia = np.zeros(suc_chua, dtype=np.float64)
+        self._ton_kho = np.zeros(suc_chua, dtype=np.int64)
+        self._da_ban = np.zeros(suc_chua, dtype=np.int64)
+        self._con_hieu_luc = np.zeros(suc_chua, dtype=bool)
+        self._ten = []                 # dòng -> tên sách (đã intern)
+        self._so_dong = 0              # số dòng đã dùng (kể cả dòng đã xóa)
+        self._chi_muc = {}             # tên sách -> dòng
+        # Chỉ mục chuẩn hóa và bảng xếp hạng tốn bộ nhớ cho từng cuốn sách nên
+        # chỉ được dựng ở lần dùng đầu tiên (xem tim_sach_gan_dung, xep_hang)
+        self._cho_phep_chuan_hoa = chi_muc_chuan_hoa
+        self._chi_muc_chuan_hoa = None
+        self._khoa_chi_muc_chuan_hoa = threading.Lock()
+        self._xep_hang = None
+        self._khoa_xep_hang = threading.Lock()
+        self._nguoi_theo_doi = []
+        self._nguoi_theo_doi_danh_muc = []
+
+        for sach in danh_sach or []:
+            self.them_sach(sach)
+
+    @classmethod
+    def tu_mang(cls, ten, gia, ton_kho, da_ban, chi_muc_chuan_hoa=True):
+        """
+        Tạo kho trực tiếp từ các cột có sẵn (nhanh hơn thêm từng cuốn)
+
+        Args:
+            ten (list): Danh sách tên sách (không trùng nhau)
+            gia, ton_kho, da_ban (array-like): Các cột số, cùng độ dài với ten
+            chi_muc_chuan_hoa (bool, optional): Có cho phép tìm gần đúng không
+
+        Returns:
+            KhoSachDangCot: Kho mới chứa toàn bộ dữ liệu
+
+        Raises:
+            ValueError: Nếu độ dài các cột khác nhau hoặc có tên trùng
+        """
+        n = len(ten)
+        if not (len(gia) == len(ton_kho) == len(da_ban) == n):
+            raise ValueError("Các cột phải có cùng độ dài")
+
+        kho = cls(suc_chua=n, chi_muc_chuan_hoa=chi_muc_chuan_hoa)
+        kho._gia[:n] = gia
+        kho._ton_kho[:n] = ton_kho
+        kho._da_ban[:n] = da_ban
+        kho._con_hieu_luc[:n] = True
+        # Tên từ một nguồn đã không trùng nhau nên không cần intern từng tên
+        kho._ten = list(ten)
+        kho._so_dong = n
+        kho._chi_muc = dict(zip(kho._ten, range(n)))
+        if len(kho._chi_muc) != n:
+            raise ValueError("Danh sách tên sách có phần tử trùng nhau")
+        return kho
+
+    @property
+    def xep_hang(self):
+        """Bảng xếp hạng bán chạy, dựng từ cột đã bán ở lần dùng đầu tiên"""
+        if self._xep_hang is None:
+            with self._khoa_xep_hang:
+                if self._xep_hang is None:
+                    dong = self._cac_dong_hieu_luc()
+                    self._xep_hang = BangXepHangBanChay.tu_du_lieu(
+                        zip([self._ten[d] for d in dong.tolist()], self._da_ban[dong].tolist()))
+        return self._xep_hang
+
+    def __len__(self):
+        return len(self._chi_muc)
+
+    def __iter__(self):
+        for dong in self._cac_dong_hieu_luc():
+            yield BanGhiSach(self, int(dong))
+
+    def __contains__(self, ten_sach):
+        return ten_sach in self._chi_muc
+
+    def theo_doi(self, ham):
+        """
+        Đăng ký hàm được gọi mỗi khi một cuốn sách thay đổi
+        (thêm, sửa, bán, xóa), ví dụ để xóa bộ nhớ đệm
+
+        Args:
+            ham (callable): Hàm nhận một tham số là tên sách bị thay đổi
+        """
+        self._nguoi_theo_doi.append(ham)
+
+    def _bao_thay_doi(self, ten_sach):
+        for ham in self._nguoi_theo_doi:
+            ham(ten_sach)
+
+    def theo_doi_danh_muc(self, ham):
+        """
+        Đăng ký hàm được gọi sau mỗi thay đổi danh mục (không gồm bán hàng),
+        ví dụ để ghi nhật ký lưu trữ
+
+        Args:
+            ham (callable): Hàm nhận (loai, ten_sach, du_lieu), giống
+                            DanhMucSach.theo_doi_danh_muc
+        """
+        self._nguoi_theo_doi_danh_muc.append(ham)
+
+    def _bao_thay_doi_danh_muc(self, loai, ten_sach, du_lieu=None):
+        for ham in self._nguoi_theo_doi_danh_muc:
+            ham(loai, ten_sach, du_lieu)
+
+    # -------------------------------------------------------------------------
+    # Tra cứu
+    # -------------------------------------------------------------------------
+
+    def tim_sach(self, ten_sach):
+        """
+        Tìm sách theo đúng tên
+
+        Args:
+            ten_sach (str): Tên sách cần tìm
+
+        Returns:
+            BanGhiSach: View của bản ghi sách, hoặc None nếu không tìm thấy
+        """
+        dong = self._chi_muc.get(ten_sach)
+        if dong is None:
+            return None
+        return BanGhiSach(self, dong)
+
+    def tim_sach_gan_dung(self, ten_sach):
+        """
+        Tìm sách theo tên không phân biệt hoa/thường và dấu
+
+        Args:
+            ten_sach (str): Tên sách cần tìm (có thể viết thường, không dấu)
+
+        Returns:
+            list: Các view bản ghi có tên chuẩn hóa trùng khớp
+        """
+        if not self._cho_phep_chuan_hoa:
+            raise RuntimeError("Kho không được tạo với chỉ mục chuẩn hóa")
+        if self._chi_muc_chuan_hoa is None:
+            with self._khoa_chi_muc_chuan_hoa:
+                if self._chi_muc_chuan_hoa is None:
+                    self._chi_muc_chuan_hoa = self._dung_chi_muc_chuan_hoa()
+        ds_dong = self._chi_muc_chuan_hoa.get(chuan_hoa_ten(ten_sach), ())
+        return [BanGhiSach(self, dong) for dong in ds_dong]
+
+    # -------------------------------------------------------------------------
+    # Thêm / cập nhật / xóa
+    # -------------------------------------------------------------------------
+
+    def them_sach(self, sach):
+        """
+        Thêm một cuốn sách mới vào cuối kho
+
+        Args:
+            sach (dict): Bản ghi sách cần thêm
+
+        Returns:
+            BanGhiSach: View của dòng vừa thêm
+
+        Raises:
+            ValueError: Nếu tên sách đã tồn tại trong kho
+        """
+        ten_sach = sys.intern(sach["ten_sach"])
+        if ten_sach in self._chi_muc:
+            raise ValueError(f"Sách '{ten_sach}' đã tồn tại trong danh mục")
+
+        if self._so_dong == len(self._gia):
+            self._mo_rong(2 * len(self._gia))
+
+        dong = self._so_dong
+        self._gia[dong] = sach["gia"]
+        self._ton_kho[dong] = sach["so_luong_ton_kho"]
+        self._da_ban[dong] = sach["so_luong_da_ban"]
+        self._con_hieu_luc[dong] = True
+        self._ten.append(ten_sach)
+        self._so_dong += 1
+
+        self._chi_muc[ten_sach] = dong
+        self._them_chi_muc_chuan_hoa(dong)
+        self._cap_nhat_xep_hang("them", ten_sach, int(self._da_ban[dong]))
+        self._bao_thay_doi(ten_sach)
+        self._bao_thay_doi_danh_muc("them", ten_sach, BanGhiSach(self, dong))
+        return BanGhiSach(self, dong)
+
+    def cap_nhat_sach(self, ten_sach, /, **thay_doi):
+        """
+        Cập nhật các trường của một cuốn sách (kể cả đổi tên)
+
+        Args:
+            ten_sach (str): Tên sách cần cập nhật
+            **thay_doi: Các trường cần thay đổi, ví dụ gia=90000.0
+
+        Returns:
+            BanGhiSach: View của bản ghi sau khi cập nhật
+
+        Raises:
+            KeyError: Nếu không tìm thấy sách hoặc trường không hợp lệ
+            ValueError: Nếu đổi sang một tên đã tồn tại
+        """
+        dong = self._chi_muc[ten_sach]
+        ban_ghi = BanGhiSach(self, dong)
+
+        ten_moi = thay_doi.pop("ten_sach", ten_sach)
+        if ten_moi != ten_sach:
+            if ten_moi in self._chi_muc:
+                raise ValueError(f"Sách '{ten_moi}' đã tồn tại trong danh mục")
+            self._xoa_chi_muc_chuan_hoa(dong)
+            del self._chi_muc[ten_sach]
+            self._ten[dong] = sys.intern(ten_moi)
+            self._chi_muc[self._ten[dong]] = dong
+            self._them_chi_muc_chuan_hoa(dong)
+            self._cap_nhat_xep_hang("doi_ten", ten_sach, self._ten[dong])
+            self._bao_thay_doi(ten_sach)
+            self._bao_thay_doi(ten_moi)
+            self._bao_thay_doi_danh_muc("doi_ten", ten_sach, self._ten[dong])
+
+        for truong, gia_tri in thay_doi.items():
+            ban_ghi[truong] = gia_tri
+        return ban_ghi
+
+    def ghi_nhan_ban(self, ten_sach, so_luong):
+        """
+        Ghi nhận một lần bán: giảm tồn kho, tăng số lượng đã bán
+
+        Args:
+            ten_sach (str): Tên sách đã bán
+            so_luong (int): Số lượng đã bán
+
+        Returns:
+            bool: True nếu cập nhật thành công, False nếu không tìm thấy sách
+                  hoặc không đủ tồn kho
+        """
+        dong = self._chi_muc.get(ten_sach)
+        if dong is None or self._ton_kho[dong] < so_luong:
+            return False
+        self._ton_kho[dong] -= so_luong
+        self._da_ban[dong] += so_luong
+        self._cap_nhat_xep_hang("cap_nhat", ten_sach, int(self._da_ban[dong]))
+        self._bao_thay_doi(ten_sach)
+        return True
+
+    def xoa_sach(self, ten_sach):
+        """
+        Xóa một cuốn sách khỏi kho
+
+        Args:
+            ten_sach (str): Tên sách cần xóa
+
+        Returns:
+            dict: Bản sao dữ liệu của cuốn sách đã xóa
+
+        Raises:
+            KeyError: Nếu không tìm thấy sách
+        """
+        dong = self._chi_muc[ten_sach]
+        sach = dict(BanGhiSach(self, dong))
+        self._xoa_chi_muc_chuan_hoa(dong)
+        del self._chi_muc[ten_sach]
+        self._con_hieu_luc[dong] = False
+        self._cap_nhat_xep_hang("xoa", ten_sach)
+        self._bao_thay_doi(ten_sach)
+        self._bao_thay_doi_danh_muc("xoa", ten_sach)
+        return sach
+
+    def nen(self):
+        """
+        Thu gọn kho, loại bỏ các dòng đã xóa
+
+        Lưu ý: mọi BanGhiSach tạo ra trước đó đều không còn hợp lệ.
+
+        Returns:
+            int: Số dòng đã được loại bỏ
+        """
+        dong_giu = self._cac_dong_hieu_luc()
+        so_dong_bo = self._so_dong - len(dong_giu)
+        n = len(dong_giu)
+
+        self._gia[:n] = self._gia[dong_giu]
+        self._ton_kho[:n] = self._ton_kho[dong_giu]
+        self._da_ban[:n] = self._da_ban[dong_giu]
+        self._con_hieu_luc[:n] = True
+        self._con_hieu_luc[n:] = False
+        self._ten = [self._ten[dong] for dong in dong_giu]
+        self._so_dong = n
+
+        self._chi_muc = {t: dong for dong, t in enumerate(self._ten)}
+        if self._chi_muc_chuan_hoa is not None:
+            self._chi_muc_chuan_hoa = self._dung_chi_muc_chuan_hoa()
+        return so_dong_bo
+
+    # -------------------------------------------------------------------------
+    # Thống kê bằng phép toán vector
+    # -------------------------------------------------------------------------
+
+    def sach_ban_tren(self, nguong):
+        """
+        Lấy các cuốn sách có số lượng đã bán lớn hơn ngưỡng
+
+        Args:
+            nguong (int): Ngưỡng số lượng đã bán
+
+        Returns:
+            list: Các view bản ghi thỏa mãn, theo thứ tự trong kho
+        """
+        n = self._so_dong
+        dong = np.flatnonzero(self._con_hieu_luc[:n] & (self._da_ban[:n] > nguong))
+        return [BanGhiSach(self, int(d)) for d in dong]
+
+    def sach_het_hang(self):
+        """
+        Lấy các cuốn sách đã hết hàng (tồn kho bằng 0)
+
+        Returns:
+            list: Các view bản ghi hết hàng, theo thứ tự trong kho
+        """
+        n = self._so_dong
+        dong = np.flatnonzero(self._con_hieu_luc[:n] & (self._ton_kho[:n] <= 0))
+        return [BanGhiSach(self, int(d)) for d in dong]
+
+    def sach_ban_chay_nhat(self):
+        """
+        Tìm cuốn sách có số lượng đã bán lớn nhất (cuốn đầu tiên nếu bằng nhau)
+
+        Returns:
+            BanGhiSach: View của sách bán chạy nhất, hoặc None nếu kho rỗng
+        """
+        dau_bang = self.xep_hang.ban_chay_nhat()
+        if dau_bang is None:
+            return None
+        return self.tim_sach(dau_bang[0])
+
+    def top_ban_chay(self, k):
+        """
+        Lấy K cuốn sách bán chạy nhất từ bảng xếp hạng (không sắp xếp lại)
+
+        Args:
+            k (int): Số lượng sách cần lấy
+
+        Returns:
+            list: Các view bản ghi theo số lượng đã bán giảm dần
+        """
+        return [self.tim_sach(ten_sach) for ten_sach, _ in self.xep_hang.top_k(k)]
+
+    def tong_ton_kho(self):
+        """Tổng số cuốn sách còn trong kho"""
+        n = self._so_dong
+        return int(self._ton_kho[:n][self._con_hieu_luc[:n]].sum())
+
+    def tong_da_ban(self):
+        """Tổng số cuốn sách đã bán"""
+        n = self._so_dong
+        return int(self._da_ban[:n][self._con_hieu_luc[:n]].sum())
+
+    def tong_gia_tri_ton_kho(self):
+        """Tổng giá trị (VNĐ) của số sách còn trong kho"""
+        n = self._so_dong
+        hieu_luc = self._con_hieu_luc[:n]
+        return float(np.dot(self._gia[:n][hieu_luc], self._ton_kho[:n][hieu_luc]))
+
+    def cac_cot(self):
+        """
+        Xuất dữ liệu kho theo cột, chỉ gồm các dòng còn hiệu lực
+
+        Returns:
+            tuple: (list tên sách, mảng giá, mảng tồn kho, mảng đã bán)
+        """
+        dong = self._cac_dong_hieu_luc()
+        return ([self._ten[d] for d in dong.tolist()],
+                self._gia[dong], self._ton_kho[dong], self._da_ban[dong])
+
+    # -------------------------------------------------------------------------
+    # Hàm nội bộ
+    # -------------------------------------------------------------------------
+
+    def _cac_dong_hieu_luc(self):
+        return np.flatnonzero(self._con_hieu_luc[:self._so_dong])
+
+    def _mo_rong(self, suc_chua_moi):
+        # Nhân đôi sức chứa để chi phí thêm sách trung bình là O(1)
+        for ten_cot in ("_gia", "_ton_kho", "_da_ban", "_con_hieu_luc"):
+            cot_cu = getattr(self, ten_cot)
+            cot_moi = np.zeros(suc_chua_moi, dtype=cot_cu.dtype)
+            cot_moi[:len(cot_cu)] = cot_cu
+            setattr(self, ten_cot, cot_moi)
+
+    def _cap_nhat_xep_hang(self, ten_ham, *tham_so):
+        # Bảng chưa dựng thì bỏ qua: lần dựng đầu sẽ đọc thẳng từ các cột. Kiểm
+        # tra lại dưới khóa để không lỡ cập nhật khi một luồng khác đang dựng.
+        xep_hang = self._xep_hang
+        if xep_hang is None:
+            with self._khoa_xep_hang:
+                xep_hang = self._xep_hang
+            if xep_hang is None:
+                return
+        getattr(xep_hang, ten_ham)(*tham_so)
+
+    def _dung_chi_muc_chuan_hoa(self):
+        chi_muc = {}
+        for dong in self._cac_dong_hieu_luc().tolist():
+            chi_muc.setdefault(chuan_hoa_ten(self._ten[dong]), []).append(dong)
+        return chi_muc
+
+    def _them_chi_muc_chuan_hoa(self, dong):
+        if self._chi_muc_chuan_hoa is None:
+            return
+        khoa = chuan_hoa_ten(self._ten[dong])
+        self._chi_muc_chuan_hoa.setdefault(khoa, []).append(dong)
+
+    def _xoa_chi_muc_chuan_hoa(self, dong):
+        if self._chi_muc_chuan_hoa is None:
+            return
+        khoa = chuan_hoa_ten(self._ten[dong])
+        ds_dong = self._chi_muc_chuan_hoa[khoa]
+        ds_dong.remove(dong)
+        if not ds_dong:
+            del self._chi_muc_chuan_hoa[khoa]
@@ -0,0 +1,82 @@
+# =============================================================================
+# KHÓA PHÂN ĐOẠN CHO KHO SÁCH DÙNG CHUNG GIỮA NHIỀU LUỒNG
+# =============================================================================
+# Mô tả: Thay vì một khóa lớn cho cả kho (các quầy thanh toán phải xếp hàng),
+# mỗi tên sách được băm vào một trong N khóa. Hai đơn hàng chỉ phải chờ nhau
+# khi có sách rơi vào cùng một phân đoạn. Đơn hàng nhiều cuốn sách luôn lấy
+# khóa theo thứ tự chỉ số tăng dần nên không thể xảy ra deadlock.
+# =============================================================================
+
+import threading
+from contextlib import contextmanager
+
+
+class KhoaPhanDoan:
+    """
+    Tập N khóa, mỗi tên sách dùng khóa theo giá trị băm của nó
+    """
+
+    def __init__(self, so_phan_doan=64):
+        """
+        Khởi tạo các khóa phân đoạn
+
+        Args:
+            so_phan_doan (int, optional): Số khóa. Mặc định là 64.
+        """
+        if so_phan_doan <= 0:
+            raise ValueError("Số phân đoạn phải là số nguyên dương")
+        self._cac_khoa = [threading.Lock() for _ in range(so_phan_doan)]
+
+    def __len__(self):
+        return len(self._cac_khoa)
+
+    def chi_so(self, ten_sach):
+        """
+        Lấy chỉ số phân đoạn của một cuốn sách
+
+        Args:
+            ten_sach (str): Tên sách
+
+        Returns:
+            int: Chỉ số khóa trong khoảng [0, so_phan_doan)
+        """
+        return hash(ten_sach) % len(self._cac_khoa)
+
+    @contextmanager
+    def giu(self, cac_ten_sach):
+        """
+        Giữ khóa của tất cả các sách trong một khối with
+
+        Args:
+            cac_ten_sach (iterable): Tên các cuốn sách cần khóa (có thể trùng)
+
+        Example:
+            >>> khoa = KhoaPhanDoan(4)
+            >>> with khoa.giu(["Nhà Giả Kim", "Đắc Nhân Tâm"]):
+            ...     pass
+        """
+        # Sắp xếp chỉ số để mọi luồng lấy khóa theo cùng một thứ tự
+        cac_chi_so = sorted({self.chi_so(ten_sach) for ten_sach in cac_ten_sach})
+        da_giu = []
+        try:
+            for i in cac_chi_so:
+                self._cac_khoa[i].acquire()
+                da_giu.append(i)
+            yield
+        finally:
+            for i in reversed(da_giu):
+                self._cac_khoa[i].release()
+
+    @contextmanager
+    def giu_tat_ca(self):
+        """
+        Giữ toàn bộ các khóa, dùng cho thao tác cần "đóng băng" cả kho
+        (ví dụ ghi ảnh chụp danh mục)
+        """
+        for khoa in self._cac_khoa:
+            khoa.acquire()
+        try:
+            yield
+        finally:
+            for khoa in reversed(self._cac_khoa):
+                khoa.release()
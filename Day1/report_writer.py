@@ -0,0 +1,166 @@
+# =============================================================================
+# GHI BÁO CÁO CÓ BỘ ĐỆM
+# =============================================================================
+# Mô tả: Thay vì gọi print() cho từng dòng (mỗi lần là một lần ghi ra stdout),
+# các dòng báo cáo được gom vào bộ đệm và ghi ra theo từng khối:
+#   - Đích ghi: stdout, một file đang mở, hoặc đường dẫn file
+#   - Định dạng: bảng căn cột (giống hien_thi_danh_sach_sach), CSV hoặc TSV
+#   - Hỗ trợ phân trang (bo_qua/gioi_han) và nhận dữ liệu từ generator, nên
+#     xuất báo cáo hàng triệu dòng không cần dựng cả bảng trong bộ nhớ
+# =============================================================================
+
+import csv
+import sys
+from itertools import islice
+
+CAC_DINH_DANG = ("bang", "csv", "tsv")
+
+
+class BoGhiBaoCao:
+    """
+    Bộ ghi báo cáo theo cột, ghi ra đích theo từng khối dòng
+
+    Dùng được như context manager để chắc chắn bộ đệm được ghi hết:
+
+        with BoGhiBaoCao(cac_cot, "ton_kho.csv", dinh_dang="csv") as bo_ghi:
+            bo_ghi.ghi_tieu_de()
+            bo_ghi.ghi_cac_dong(tao_dong_bao_cao_ton_kho())
+    """
+
+    def __init__(self, cac_cot, dich=None, dinh_dang="bang", kich_thuoc_khoi=1000):
+        """
+        Khởi tạo bộ ghi báo cáo
+
+        Args:
+            cac_cot (list): Các bộ (tieu_de, do_rong, kieu_so) mô tả từng cột.
+                            kieu_so là phần định dạng sau dấu ":" của f-string,
+                            ví dụ ",.0f", hoặc "" nếu ghi nguyên giá trị.
+                            do_rong chỉ dùng cho định dạng "bang".
+            dich (optional): None để ghi ra stdout, một đối tượng có write(),
+                             hoặc đường dẫn file (sẽ được mở và tự đóng)
+            dinh_dang (str, optional): "bang", "csv" hoặc "tsv". Mặc định là "bang".
+            kich_thuoc_khoi (int, optional): Số dòng mỗi lần ghi ra đích.
+                                             Mặc định là 1000.
+
+        Raises:
+            ValueError: Nếu định dạng không hợp lệ
+        """
+        if dinh_dang not in CAC_DINH_DANG:
+            raise ValueError(f"Định dạng báo cáo không hợp lệ: {dinh_dang}")
+
+        self.cac_cot = list(cac_cot)
+        self.dinh_dang = dinh_dang
+        self.kich_thuoc_khoi = max(int(kich_thuoc_khoi), 1)
+
+        self._tu_mo_file = isinstance(dich, str)
+        self._dich = open(dich, "w", encoding="utf-8", newline="") if self._tu_mo_file else dich
+        self._bo_dem = []
+
+        # Chuỗi định dạng một dòng bảng, dựng sẵn một lần
+        # Ví dụ: "{0:<30} {1:<15,.0f} {2:<15}"
+        self._mau_dong = " ".join(
+            f"{{{i}:<{do_rong}{kieu_so}}}"
+            for i, (_, do_rong, kieu_so) in enumerate(self.cac_cot)
+        )
+        # CSV/TSV ghi thẳng vào bộ đệm thông qua phương thức write()
+        self._csv = None
+        if dinh_dang != "bang":
+            self._csv = csv.writer(self, delimiter="," if dinh_dang == "csv" else "\t",
+                                   lineterminator="\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.dong()
+        return False
+
+    # -------------------------------------------------------------------------
+    # Ghi dữ liệu
+    # -------------------------------------------------------------------------
+
+    def ghi_van_ban(self, dong):
+        """
+        Ghi một dòng văn bản tự do (tiêu đề mục, dòng kẻ...)
+
+        Args:
+            dong (str): Nội dung dòng, không cần ký tự xuống dòng
+        """
+        self.write(dong + "\n")
+
+    def ghi_tieu_de(self, do_dai_ke=None):
+        """
+        Ghi dòng tiêu đề cột (và đường kẻ ngang với định dạng bảng)
+
+        Args:
+            do_dai_ke (int, optional): Độ dài đường kẻ ngang. Mặc định bằng
+                                       tổng độ rộng các cột.
+        """
+        cac_tieu_de = [tieu_de for tieu_de, _, _ in self.cac_cot]
+        if self._csv is not None:
+            self._csv.writerow(cac_tieu_de)
+            return
+        if do_dai_ke is None:
+            do_dai_ke = sum(do_rong for _, do_rong, _ in self.cac_cot) + len(self.cac_cot) - 1
+        self.ghi_van_ban(" ".join(f"{tieu_de:<{do_rong}}" for tieu_de, do_rong, _ in self.cac_cot))
+        self.ghi_van_ban("-" * do_dai_ke)
+
+    def ghi_dong(self, gia_tri):
+        """
+        Ghi một dòng dữ liệu
+
+        Args:
+            gia_tri (tuple): Giá trị các cột, theo đúng thứ tự cac_cot
+        """
+        if self._csv is not None:
+            self._csv.writerow(
+                format(v, kieu_so.replace(",", "")) if kieu_so else v
+                for v, (_, _, kieu_so) in zip(gia_tri, self.cac_cot)
+            )
+        else:
+            self.write(self._mau_dong.format(*gia_tri) + "\n")
+
+    def ghi_cac_dong(self, cac_gia_tri, bo_qua=0, gioi_han=None):
+        """
+        Ghi nhiều dòng từ một iterable/generator, có phân trang
+
+        Args:
+            cac_gia_tri (iterable): Các tuple giá trị của từng dòng
+            bo_qua (int, optional): Số dòng đầu tiên cần bỏ qua. Mặc định là 0.
+            gioi_han (int, optional): Số dòng tối đa cần ghi. Mặc định là tất cả.
+
+        Returns:
+            int: Số dòng đã ghi
+        """
+        so_dong = 0
+        for gia_tri in islice(cac_gia_tri, bo_qua, None if gioi_han is None else bo_qua + gioi_han):
+            self.ghi_dong(gia_tri)
+            so_dong += 1
+        return so_dong
+
+    def write(self, chuoi):
+        """Thêm chuỗi vào bộ đệm; ghi ra đích khi đủ một khối"""
+        self._bo_dem.append(chuoi)
+        if len(self._bo_dem) >= self.kich_thuoc_khoi:
+            self.xa()
+
+    # -------------------------------------------------------------------------
+    # Xả bộ đệm / đóng
+    # -------------------------------------------------------------------------
+
+    def xa(self):
+        """Ghi toàn bộ nội dung trong bộ đệm ra đích"""
+        if not self._bo_dem:
+            return
+        # Lấy sys.stdout tại thời điểm ghi để vẫn đúng khi stdout bị chuyển hướng
+        dich = self._dich if self._dich is not None else sys.stdout
+        dich.write("".join(self._bo_dem))
+        self._bo_dem.clear()
+
+    def dong(self):
+        """Xả bộ đệm và đóng file nếu bộ ghi tự mở file"""
+        self.xa()
+        if self._tu_mo_file:
+            self._dich.close()
+        elif self._dich is None:
+            sys.stdout.flush()
@@ -0,0 +1,99 @@
+# =============================================================================
+# BỘ NHỚ ĐỆM CHO KIỂM TRA TỒN KHO
+# =============================================================================
+# Mô tả: API kiểm tra hàng bị gọi rất nhiều lần cho một nhóm nhỏ sách "nóng".
+# Bộ nhớ đệm lưu sẵn với mỗi tên sách: tồn kho hiện tại và phân loại giá, nên
+# một lần trúng đệm trả lời được mọi số lượng mua mà không cần chạm vào
+# danh mục. Mục đệm bị xóa khi danh mục báo sách thay đổi (bán, sửa giá...).
+# =============================================================================
+
+import threading
+
+
+class BoNhoDemTonKho:
+    """
+    Bộ nhớ đệm tên sách -> (tồn kho, phân loại giá), có đếm số lần trúng/trượt
+
+    Khi đầy, mục được thêm vào sớm nhất bị loại bỏ trước.
+    """
+
+    def __init__(self, suc_chua=10000):
+        """
+        Khởi tạo bộ nhớ đệm
+
+        Args:
+            suc_chua (int, optional): Số tên sách tối đa được lưu. Mặc định là 10000.
+        """
+        self.suc_chua = suc_chua
+        self.so_lan_trung = 0
+        self.so_lan_truot = 0
+        self._du_lieu = {}
+        # Chỉ khóa khi thêm/xóa mục; đọc dict là thao tác nguyên tử nên không cần
+        self._khoa = threading.Lock()
+
+    def __len__(self):
+        return len(self._du_lieu)
+
+    def lay(self, ten_sach):
+        """
+        Lấy mục đệm của một cuốn sách
+
+        Args:
+            ten_sach (str): Tên sách
+
+        Returns:
+            tuple: (so_luong_ton_kho, phan_loai) — so_luong_ton_kho là None nếu
+                   sách không tồn tại; hoặc None nếu chưa có trong bộ nhớ đệm
+        """
+        muc = self._du_lieu.get(ten_sach)
+        if muc is None:
+            self.so_lan_truot += 1
+        else:
+            self.so_lan_trung += 1
+        return muc
+
+    def luu(self, ten_sach, muc):
+        """
+        Lưu mục đệm cho một cuốn sách
+
+        Args:
+            ten_sach (str): Tên sách
+            muc (tuple): (so_luong_ton_kho, phan_loai)
+        """
+        with self._khoa:
+            if ten_sach not in self._du_lieu and len(self._du_lieu) >= self.suc_chua:
+                # dict giữ thứ tự thêm vào: phần tử đầu tiên là mục cũ nhất
+                self._du_lieu.pop(next(iter(self._du_lieu)), None)
+            self._du_lieu[ten_sach] = muc
+
+    def xoa_muc(self, ten_sach):
+        """
+        Xóa mục đệm của một cuốn sách (đăng ký với DanhMucSach.theo_doi)
+
+        Args:
+            ten_sach (str): Tên sách vừa thay đổi
+        """
+        with self._khoa:
+            self._du_lieu.pop(ten_sach, None)
+
+    def xoa_het(self):
+        """Xóa toàn bộ bộ nhớ đệm và đặt lại bộ đếm"""
+        with self._khoa:
+            self._du_lieu.clear()
+        self.so_lan_trung = 0
+        self.so_lan_truot = 0
+
+    def thong_ke(self):
+        """
+        Thống kê hiệu quả của bộ nhớ đệm
+
+        Returns:
+            dict: so_lan_trung, so_lan_truot, ty_le_trung, so_muc
+        """
+        tong = self.so_lan_trung + self.so_lan_truot
+        return {
+            "so_lan_trung": self.so_lan_trung,
+            "so_lan_truot": self.so_lan_truot,
+            "ty_le_trung": self.so_lan_trung / tong if tong else 0.0,
+            "so_muc": len(self._du_lieu)
+        }
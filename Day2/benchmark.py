@@ -0,0 +1,224 @@
+"""Sales replay and throughput benchmark for the event system.
+
+Builds a synthetic event catalogue and a replayable sale stream, then drives
+the real sale path (ticket_service.sell, as used by process_tickets) and
+build_report (as used by generate_report) without any input() prompts.
+
+Sale streams are either uniform over all events or skewed towards a few hot
+events (Zipf distribution, like an on-sale for a popular concert). A stream
+can be saved to / loaded from a CSV or JSON Lines file (event_id, quantity)
+so the exact same load can be replayed after a change.
+
+Reported per run: sales/sec, rejected sales (sold out), build_report latency
+p50/p99 (measured every --report-every sales while the history grows), and
+memory per million tickets sold (traced with tracemalloc in a second replay,
+so tracing does not slow down the timed one).
+
+Usage:
+    python benchmark.py --events 1000 100000 --sales 1000000
+    python benchmark.py --distribution zipf --zipf-s 1.2 --save-stream stream.csv
+    python benchmark.py --load-stream stream.csv --json result.json
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+import tracemalloc
+
+import bulk_io
+import index
+from ticket_service import NotEnoughTicketsError
+
+
+def make_events(count, tickets=1000, seed=42):
+    """Synthetic event dicts EV0000001, EV0000002, ..."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"EV{i:07d}",
+            "name": f"Sự kiện {i}",
+            "ticket_price": float(rng.randrange(20, 500) * 1000),
+            "tickets_left": tickets
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def make_sale_stream(event_ids, sales, distribution="uniform", zipf_s=1.1, max_quantity=4, seed=7):
+    """
+    List of (event_id, quantity) sales
+
+    distribution: "uniform" (every event equally likely) or "zipf" (the k-th
+    hottest event is chosen with weight 1 / k ** zipf_s; which events are hot
+    is shuffled so it does not follow catalogue order)
+    """
+    rng = random.Random(seed)
+    if distribution == "uniform":
+        chosen = rng.choices(event_ids, k=sales)
+    elif distribution == "zipf":
+        ranked = list(event_ids)
+        rng.shuffle(ranked)
+        weights = itertools.accumulate(1 / k ** zipf_s for k in range(1, len(ranked) + 1))
+        chosen = rng.choices(ranked, cum_weights=list(weights), k=sales)
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    return [(event_id, rng.randint(1, max_quantity)) for event_id in chosen]
+
+
+def save_stream(path, stream):
+    return bulk_io.export_records(path, ("event_id", "quantity"), stream)
+
+
+def load_stream(path):
+    return [bulk_io.parse_sale(record) for _, record in bulk_io.iter_records(path)]
+
+
+def check_stream(stream, event_list):
+    """Raise ValueError if a loaded stream sells events missing from the catalogue"""
+    missing = {event_id for event_id, _ in stream} - {e["id"] for e in event_list}
+    if missing:
+        sample = ", ".join(sorted(missing)[:5])
+        raise ValueError(f"{len(missing)} event IDs in the stream are not in the {len(event_list)}-event "
+                         f"catalogue (e.g. {sample}); use the --events size the stream was saved with")
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(-(-p * len(sorted_values) // 100), 1)
+    return sorted_values[min(int(rank), len(sorted_values)) - 1]
+
+
+def replay(event_list, stream, report_every=0):
+    """
+    Reset the program state to event_list and replay the sale stream
+
+    Returns (seconds spent selling, sales accepted, sales rejected,
+    tickets sold, list of build_report latencies in seconds)
+    """
+    index.reset_event_data([dict(e) for e in event_list])
+    sell = index.ticket_service.sell
+    selling = 0.0
+    sold = rejected = tickets = 0
+    report_latencies = []
+
+    for start in range(0, len(stream), report_every or len(stream) or 1):
+        chunk = stream[start:start + report_every] if report_every else stream
+        begin = time.perf_counter()
+        for event_id, quantity in chunk:
+            try:
+                sell(event_id, quantity)
+            except NotEnoughTicketsError:
+                rejected += 1
+            else:
+                sold += 1
+                tickets += quantity
+        selling += time.perf_counter() - begin
+
+        if report_every:
+            begin = time.perf_counter()
+            index.build_report()
+            report_latencies.append(time.perf_counter() - begin)
+
+    return selling, sold, rejected, tickets, report_latencies
+
+
+def measure_memory(event_list, stream):
+    """Bytes allocated per ticket sold while replaying the stream"""
+    index.reset_event_data([dict(e) for e in event_list])
+    sell = index.ticket_service.sell
+    tickets = 0
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for event_id, quantity in stream:
+        try:
+            sell(event_id, quantity)
+        except NotEnoughTicketsError:
+            continue
+        tickets += quantity
+    grown = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return grown / tickets if tickets else 0.0
+
+
+def run(event_count, sales, distribution="uniform", zipf_s=1.1, tickets=1000,
+        report_every=1000, memory=True, stream=None, seed=42):
+    """One benchmark run; returns a dict of results"""
+    event_list = make_events(event_count, tickets, seed)
+    if stream is None:
+        stream = make_sale_stream([e["id"] for e in event_list], sales, distribution, zipf_s, seed=seed + 1)
+    else:
+        check_stream(stream, event_list)
+
+    selling, sold, rejected, tickets_sold, latencies = replay(event_list, stream, report_every)
+    latencies.sort()
+    result = {
+        "events": event_count,
+        "sales": len(stream),
+        "distribution": distribution,
+        "sold": sold,
+        "rejected": rejected,
+        "tickets_sold": tickets_sold,
+        "sell_seconds": selling,
+        "sales_per_s": len(stream) / selling if selling else 0.0,
+        "report_p50_ms": percentile(latencies, 50) * 1000,
+        "report_p99_ms": percentile(latencies, 99) * 1000
+    }
+    if memory:
+        per_ticket = measure_memory(event_list, stream)
+        result["bytes_per_ticket"] = per_ticket
+        result["mb_per_million_tickets"] = per_ticket * 1_000_000 / 2 ** 20
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sales replay and throughput benchmark")
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 100000], help="Catalogue sizes")
+    parser.add_argument("--sales", type=int, default=200000, help="Sales per stream")
+    parser.add_argument("--distribution", nargs="+", default=["uniform", "zipf"],
+                        choices=["uniform", "zipf"])
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf skew (higher = hotter top events)")
+    parser.add_argument("--tickets", type=int, default=1000, help="Tickets per synthetic event")
+    parser.add_argument("--report-every", type=int, default=1000, help="Time build_report every N sales")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc replay")
+    parser.add_argument("--save-stream", help="Save the generated stream (first size/distribution) to a file")
+    parser.add_argument("--load-stream", help="Replay a saved stream instead of generating one")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    loaded = load_stream(args.load_stream) if args.load_stream else None
+    if loaded is not None:
+        for event_count in args.events:
+            try:
+                check_stream(loaded, make_events(event_count, args.tickets))
+            except ValueError as err:
+                parser.error(str(err))
+    results = []
+    print(f"{'Events':<10} {'Stream':<9} {'Sales/s':<10} {'Rejected':<10} "
+          f"{'Report p50':<12} {'Report p99':<12} {'MB/1M tickets':<14}")
+    print("-" * 80)
+    for event_count in args.events:
+        for distribution in (["replay"] if loaded else args.distribution):
+            stream = loaded
+            if stream is None and args.save_stream and not results:
+                event_ids = [e["id"] for e in make_events(event_count, args.tickets)]
+                stream = make_sale_stream(event_ids, args.sales, distribution, args.zipf_s, seed=43)
+                save_stream(args.save_stream, stream)
+            result = run(event_count, args.sales, distribution, args.zipf_s, args.tickets,
+                         args.report_every, not args.no_memory, stream)
+            results.append(result)
+            memory = f"{result['mb_per_million_tickets']:.1f}" if "mb_per_million_tickets" in result else "-"
+            print(f"{event_count:<10,} {distribution:<9} {result['sales_per_s']:<10,.0f} "
+                  f"{result['rejected']:<10} {result['report_p50_ms']:<12.3f} "
+                  f"{result['report_p99_ms']:<12.3f} {memory:<14}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Bulk import and export of events, sponsors and ticket sales.
+
+Files are CSV (with a header row) or JSON Lines (one object per line); the
+format is picked from the file extension (.csv / .jsonl / .json). Records are
+streamed and processed in batches, so a season's 100k-event catalogue never
+has to be held as a whole or typed through the `input()` prompts.
+
+Each record goes through the same checks as the console prompts (unique IDs,
+positive finite price/amount, non-negative tickets, positive sale quantity). Invalid
+records are skipped and reported with their line number instead of being
+printed one by one; the caller gets an ImportResult summary.
+
+Columns:
+    events:   id, name, ticket_price, tickets_left
+    sponsors: sponsor_id, name, amount, event_id (optional)
+    sales:    event_id, quantity              (import: sold through the service)
+              event_id, ticket_id, quantity   (export)
+"""
+
+import csv
+import json
+import math
+from dataclasses import dataclass, field
+from itertools import islice
+
+EVENT_FIELDS = ("id", "name", "ticket_price", "tickets_left")
+SPONSOR_FIELDS = ("sponsor_id", "name", "amount", "event_id")
+SALE_FIELDS = ("event_id", "ticket_id", "quantity")
+
+BATCH_SIZE = 1000
+
+
+@dataclass
+class ImportResult:
+    """Summary of one import run"""
+    imported: int = 0
+    errors: list = field(default_factory=list)  # (line number, message)
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+def file_format(path):
+    """'csv' or 'jsonl', from the file extension"""
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".json")):
+        return "jsonl"
+    raise ValueError(f"Unsupported file type: {path}")
+
+
+def iter_records(path):
+    """Stream (line number, record dict) pairs from a CSV or JSON Lines file"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if file_format(path) == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield line_number, record
+
+
+def batches(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# ----------------------------------------------------------------------
+# Validation (same rules as the console prompts)
+# ----------------------------------------------------------------------
+
+def _require(record, name):
+    if not isinstance(record, dict):
+        raise ValueError("Dòng dữ liệu không hợp lệ")
+    value = record.get(name)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        raise ValueError(f"Thiếu trường {name}")
+    return value.strip() if isinstance(value, str) else value
+
+
+def _number(record, name, convert, message):
+    value = _require(record, name)
+    # JSON true/false and fractional counts are rejected, as int(input()) would
+    if isinstance(value, bool) or (convert is int and isinstance(value, float)
+                                   and not value.is_integer()):
+        raise ValueError(message)
+    try:
+        # float() first so inf/nan are caught before int() overflows on them
+        number = float(value)
+        if not math.isfinite(number):
+            raise ValueError(message)
+        return convert(value)
+    except (TypeError, ValueError):
+        raise ValueError(message) from None
+
+
+def parse_event(record):
+    """Validated event dict, or ValueError"""
+    message = "Giá vé và số lượng vé phải là số dương!"
+    event = {
+        "id": str(_require(record, "id")),
+        "name": str(_require(record, "name")),
+        "ticket_price": _number(record, "ticket_price", float, message),
+        "tickets_left": _number(record, "tickets_left", int, message)
+    }
+    if event["ticket_price"] <= 0 or event["tickets_left"] < 0:
+        raise ValueError(message)
+    return event
+
+
+def parse_sponsor(record):
+    """Validated (sponsor_id, name, amount, event_id or None), or ValueError"""
+    sponsor_id = str(_require(record, "sponsor_id"))
+    name = str(_require(record, "name"))
+    amount = _number(record, "amount", float, "Số tiền tài trợ phải là số dương!")
+    if amount <= 0:
+        raise ValueError("Số tiền tài trợ phải là số dương!")
+    event_id = record.get("event_id")
+    event_id = str(event_id).strip() if event_id is not None else ""
+    return sponsor_id, name, amount, event_id or None
+
+
+def parse_sale(record):
+    """Validated (event_id, quantity), or ValueError"""
+    event_id = str(_require(record, "event_id"))
+    quantity = _number(record, "quantity", int, "Số lượng vé phải là số nguyên dương!")
+    if quantity <= 0:
+        raise ValueError("Số lượng vé phải lớn hơn 0!")
+    return event_id, quantity
+
+
+# ----------------------------------------------------------------------
+# Import
+# ----------------------------------------------------------------------
+
+def import_events(path, events, batch_size=BATCH_SIZE):
+    """Add events from a file to an EventRegistry"""
+    result = ImportResult()
+    for batch in batches(iter_records(path), batch_size):
+        for line_number, record in batch:
+            try:
+                event = parse_event(record)
+                # Also catches an ID repeated earlier in the same file, already added
+                if event["id"] in events:
+                    raise ValueError("Mã sự kiện đã tồn tại!")
+            except ValueError as err:
+                result.errors.append((line_number, str(err)))
+                continue
+            events.add(event)
+            result.imported += 1
+    return result
+
+
+def import_sponsors(path, sponsors, events=None, batch_size=BATCH_SIZE):
+    """Add sponsorship lines from a file to a SponsorLedger, one add_many per batch"""
+    result = ImportResult()
+    for batch in batches(iter_records(path), batch_size):
+        ids, names, amounts, event_ids = [], [], [], []
+        seen = set()
+        for line_number, record in batch:
+            try:
+                sponsor_id, name, amount, event_id = parse_sponsor(record)
+                if sponsor_id in sponsors or sponsor_id in seen:
+                    raise ValueError("Mã nhà tài trợ đã tồn tại!")
+                if event_id is not None and events is not None and event_id not in events:
+                    raise ValueError("Không tìm thấy sự kiện!")
+            except ValueError as err:
+                result.errors.append((line_number, str(err)))
+                continue
+            seen.add(sponsor_id)
+            ids.append(sponsor_id)
+            names.append(name)
+            amounts.append(amount)
+            event_ids.append(event_id)
+        if ids:
+            sponsors.add_many(ids, names, amounts, event_ids)
+            result.imported += len(ids)
+    return result
+
+
+def import_sales(path, ticket_service, batch_size=BATCH_SIZE):
+    """Sell tickets for each (event_id, quantity) record through the TicketService"""
+    # Imported here to keep this module usable without the service
+    from ticket_service import NotEnoughTicketsError
+
+    result = ImportResult()
+    for batch in batches(iter_records(path), batch_size):
+        for line_number, record in batch:
+            try:
+                event_id, quantity = parse_sale(record)
+                ticket_service.sell(event_id, quantity)
+            except NotEnoughTicketsError as err:
+                result.errors.append((line_number, str(err)))
+            except LookupError:
+                result.errors.append((line_number, "Không tìm thấy sự kiện!"))
+            except ValueError as err:
+                result.errors.append((line_number, str(err)))
+            else:
+                result.imported += 1
+        if hasattr(ticket_service.history, "flush"):
+            ticket_service.history.flush()
+    return result
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+
+def export_records(path, fields, rows, batch_size=BATCH_SIZE):
+    """Write tuples in `fields` order to a CSV or JSON Lines file; returns the row count"""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if file_format(path) == "csv":
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(fields)
+            for batch in batches(rows, batch_size):
+                writer.writerows(batch)
+                count += len(batch)
+        else:
+            for batch in batches(rows, batch_size):
+                f.write("".join(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n"
+                                for row in batch))
+                count += len(batch)
+    return count
+
+
+def export_events(path, events):
+    return export_records(path, EVENT_FIELDS, (
+        (e['id'], e['name'], e['ticket_price'], e['tickets_left']) for e in events))
+
+
+def export_sponsors(path, sponsors):
+    return export_records(path, SPONSOR_FIELDS, (
+        (sponsor_id, name, amount, sponsors.event_of(sponsor_id) or "")
+        for sponsor_id, (name, amount) in sponsors.items()))
+
+
+def export_sales(path, history):
+    return export_records(path, SALE_FIELDS, (
+        (t['event_id'], t['ticket_id'], t['quantity']) for t in history))
@@ -0,0 +1,72 @@
+"""Event registry keyed by event ID.
+
+Events used to live in a plain list, so every lookup and delete had to scan
+it. The registry keeps them in a dict: add/get/update/delete are O(1), and
+iteration still follows insertion order, so listings look the same as before.
+
+Code that keeps derived data (aggregates, indexes) can subscribe() to be told
+the ID of every event that was added, edited or removed. Code that edits an
+event dict in place, like the ticket service, calls notify() itself.
+"""
+
+
+class EventRegistry:
+    """Ordered collection of event dicts, indexed by their 'id'"""
+
+    def __init__(self, events=()):
+        """Build the registry from an iterable of event dicts"""
+        self._events = {}
+        self._listeners = []
+        for event in events:
+            self.add(event)
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        """Iterate over events in insertion order"""
+        return iter(self._events.values())
+
+    def __contains__(self, event_id):
+        return event_id in self._events
+
+    def subscribe(self, callback):
+        """Call callback(event_id) whenever an event is added, changed or removed"""
+        self._listeners.append(callback)
+
+    def notify(self, event_id):
+        """Tell subscribers that an event changed"""
+        for callback in self._listeners:
+            callback(event_id)
+
+    def add(self, event):
+        """Add a new event; raises ValueError if the ID is already taken"""
+        event_id = event["id"]
+        if event_id in self._events:
+            raise ValueError(f"Event ID already exists: {event_id}")
+        self._events[event_id] = event
+        self.notify(event_id)
+        return event
+
+    def get(self, event_id):
+        """Return the event with the given ID, or None"""
+        return self._events.get(event_id)
+
+    def update(self, event_id, **changes):
+        """Update fields of an event in place; returns the event or None"""
+        event = self._events.get(event_id)
+        if event is not None:
+            event.update(changes)
+            self.notify(event_id)
+        return event
+
+    def remove(self, event_id):
+        """Delete an event and return it, or None if it does not exist"""
+        event = self._events.pop(event_id, None)
+        if event is not None:
+            self.notify(event_id)
+        return event
+
+    def ids(self):
+        """Return the event IDs in insertion order"""
+        return list(self._events)
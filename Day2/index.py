@@ -1,25 +1,72 @@
-import numpy as np
+import math
 
+import bulk_io
+from event_registry import EventRegistry
+from low_stock_index import LowStockIndex
+from price_stats import PriceStats
+from sales_aggregates import SalesAggregates
+from sponsor_ledger import SponsorLedger
+from ticket_log import TicketLog
+from ticket_service import NotEnoughTicketsError, TicketService
 
-events = [
+
+# Events are indexed by ID for O(1) lookups; iteration keeps insertion order
+events = EventRegistry([
     {"id": "EV001", "name": "Lễ hội âm nhạc quốc tế", "ticket_price": 150000.0, "tickets_left": 300},
     {"id": "EV002", "name": "Triển lãm công nghệ", "ticket_price": 85000.0, "tickets_left": 250},
     {"id": "EV003", "name": "Workshop thiết kế đồ họa", "ticket_price": 120000.0, "tickets_left": 80},
     {"id": "EV004", "name": "Hội chợ du lịch", "ticket_price": 70000.0, "tickets_left": 400},
     {"id": "EV005", "name": "Buổi ra mắt sách", "ticket_price": 45000.0, "tickets_left": 150}
-]
+])
 
-sponsors = {
+# Sponsor ID -> (name, amount), stored in NumPy columns for bulk analytics
+sponsors = SponsorLedger({
     "SP001": ("Tập đoàn XYZ", 10000000.0),
     "SP002": ("Công ty Du lịch ABC", 7500000.0),
     "SP003": ("Ngân hàng Thịnh Vượng", 15000000.0),
     "SP004": ("Tập đoàn Viễn thông VN", 8000000.0)
-}
+})
 
 
 events_with_sales = set()
 
-ticket_history = []
+# File to keep the ticket history in across runs (None: memory only)
+TICKET_LOG_PATH = None
+
+# Compact append-only log: 12 bytes per sale instead of a dict
+ticket_history = TicketLog(TICKET_LOG_PATH)
+events_with_sales.update(ticket_history.event_ids_with_sales())
+
+# All ticket sales go through the service: per-event locks and unique ticket IDs
+ticket_service = TicketService(events, ticket_history, events_with_sales)
+
+# Report figures kept up to date on every sale and edit
+sales_aggregates = SalesAggregates(events, ticket_service)
+sales_aggregates.load_history(ticket_history)
+
+# Events are "almost sold out" below this many tickets
+LOW_TICKET_THRESHOLD = 20
+
+# Events sorted by tickets left, for low-stock queries and alerts
+low_stock_index = LowStockIndex(events)
+
+# Ticket price count/sum/min/max and quantiles, updated on every add/edit/delete
+price_stats = PriceStats(events)
+
+def reset_event_data(new_events, ticket_log_path=None):
+    """Function to replace events and ticket history (e.g. for benchmarks) and rebuild everything derived from them"""
+    global events, events_with_sales, ticket_history, ticket_service
+    global sales_aggregates, low_stock_index, price_stats
+    
+    ticket_history.close()
+    events = EventRegistry(new_events)
+    ticket_history = TicketLog(ticket_log_path)
+    events_with_sales = ticket_history.event_ids_with_sales()
+    ticket_service = TicketService(events, ticket_history, events_with_sales)
+    sales_aggregates = SalesAggregates(events, ticket_service)
+    sales_aggregates.load_history(ticket_history)
+    low_stock_index = LowStockIndex(events)
+    price_stats = PriceStats(events)
 
 def manage_events():
     """Function to manage events with CRUD operations"""
@@ -32,7 +79,7 @@ def manage_events():
         print("3. Cập nhật số lượng vé")
         print("4. Xem thông tin sự kiện")
         print("5. Xem tất cả sự kiện")
-        print("6. Tính giá vé trung bình")
+        print("6. Thống kê giá vé")
         print("7. Quay lại")
         
         choice = input("Chọn chức năng: ")
@@ -40,7 +87,7 @@ def manage_events():
         if choice == "1":
             # Add new event
             event_id = input("Nhập mã sự kiện: ")
-            if any(e['id'] == event_id for e in events):
+            if event_id in events:
                 print("Mã sự kiện đã tồn tại!")
                 continue
                 
@@ -48,7 +95,7 @@ def manage_events():
             try:
                 price = float(input("Nhập giá vé: "))
                 tickets = int(input("Nhập số lượng vé: "))
-                if price <= 0 or tickets < 0:
+                if not math.isfinite(price) or price <= 0 or tickets < 0:
                     raise ValueError
             except ValueError:
                 print("Giá vé và số lượng vé phải là số dương!")
@@ -60,7 +107,7 @@ def manage_events():
                 "ticket_price": price,
                 "tickets_left": tickets
             }
-            events.append(new_event)
+            events.add(new_event)
             print("\n=== THÊM SỰ KIỆN THÀNH CÔNG ===")
             print(f"Mã sự kiện: {event_id}")
             print(f"Tên sự kiện: {name}")
@@ -70,52 +117,46 @@ def manage_events():
         elif choice == "2":
             # Delete event
             event_id = input("Nhập mã sự kiện cần xóa: ")
-            for i, e in enumerate(events):
-                if e['id'] == event_id:
-                    deleted_event = events[i]
-                    del events[i]
-                    print("\n=== XÓA SỰ KIỆN THÀNH CÔNG ===")
-                    print(f"Mã sự kiện: {deleted_event['id']}")
-                    print(f"Tên sự kiện: {deleted_event['name']}")
-                    print(f"Giá vé: {deleted_event['ticket_price']:,.0f} VNĐ")
-                    print(f"Số lượng vé còn lại: {deleted_event['tickets_left']}")
-                    break
+            deleted_event = events.remove(event_id)
+            if deleted_event:
+                print("\n=== XÓA SỰ KIỆN THÀNH CÔNG ===")
+                print(f"Mã sự kiện: {deleted_event['id']}")
+                print(f"Tên sự kiện: {deleted_event['name']}")
+                print(f"Giá vé: {deleted_event['ticket_price']:,.0f} VNĐ")
+                print(f"Số lượng vé còn lại: {deleted_event['tickets_left']}")
             else:
                 print("Không tìm thấy sự kiện!")
                 
         elif choice == "3":
             # Update tickets
             event_id = input("Nhập mã sự kiện cần cập nhật: ")
-            for e in events:
-                if e['id'] == event_id:
-                    try:
-                        old_tickets = e['tickets_left']
-                        new_tickets = int(input("Nhập số lượng vé mới: "))
-                        if new_tickets < 0:
-                            raise ValueError
-                        e['tickets_left'] = new_tickets
-                        print("\n=== CẬP NHẬT SỐ LƯỢNG VÉ THÀNH CÔNG ===")
-                        print(f"Mã sự kiện: {e['id']}")
-                        print(f"Tên sự kiện: {e['name']}")
-                        print(f"Số lượng vé cũ: {old_tickets}")
-                        print(f"Số lượng vé mới: {new_tickets}")
-                        print(f"Thay đổi: {new_tickets - old_tickets:+d} vé")
-                    except ValueError:
-                        print("Số lượng vé phải là số nguyên dương!")
-                    break
+            e = events.get(event_id)
+            if e:
+                try:
+                    new_tickets = int(input("Nhập số lượng vé mới: "))
+                    if new_tickets < 0:
+                        raise ValueError
+                    old_tickets = ticket_service.set_tickets(event_id, new_tickets)
+                    print("\n=== CẬP NHẬT SỐ LƯỢNG VÉ THÀNH CÔNG ===")
+                    print(f"Mã sự kiện: {e['id']}")
+                    print(f"Tên sự kiện: {e['name']}")
+                    print(f"Số lượng vé cũ: {old_tickets}")
+                    print(f"Số lượng vé mới: {new_tickets}")
+                    print(f"Thay đổi: {new_tickets - old_tickets:+d} vé")
+                except ValueError:
+                    print("Số lượng vé phải là số nguyên dương!")
             else:
                 print("Không tìm thấy sự kiện!")
                 
         elif choice == "4":
             # View event info
             event_id = input("Nhập mã sự kiện cần xem: ")
-            for e in events:
-                if e['id'] == event_id:
-                    print(f"\nThông tin sự kiện {event_id}:")
-                    print(f"Tên: {e['name']}")
-                    print(f"Giá vé: {e['ticket_price']:,.0f} VNĐ")
-                    print(f"Số lượng vé còn lại: {e['tickets_left']}")
-                    break
+            e = events.get(event_id)
+            if e:
+                print(f"\nThông tin sự kiện {event_id}:")
+                print(f"Tên: {e['name']}")
+                print(f"Giá vé: {e['ticket_price']:,.0f} VNĐ")
+                print(f"Số lượng vé còn lại: {e['tickets_left']}")
             else:
                 print("Không tìm thấy sự kiện!")
                 
@@ -126,10 +167,11 @@ def manage_events():
                 print(f"{e['id']}: {e['name']} - Giá vé: {e['ticket_price']:,.0f} VNĐ - Còn lại: {e['tickets_left']} vé")
                 
         elif choice == "6":
-         
-            prices = np.array([e['ticket_price'] for e in events])
-            avg_price = np.mean(prices)
-            print(f"Giá vé trung bình: {avg_price:,.0f} VNĐ")
+            # Kept up to date incrementally, no pass over all events
+            stats = price_stats.summary()
+            print(f"Giá vé trung bình: {stats['mean']:,.0f} VNĐ")
+            print(f"Giá vé thấp nhất: {stats['min']:,.0f} VNĐ - Cao nhất: {stats['max']:,.0f} VNĐ")
+            print(f"Trung vị: {stats['median']:,.0f} VNĐ - P90: {stats['p90']:,.0f} VNĐ")
             
         elif choice == "7":
             break
@@ -147,7 +189,8 @@ def manage_sponsors():
         print("3. Cập nhật số tiền tài trợ")
         print("4. Xem thông tin nhà tài trợ")
         print("5. Xem tất cả nhà tài trợ")
-        print("6. Quay lại")
+        print("6. Thống kê tài trợ")
+        print("7. Quay lại")
         
         choice = input("Chọn chức năng: ")
         
@@ -161,13 +204,18 @@ def manage_sponsors():
             name = input("Nhập tên nhà tài trợ: ")
             try:
                 amount = float(input("Nhập số tiền tài trợ: "))
-                if amount <= 0:
+                if not math.isfinite(amount) or amount <= 0:
                     raise ValueError
             except ValueError:
                 print("Số tiền tài trợ phải là số dương!")
                 continue
                 
-            sponsors[sponsor_id] = (name, amount)
+            event_id = input("Nhập mã sự kiện được tài trợ (bỏ trống nếu tài trợ chung): ").strip()
+            if event_id and event_id not in events:
+                print("Không tìm thấy sự kiện!")
+                continue
+            
+            sponsors.add(sponsor_id, name, amount, event_id or None)
             print("Thêm nhà tài trợ thành công!")
             
         elif choice == "2":
@@ -185,7 +233,7 @@ def manage_sponsors():
             if sponsor_id in sponsors:
                 try:
                     new_amount = float(input("Nhập số tiền tài trợ mới: "))
-                    if new_amount <= 0:
+                    if not math.isfinite(new_amount) or new_amount <= 0:
                         raise ValueError
                     name = sponsors[sponsor_id][0]
                     sponsors[sponsor_id] = (name, new_amount)
@@ -213,6 +261,20 @@ def manage_sponsors():
                 print(f"{sponsor_id}: {name} - Tài trợ: {amount:,.0f} VNĐ")
                 
         elif choice == "6":
+            # Sponsorship statistics, computed on the NumPy columns
+            print("\n=== THỐNG KÊ TÀI TRỢ ===")
+            print(f"Tổng tài trợ: {sponsors.total():,.0f} VNĐ")
+            p50, p90, p99 = sponsors.percentiles((50, 90, 99)).values()
+            print(f"Trung vị: {p50:,.0f} VNĐ - P90: {p90:,.0f} VNĐ - P99: {p99:,.0f} VNĐ")
+            print("Nhà tài trợ lớn nhất:")
+            for sponsor_id, name, amount in sponsors.top(3):
+                print(f"- {sponsor_id}: {name} - {amount:,.0f} VNĐ")
+            print(f"Tỷ lệ tài trợ / giá trị vé còn lại: {sponsors.overall_coverage(sales_aggregates.total_value):.2%}")
+            for event_id, ratio in sponsors.coverage(events).items():
+                if ratio:
+                    print(f"- {event_id}: {ratio:.2%}")
+            
+        elif choice == "7":
             break
         else:
             print("Lựa chọn không hợp lệ!")
@@ -235,18 +297,9 @@ def process_tickets():
             # Add ticket transaction
             event_id = input("Nhập mã sự kiện: ")
             
-            # Find the event
-            event = None
-            for e in events:
-                if e['id'] == event_id:
-                    event = e
-                    break
-            
-            if not event:
+            if event_id not in events:
                 print("Không tìm thấy sự kiện!")
                 continue
-                
-            ticket_id = f"TICKET_{len(ticket_history)+1:03d}"
             
             try:
                 quantity = int(input("Nhập số lượng vé bán: "))
@@ -254,25 +307,15 @@ def process_tickets():
                     print("Số lượng vé phải lớn hơn 0!")
                     continue
                 
-                if quantity > event['tickets_left']:
-                    print(f"Chỉ còn {event['tickets_left']} vé cho sự kiện này!")
-                    continue
-                
-                # Update tickets left
-                event['tickets_left'] -= quantity
-                
-                # Add to sales set
-                events_with_sales.add(event_id)
-                
-                # Add to history
-                ticket_history.append({
-                    "event_id": event_id,
-                    "ticket_id": ticket_id,
-                    "quantity": quantity
-                })
-                
-                print(f"Thêm giao dịch {ticket_id} thành công!")
+                # Check and decrement tickets_left atomically, then record the sale
+                transaction = ticket_service.sell(event_id, quantity)
+                ticket_history.flush()
+                print(f"Thêm giao dịch {transaction['ticket_id']} thành công!")
                 
+            except NotEnoughTicketsError as err:
+                print(err)
+            except LookupError:
+                print("Không tìm thấy sự kiện!")
             except ValueError:
                 print("Số lượng vé phải là số nguyên dương!")
                 
@@ -292,11 +335,8 @@ def process_tickets():
                 
         elif choice == "4":
             
-            removed = 0
-            for i in range(len(ticket_history)-1, -1, -1):
-                if ticket_history[i]['quantity'] == 0:
-                    del ticket_history[i]
-                    removed += 1
+            # Drop zero-quantity records in one pass over the log
+            removed = ticket_history.compact(min_quantity=1)
             
             print(f"Đã xóa {removed} giao dịch không hợp lệ!")
             
@@ -305,44 +345,100 @@ def process_tickets():
         else:
             print("Lựa chọn không hợp lệ!")
 
+def build_report():
+    """Function to collect the statistics shown by generate_report"""
+    return {
+        "low_ticket_events": low_stock_index.below(LOW_TICKET_THRESHOLD),
+        "total_value": sales_aggregates.total_value,
+        "events_with_sales": sales_aggregates.events_with_sales(),
+        "tickets_sold": dict(sales_aggregates.tickets_sold),
+        "revenue": dict(sales_aggregates.revenue)
+    }
+
 def generate_report():
     """Function to generate statistics report"""
-    global events, ticket_history
+    report = build_report()
     
     print("\n=== BÁO CÁO THỐNG KÊ ===")
     
-    # Events with low tickets
-    low_ticket_events = [e for e in events if e['tickets_left'] < 20]
-    if low_ticket_events:
+    if report["low_ticket_events"]:
         print("\nSự kiện sắp hết vé:")
-        for e in low_ticket_events:
+        for e in report["low_ticket_events"]:
             print(f"- {e['name']} (còn {e['tickets_left']} vé)")
     else:
         print("\nKhông có sự kiện nào sắp hết vé.")
     
-    # Total remaining ticket value
-    ticket_values = np.array([e['ticket_price'] * e['tickets_left'] for e in events])
-    total_value = np.sum(ticket_values)
-    print(f"\nTổng giá trị vé còn lại: {total_value:,.0f} VNĐ")
+    print(f"\nTổng giá trị vé còn lại: {report['total_value']:,.0f} VNĐ")
     
-    # Events with sales
-    unique_events_with_sales = {t['event_id'] for t in ticket_history}
-    if unique_events_with_sales:
+    if report["events_with_sales"]:
         print("\nSự kiện đã bán vé:")
-        for event_id in unique_events_with_sales:
+        for event_id in report["events_with_sales"]:
             print(f"- {event_id}")
     else:
         print("\nChưa có sự kiện nào bán vé.")
 
+def print_low_stock_alert(event, old_tickets, new_tickets):
+    """Console alert when a sale pushes an event below LOW_TICKET_THRESHOLD"""
+    print(f"Cảnh báo: {event['name']} sắp hết vé (còn {new_tickets} vé)")
+
+def manage_bulk_data():
+    """Function to import/export events, sponsors and sales from CSV or JSON Lines files"""
+    while True:
+        print("\n=== NHẬP/XUẤT DỮ LIỆU HÀNG LOẠT ===")
+        print("1. Nhập sự kiện")
+        print("2. Nhập nhà tài trợ")
+        print("3. Nhập giao dịch bán vé")
+        print("4. Xuất sự kiện")
+        print("5. Xuất nhà tài trợ")
+        print("6. Xuất lịch sử bán vé")
+        print("7. Quay lại")
+        
+        choice = input("Chọn chức năng: ")
+        if choice == "7":
+            break
+        if choice not in ("1", "2", "3", "4", "5", "6"):
+            print("Lựa chọn không hợp lệ!")
+            continue
+        
+        path = input("Nhập đường dẫn file (.csv hoặc .jsonl): ").strip()
+        try:
+            if choice == "1":
+                result = bulk_io.import_events(path, events)
+            elif choice == "2":
+                result = bulk_io.import_sponsors(path, sponsors, events)
+            elif choice == "3":
+                result = bulk_io.import_sales(path, ticket_service)
+            else:
+                exporter, data = {
+                    "4": (bulk_io.export_events, events),
+                    "5": (bulk_io.export_sponsors, sponsors),
+                    "6": (bulk_io.export_sales, ticket_history)
+                }[choice]
+                print(f"Đã xuất {exporter(path, data)} dòng ra {path}")
+                continue
+        except (OSError, ValueError) as err:
+            print(f"Lỗi: {err}")
+            continue
+        
+        # One summary instead of a message per record
+        print(f"Đã nhập {result.imported} dòng, bỏ qua {result.rejected} dòng lỗi")
+        for line_number, message in result.errors[:10]:
+            print(f"- Dòng {line_number}: {message}")
+        if result.rejected > 10:
+            print(f"... và {result.rejected - 10} lỗi khác")
+
 def main():
     """Main function to run the program"""
+    low_stock_index.watch(LOW_TICKET_THRESHOLD, print_low_stock_alert)
+    
     while True:
         print("\n=== CHƯƠNG TRÌNH QUẢN LÝ SỰ KIỆN VĂN HÓA ===")
         print("1. Quản lý sự kiện")
         print("2. Quản lý nhà tài trợ")
         print("3. Quản lý vé đã bán")
         print("4. Báo cáo thống kê")
-        print("5. Thoát")
+        print("5. Nhập/xuất dữ liệu hàng loạt")
+        print("6. Thoát")
         
         choice = input("Chọn chức năng: ")
         
@@ -355,6 +451,9 @@ def main():
         elif choice == "4":
             generate_report()
         elif choice == "5":
+            manage_bulk_data()
+        elif choice == "6":
+            ticket_history.close()
             print("Cảm ơn đã sử dụng chương trình!")
             break
         else:
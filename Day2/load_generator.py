@@ -0,0 +1,131 @@
+"""Load generator for the ticket-sale server.
+
+Opens many concurrent connections (one per simulated buyer), each sending
+sell requests back to back for a fixed duration, and reports sustained
+sales/sec and request latency percentiles.
+
+Usage:
+    python ticket_server.py --demo-events 100 &
+    python load_generator.py --buyers 200 --duration 10
+    python load_generator.py --unix /tmp/tickets.sock --buyers 500 --json result.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(-(-p * len(sorted_values) // 100), 1)
+    return sorted_values[min(int(rank), len(sorted_values)) - 1]
+
+
+async def _connect(host, port, unix_path):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def _request(reader, writer, request):
+    writer.write(json.dumps(request).encode() + b"\n")
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Server closed the connection")
+    return json.loads(line)
+
+
+async def buyer(host, port, unix_path, event_ids, deadline, max_quantity, seed, latencies, counts):
+    """One simulated buyer: sell requests in a loop until the deadline"""
+    rng = random.Random(seed)
+    reader, writer = await _connect(host, port, unix_path)
+    try:
+        while time.perf_counter() < deadline:
+            request = {"op": "sell", "event_id": rng.choice(event_ids),
+                       "quantity": rng.randint(1, max_quantity)}
+            start = time.perf_counter()
+            reply = await _request(reader, writer, request)
+            latencies.append(time.perf_counter() - start)
+            if reply["ok"]:
+                counts["sold"] += 1
+                counts["tickets"] += request["quantity"]
+            else:
+                counts["rejected"] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(host="127.0.0.1", port=8765, unix_path=None, buyers=100,
+                   duration=10.0, max_quantity=4, event_ids=None, seed=1):
+    """Run the load test and return a dict of results"""
+    # Ask the server which events exist unless they were given explicitly
+    if not event_ids:
+        reader, writer = await _connect(host, port, unix_path)
+        reply = await _request(reader, writer, {"op": "list"})
+        writer.close()
+        event_ids = [e["id"] for e in reply["events"]]
+
+    latencies = []
+    counts = {"sold": 0, "rejected": 0, "tickets": 0}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        buyer(host, port, unix_path, event_ids, deadline, max_quantity, seed + i, latencies, counts)
+        for i in range(buyers)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    requests = len(latencies)
+    return {
+        "buyers": buyers,
+        "duration_s": elapsed,
+        "requests": requests,
+        "requests_per_s": requests / elapsed,
+        "sales": counts["sold"],
+        "sales_per_s": counts["sold"] / elapsed,
+        "tickets_sold": counts["tickets"],
+        "rejected": counts["rejected"],
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "p999_ms": percentile(latencies, 99.9) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for ticket_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Connect to a Unix socket instead of TCP")
+    parser.add_argument("--buyers", type=int, nargs="+", default=[100],
+                        help="Concurrent buyers (several values run one test each)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per test")
+    parser.add_argument("--max-quantity", type=int, default=4, help="Max tickets per sale")
+    parser.add_argument("--events", nargs="+", help="Event IDs to buy (default: all)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'Buyers':<8} {'Sales/s':<10} {'Req/s':<10} {'Rejected':<10} "
+          f"{'p50 (ms)':<10} {'p99 (ms)':<10} {'p99.9 (ms)':<10}")
+    print("-" * 72)
+    for buyers in args.buyers:
+        result = asyncio.run(run_load(args.host, args.port, args.unix, buyers,
+                                      args.duration, args.max_quantity, args.events))
+        results.append(result)
+        print(f"{result['buyers']:<8} {result['sales_per_s']:<10,.0f} {result['requests_per_s']:<10,.0f} "
+              f"{result['rejected']:<10} {result['p50_ms']:<10.2f} {result['p99_ms']:<10.2f} "
+              f"{result['p999_ms']:<10.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
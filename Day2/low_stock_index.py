@@ -0,0 +1,106 @@
+"""Sorted index of events by tickets left, with threshold alerts.
+
+Finding "events almost sold out" used to mean scanning every event. This index
+groups events into buckets by their exact tickets_left, with a sorted list of
+the ticket counts that currently have a bucket. It is updated from the
+registry's change notifications: a sale moves one event between two buckets
+in O(1), and the sorted list only changes when a bucket appears or empties
+(it holds distinct ticket counts, not events, so it stays short). "All events
+with fewer than N tickets" is a binary search plus the k matching rows.
+
+Callers can also watch() a threshold and get a callback the moment an event
+drops below it, instead of polling. Callbacks run on the thread that made the
+sale, while the event's lock is held, so they should be quick (log, enqueue).
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+
+class LowStockIndex:
+    """Events ordered by tickets_left, kept in sync with an EventRegistry"""
+
+    def __init__(self, events):
+        """Index every event in the registry and subscribe to its changes"""
+        self.events = events
+        self._buckets = {}  # tickets_left -> {event_id: None}, insertion-ordered
+        self._levels = []  # sorted tickets_left values that have a bucket
+        self._current = {}  # event_id -> tickets_left as indexed
+        self._thresholds = []  # sorted thresholds with at least one watcher
+        self._watchers = {}  # threshold -> [callback, ...]
+        self._lock = threading.Lock()
+        for event in events:
+            self.event_changed(event['id'])
+        events.subscribe(self.event_changed)
+
+    def __len__(self):
+        return len(self._current)
+
+    def watch(self, threshold, callback):
+        """Call callback(event, old_tickets, new_tickets) when an event drops below threshold"""
+        with self._lock:
+            if threshold not in self._watchers:
+                insort(self._thresholds, threshold)
+                self._watchers[threshold] = []
+            self._watchers[threshold].append(callback)
+
+    def unwatch(self, threshold, callback):
+        with self._lock:
+            callbacks = self._watchers.get(threshold, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks and threshold in self._watchers:
+                del self._watchers[threshold]
+                self._thresholds.remove(threshold)
+
+    def event_changed(self, event_id):
+        """Registry callback: move one event to its new position"""
+        event = self.events.get(event_id)
+        with self._lock:
+            old = self._current.pop(event_id, None)
+            new = event['tickets_left'] if event is not None else None
+            if old == new:
+                if new is not None:
+                    self._current[event_id] = new
+                return
+            if old is not None:
+                bucket = self._buckets[old]
+                del bucket[event_id]
+                if not bucket:
+                    del self._buckets[old]
+                    del self._levels[bisect_left(self._levels, old)]
+            if new is None:
+                return
+            self._current[event_id] = new
+            bucket = self._buckets.get(new)
+            if bucket is None:
+                bucket = self._buckets[new] = {}
+                insort(self._levels, new)
+            bucket[event_id] = None
+
+            # Thresholds crossed on the way down: new < threshold <= old
+            crossed = []
+            if old is not None and new < old:
+                start = bisect_right(self._thresholds, new)
+                stop = bisect_right(self._thresholds, old)
+                for threshold in self._thresholds[start:stop]:
+                    crossed.extend(self._watchers[threshold])
+        for callback in crossed:
+            callback(event, old, new)
+
+    def _lookup(self, ids):
+        # An event may have been removed since the lock was released
+        events = (self.events.get(event_id) for event_id in ids)
+        return [event for event in events if event is not None]
+
+    def below(self, n):
+        """Events with fewer than n tickets left, fewest first"""
+        return self.between(float("-inf"), n)
+
+    def between(self, low, high):
+        """Events with low <= tickets_left < high, fewest first"""
+        with self._lock:
+            start = bisect_left(self._levels, low)
+            stop = bisect_left(self._levels, high)
+            ids = [event_id for level in self._levels[start:stop] for event_id in self._buckets[level]]
+        return self._lookup(ids)
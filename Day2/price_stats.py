@@ -0,0 +1,135 @@
+"""Incremental ticket-price statistics.
+
+Option 6 of the event menu used to build a NumPy array of every ticket price
+just to take the mean. PriceStats instead follows the registry's change
+notifications and keeps count, sum, min and max up to date, plus a streaming
+quantile sketch for the median / p90.
+
+The sketch puts each price into a logarithmic bucket (bucket k holds prices in
+(gamma^(k-1), gamma^k], gamma = (1 + a) / (1 - a)), so any quantile it reports
+is within a relative error `a` (1% by default) of the true one. The number of
+buckets depends only on the price range (about 1,000 for 1 VNĐ to 1 billion VNĐ
+at 1%), not on how many events there are, so every query runs in bounded time.
+Each bucket also counts its exact prices, which keeps min/max exact even when
+the current minimum or maximum event is deleted (only the distinct prices of
+the lowest/highest bucket are looked at).
+"""
+
+import math
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+class PriceStats:
+    """count/sum/min/max and approximate quantiles of ticket_price"""
+
+    def __init__(self, events, relative_accuracy=0.01):
+        """Index every event in the registry and subscribe to its changes"""
+        self.events = events
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.count = 0
+        self.total = 0.0
+        self._prices = {}  # event_id -> price as counted
+        self._buckets = {}  # bucket key -> Counter(price -> events)
+        self._bucket_counts = {}  # bucket key -> events in bucket
+        self._keys = []  # sorted non-empty bucket keys
+        self._lock = threading.Lock()
+        for event in events:
+            self.event_changed(event['id'])
+        events.subscribe(self.event_changed)
+
+    def _key(self, price):
+        return math.ceil(math.log(max(price, 1e-9)) / self._log_gamma)
+
+    def _add(self, price):
+        key = self._key(price)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = Counter()
+            self._bucket_counts[key] = 0
+            insort(self._keys, key)
+        bucket[price] += 1
+        self._bucket_counts[key] += 1
+        self.count += 1
+        self.total += price
+
+    def _remove(self, price):
+        key = self._key(price)
+        bucket = self._buckets[key]
+        bucket[price] -= 1
+        if not bucket[price]:
+            del bucket[price]
+        self._bucket_counts[key] -= 1
+        if not self._bucket_counts[key]:
+            del self._buckets[key], self._bucket_counts[key]
+            del self._keys[bisect_left(self._keys, key)]
+        self.count -= 1
+        self.total -= price
+
+    def event_changed(self, event_id):
+        """Registry callback: re-count one event's price if it changed
+
+        Non-finite prices are not counted.
+        """
+        event = self.events.get(event_id)
+        price = event['ticket_price'] if event is not None else None
+        if price is not None and not math.isfinite(price):
+            # inf/nan have no bucket; leave them out rather than fail after
+            # the registry has already stored the event
+            price = None
+        with self._lock:
+            old = self._prices.get(event_id)
+            if old == price:
+                return  # most notifications are ticket sales, not price edits
+            if old is not None:
+                self._remove(old)
+                del self._prices[event_id]
+            if price is not None:
+                self._add(price)
+                self._prices[event_id] = price
+            if not self.count:
+                self.total = 0.0  # drop accumulated rounding error
+
+    def mean(self):
+        with self._lock:
+            return self.total / self.count if self.count else 0.0
+
+    def min(self):
+        with self._lock:
+            return min(self._buckets[self._keys[0]]) if self._keys else 0.0
+
+    def max(self):
+        with self._lock:
+            return max(self._buckets[self._keys[-1]]) if self._keys else 0.0
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), within relative_accuracy"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * (self.count - 1)
+            seen = 0
+            for key in self._keys:
+                seen += self._bucket_counts[key]
+                if seen > rank:
+                    break
+            bucket = self._buckets[key]
+            if len(bucket) == 1:
+                return next(iter(bucket))  # a single distinct price: exact answer
+            # Midpoint of the bucket in relative terms, kept within its real prices
+            estimate = 2 * self._gamma ** key / (self._gamma + 1)
+            return min(max(estimate, min(bucket)), max(bucket))
+
+    def summary(self):
+        """All statistics in one dict"""
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min(),
+            "max": self.max(),
+            "median": self.quantile(0.5),
+            "p90": self.quantile(0.9)
+        }
@@ -0,0 +1,61 @@
+"""Running sales aggregates for the statistics report.
+
+The report used to rebuild a NumPy array over every event and a set over the
+whole ticket history on each call. These aggregates are instead updated on
+every change: the registry tells us when an event's price or ticket count
+changed, and the ticket service tells us about every sale. Each update only
+touches the one event involved, so building the report costs
+O(number of rows it prints). Events running low on tickets are tracked by
+LowStockIndex.
+"""
+
+import threading
+
+
+class SalesAggregates:
+    """Remaining inventory value and per-event sales/revenue"""
+
+    def __init__(self, events, ticket_service=None):
+        """Start tracking an EventRegistry and, if given, sales from a TicketService"""
+        self.events = events
+        self.total_value = 0.0
+        self.tickets_sold = {}  # event_id -> tickets sold
+        self.revenue = {}  # event_id -> revenue at the price when sold
+        self._values = {}  # event_id -> ticket_price * tickets_left
+        self._lock = threading.Lock()
+        for event in events:
+            self.event_changed(event['id'])
+        events.subscribe(self.event_changed)
+        if ticket_service is not None:
+            ticket_service.subscribe(self.sale_recorded)
+
+    def event_changed(self, event_id):
+        """Registry callback: refresh one event's contribution"""
+        with self._lock:
+            event = self.events.get(event_id)
+            self.total_value -= self._values.pop(event_id, 0.0)
+            if event is None:
+                return
+            value = event['ticket_price'] * event['tickets_left']
+            self._values[event_id] = value
+            self.total_value += value
+
+    def sale_recorded(self, transaction):
+        """Ticket service callback: count a confirmed sale"""
+        event_id = transaction['event_id']
+        quantity = transaction['quantity']
+        event = self.events.get(event_id)
+        price = event['ticket_price'] if event is not None else 0.0
+        with self._lock:
+            self.tickets_sold[event_id] = self.tickets_sold.get(event_id, 0) + quantity
+            self.revenue[event_id] = self.revenue.get(event_id, 0.0) + price * quantity
+
+    def load_history(self, history):
+        """Count sales already in the history (once, at startup)"""
+        for transaction in history:
+            self.sale_recorded(transaction)
+
+    def events_with_sales(self):
+        """IDs of events that have sold at least one transaction"""
+        with self._lock:
+            return list(self.tickets_sold)
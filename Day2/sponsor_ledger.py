@@ -0,0 +1,210 @@
+"""Sponsor ledger backed by NumPy arrays.
+
+Sponsorship amounts are stored in a float64 column, with the sponsored event
+(if any) as an int column pointing into a small table of event IDs. Totals,
+percentiles, top-N and event coverage then run as vectorized operations
+instead of Python loops over `(name, amount)` tuples.
+
+The ledger still behaves like the old `sponsors` dict (sponsor_id ->
+(name, amount)), so the console menu keeps working. Deleted rows are only
+marked dead and are compacted away once they outnumber live rows, which keeps
+listing order stable and deletes O(1).
+"""
+
+from collections.abc import MutableMapping
+
+import numpy as np
+
+NO_EVENT = -1
+
+
+class SponsorLedger(MutableMapping):
+    """sponsor_id -> (name, amount), with columnar analytics"""
+
+    def __init__(self, sponsors=None, capacity=1024):
+        """sponsors: optional dict sponsor_id -> (name, amount) to start from"""
+        capacity = max(int(capacity), 1)
+        self._amounts = np.zeros(capacity, dtype=np.float64)
+        self._events = np.full(capacity, NO_EVENT, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._ids = []
+        self._names = []
+        self._rows = {}  # sponsor_id -> row
+        self._event_ids = []
+        self._event_index = {}
+        if sponsors:
+            for sponsor_id, (name, amount) in sponsors.items():
+                self.add(sponsor_id, name, amount)
+
+    # ------------------------------------------------------------------
+    # Dict interface
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, sponsor_id):
+        row = self._rows[sponsor_id]
+        return self._names[row], float(self._amounts[row])
+
+    def __setitem__(self, sponsor_id, value):
+        name, amount = value
+        row = self._rows.get(sponsor_id)
+        if row is None:
+            self.add(sponsor_id, name, amount)
+        else:
+            self._names[row] = name
+            self._amounts[row] = amount
+
+    def __delitem__(self, sponsor_id):
+        row = self._rows.pop(sponsor_id)
+        self._alive[row] = False
+        if len(self._ids) - len(self._rows) > max(len(self._rows), 1024):
+            self.compact()
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, sponsor_id):
+        return sponsor_id in self._rows
+
+    # ------------------------------------------------------------------
+    # Adding and updating
+    # ------------------------------------------------------------------
+
+    def _event_code(self, event_id):
+        if event_id is None:
+            return NO_EVENT
+        code = self._event_index.get(event_id)
+        if code is None:
+            code = len(self._event_ids)
+            self._event_ids.append(event_id)
+            self._event_index[event_id] = code
+        return code
+
+    def _reserve(self, rows):
+        if rows <= len(self._amounts):
+            return
+        capacity = max(rows, 2 * len(self._amounts))
+        for column in ("_amounts", "_events", "_alive"):
+            old = getattr(self, column)
+            new = np.full(capacity, NO_EVENT if column == "_events" else 0, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, column, new)
+
+    def add(self, sponsor_id, name, amount, event_id=None):
+        """Add one sponsorship line; event_id is the sponsored event, if any"""
+        self.add_many([sponsor_id], [name], [amount], None if event_id is None else [event_id])
+
+    def add_many(self, sponsor_ids, names, amounts, event_ids=None):
+        """
+        Bulk import sponsorship lines
+
+        Raises ValueError (and adds nothing) if an ID is duplicated or already
+        exists, or an amount is not positive.
+        """
+        sponsor_ids = list(sponsor_ids)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        names = list(names)
+        if not len(sponsor_ids) == len(names) == len(amounts):
+            raise ValueError("sponsor_ids, names and amounts must have the same length")
+        if len(set(sponsor_ids)) != len(sponsor_ids) or any(s in self._rows for s in sponsor_ids):
+            raise ValueError("Mã nhà tài trợ đã tồn tại!")
+        if (amounts <= 0).any():
+            raise ValueError("Số tiền tài trợ phải là số dương!")
+
+        start = len(self._ids)
+        stop = start + len(sponsor_ids)
+        self._reserve(stop)
+        self._amounts[start:stop] = amounts
+        if event_ids is not None:
+            self._events[start:stop] = [self._event_code(e) for e in event_ids]
+        self._alive[start:stop] = True
+        self._ids.extend(sponsor_ids)
+        self._names.extend(names)
+        self._rows.update(zip(sponsor_ids, range(start, stop)))
+
+    def update_amounts(self, sponsor_ids, amounts):
+        """Batched amount update; all-or-nothing like add_many"""
+        rows = np.fromiter((self._rows[s] for s in sponsor_ids), dtype=np.int64)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if (amounts <= 0).any():
+            raise ValueError("Số tiền tài trợ phải là số dương!")
+        self._amounts[rows] = amounts
+
+    def assign_event(self, sponsor_id, event_id):
+        """Attach a sponsorship line to an event (None to detach)"""
+        self._events[self._rows[sponsor_id]] = self._event_code(event_id)
+
+    def event_of(self, sponsor_id):
+        code = self._events[self._rows[sponsor_id]]
+        return None if code == NO_EVENT else self._event_ids[code]
+
+    def compact(self):
+        """Drop deleted rows from the arrays"""
+        n = len(self._ids)
+        keep = np.flatnonzero(self._alive[:n])
+        self._amounts = self._amounts[keep].copy()
+        self._events = self._events[keep].copy()
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._ids = [self._ids[row] for row in keep]
+        self._names = [self._names[row] for row in keep]
+        self._rows = {sponsor_id: row for row, sponsor_id in enumerate(self._ids)}
+
+    # ------------------------------------------------------------------
+    # Analytics
+    # ------------------------------------------------------------------
+
+    def _live_amounts(self):
+        n = len(self._ids)
+        return self._amounts[:n][self._alive[:n]]
+
+    def total(self):
+        return float(self._live_amounts().sum())
+
+    def percentiles(self, qs=(50, 90, 99)):
+        """Amount percentiles as {q: value}"""
+        amounts = self._live_amounts()
+        if not len(amounts):
+            return {q: 0.0 for q in qs}
+        return dict(zip(qs, np.percentile(amounts, qs).tolist()))
+
+    def top(self, n=3):
+        """Largest n sponsorship lines as [(sponsor_id, name, amount)]"""
+        live = np.flatnonzero(self._alive[:len(self._ids)])
+        amounts = self._amounts[live]
+        n = min(n, len(live))
+        if n <= 0:
+            return []
+        best = np.argpartition(-amounts, n - 1)[:n]
+        best = best[np.argsort(-amounts[best], kind="stable")]
+        return [(self._ids[live[i]], self._names[live[i]], float(amounts[i])) for i in best]
+
+    def sponsorship_by_event(self):
+        """{event_id: total sponsorship} for lines attached to an event"""
+        n = len(self._ids)
+        mask = self._alive[:n] & (self._events[:n] != NO_EVENT)
+        totals = np.bincount(self._events[:n][mask], weights=self._amounts[:n][mask],
+                             minlength=len(self._event_ids))
+        return {self._event_ids[code]: float(total) for code, total in enumerate(totals) if total}
+
+    def coverage(self, events):
+        """
+        Sponsorship / remaining ticket value (ticket_price * tickets_left) per event
+
+        Events with no remaining ticket value get inf if sponsored, else 0.
+        """
+        by_event = self.sponsorship_by_event()
+        event_ids = [e['id'] for e in events]
+        remaining = np.fromiter((e['ticket_price'] * e['tickets_left'] for e in events),
+                                dtype=np.float64, count=len(event_ids))
+        sponsored = np.fromiter((by_event.get(event_id, 0.0) for event_id in event_ids),
+                                dtype=np.float64, count=len(event_ids))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(remaining > 0, sponsored / remaining,
+                              np.where(sponsored > 0, np.inf, 0.0))
+        return dict(zip(event_ids, ratios.tolist()))
+
+    def overall_coverage(self, remaining_value):
+        """Total sponsorship / total remaining ticket value across all events"""
+        return self.total() / remaining_value if remaining_value else 0.0
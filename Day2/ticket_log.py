@@ -0,0 +1,195 @@
+"""Append-only ticket history log.
+
+Each sale is stored as three unsigned 32-bit integers (event index, ticket
+number, quantity) instead of a dict, i.e. 12 bytes per sale: a million sales
+take about 12 MB in memory and on disk. Event IDs are stored once, in a
+sidecar `<path>.events` file with one ID per line; records refer to them by
+position.
+
+In memory the log keeps one `array` per column. On disk, records are appended
+to `<path>` as packed little-endian structs after an 8-byte header, so an
+append is O(1) and a restart only has to read the file back in one go. If the
+process dies mid-write, the incomplete trailing record is dropped on load.
+
+The log behaves like the old `ticket_history` list where the program needs it:
+`append(transaction_dict)`, `len()`, and iteration yielding transaction dicts.
+"""
+
+import os
+import struct
+import sys
+import threading
+from array import array
+
+MAGIC = b"TKLOG1\0\0"
+RECORD = struct.Struct("<III")
+
+
+def ticket_number(ticket_id):
+    """'TICKET_042' -> 42"""
+    return int(ticket_id.rsplit("_", 1)[1])
+
+
+class TicketLog:
+    """Compact, optionally persistent history of ticket transactions"""
+
+    def __init__(self, path=None):
+        """path: file to persist to, or None to keep the log in memory only"""
+        self.path = path
+        self._event_ids = []
+        self._event_index = {}
+        self._events = array("I")
+        self._tickets = array("I")
+        self._quantities = array("I")
+        self.last_ticket_number = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._events_file = None
+        if path is not None:
+            self._load()
+            self._open_files()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        if os.path.exists(self.path + ".events"):
+            with open(self.path + ".events", encoding="utf-8") as f:
+                for line in f:
+                    self._intern_event(line.rstrip("\n"), persist=False)
+
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            header = f.read(len(MAGIC))
+            if header != MAGIC:
+                raise ValueError(f"{self.path} is not a ticket log")
+            data = f.read()
+
+        # Drop a torn record left by a crash in the middle of a write
+        usable = len(data) - len(data) % RECORD.size
+        if usable != len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(len(MAGIC) + usable)
+
+        columns = array("I")
+        columns.frombytes(data[:usable])
+        if sys.byteorder == "big":
+            columns.byteswap()
+        self._events = columns[0::3]
+        self._tickets = columns[1::3]
+        self._quantities = columns[2::3]
+        if self._tickets:
+            self.last_ticket_number = max(self._tickets)
+
+    def _open_files(self):
+        new_file = not os.path.exists(self.path)
+        self._file = open(self.path, "ab")
+        if new_file:
+            self._file.write(MAGIC)
+            self._file.flush()
+        self._events_file = open(self.path + ".events", "a", encoding="utf-8")
+
+    def flush(self):
+        """Push buffered records to the OS"""
+        with self._lock:
+            if self._file is not None:
+                self._events_file.flush()
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._events_file.close()
+                self._file.close()
+                self._file = self._events_file = None
+
+    # ------------------------------------------------------------------
+    # Appending
+    # ------------------------------------------------------------------
+
+    def _intern_event(self, event_id, persist=True):
+        index = self._event_index.get(event_id)
+        if index is None:
+            index = len(self._event_ids)
+            self._event_ids.append(event_id)
+            self._event_index[event_id] = index
+            if persist and self._events_file is not None:
+                # Flushed right away so no record can point to an unsaved ID
+                self._events_file.write(event_id + "\n")
+                self._events_file.flush()
+        return index
+
+    def record(self, event_id, number, quantity):
+        """Append one sale"""
+        with self._lock:
+            event = self._intern_event(event_id)
+            self._events.append(event)
+            self._tickets.append(number)
+            self._quantities.append(quantity)
+            if number > self.last_ticket_number:
+                self.last_ticket_number = number
+            if self._file is not None:
+                self._file.write(RECORD.pack(event, number, quantity))
+
+    def append(self, transaction):
+        """Append a transaction dict (event_id, ticket_id, quantity), like list.append"""
+        self.record(transaction["event_id"], ticket_number(transaction["ticket_id"]),
+                    transaction["quantity"])
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def __iter__(self):
+        """Stream transactions as dicts, oldest first"""
+        # Records appended while iterating are not included, and compaction
+        # swaps in new arrays, so the ones captured here stay consistent
+        events, tickets, quantities = self._events, self._tickets, self._quantities
+        for i in range(len(tickets)):
+            yield {
+                "event_id": self._event_ids[events[i]],
+                "ticket_id": f"TICKET_{tickets[i]:03d}",
+                "quantity": quantities[i]
+            }
+
+    def event_ids_with_sales(self):
+        """Set of event IDs that appear in the log"""
+        return {self._event_ids[i] for i in set(self._events)}
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self, min_quantity=1):
+        """Remove every record with quantity < min_quantity; returns how many were removed"""
+        with self._lock:
+            keep = [i for i, q in enumerate(self._quantities) if q >= min_quantity]
+            removed = len(self._quantities) - len(keep)
+            if not removed:
+                return 0
+
+            self._events = array("I", (self._events[i] for i in keep))
+            self._tickets = array("I", (self._tickets[i] for i in keep))
+            self._quantities = array("I", (self._quantities[i] for i in keep))
+
+            if self._file is not None:
+                # Rewrite into a temporary file, then atomically swap it in
+                self._file.close()
+                tmp_path = self.path + ".tmp"
+                columns = array("I", bytes(RECORD.size * len(keep)))
+                columns[0::3] = self._events
+                columns[1::3] = self._tickets
+                columns[2::3] = self._quantities
+                if sys.byteorder == "big":
+                    columns.byteswap()
+                with open(tmp_path, "wb") as f:
+                    f.write(MAGIC)
+                    f.write(columns.tobytes())
+                os.replace(tmp_path, self.path)
+                self._file = open(self.path, "ab")
+            return removed
@@ -0,0 +1,186 @@
+"""Asyncio ticket-sale server.
+
+Serves the same `events` / `ticket_history` data as the console program over
+a local TCP or Unix socket, so many buyers can be handled at once instead of
+one `input()` at a time.
+
+Protocol: one JSON object per line in each direction.
+
+    {"op": "sell", "event_id": "EV001", "quantity": 2}
+    {"op": "hold", "event_id": "EV001", "quantity": 2, "ttl": 300}
+    {"op": "confirm", "hold_id": "HOLD_001"}
+    {"op": "release", "hold_id": "HOLD_001"}
+    {"op": "get", "event_id": "EV001"}
+    {"op": "list"}
+    {"op": "report"}
+
+Every reply has "ok": true plus the result, or "ok": false and an "error"
+message. An optional "id" field in a request is echoed back in the reply.
+
+Usage:
+    python ticket_server.py --port 8765
+    python ticket_server.py --unix /tmp/tickets.sock --demo-events 1000
+"""
+
+import argparse
+import asyncio
+import json
+
+import index
+from ticket_service import HoldNotFoundError, NotEnoughTicketsError
+
+
+def _event_info(event):
+    return {
+        "id": event['id'],
+        "name": event['name'],
+        "ticket_price": event['ticket_price'],
+        "tickets_left": event['tickets_left']
+    }
+
+
+def _sell(request):
+    return {"transaction": index.ticket_service.sell(request["event_id"], request["quantity"])}
+
+
+def _hold(request):
+    return {"hold_id": index.ticket_service.hold(request["event_id"], request["quantity"],
+                                                 request.get("ttl"))}
+
+
+def _confirm(request):
+    return {"transaction": index.ticket_service.confirm(request["hold_id"])}
+
+
+def _release(request):
+    index.ticket_service.release(request["hold_id"])
+    return {}
+
+
+def _get(request):
+    event = index.events.get(request["event_id"])
+    if event is None:
+        raise LookupError("Không tìm thấy sự kiện!")
+    return {"event": _event_info(event)}
+
+
+def _list(request):
+    return {"events": [_event_info(e) for e in index.events]}
+
+
+def _report(request):
+    report = index.build_report()
+    report["low_ticket_events"] = [_event_info(e) for e in report["low_ticket_events"]]
+    report["transactions"] = len(index.ticket_history)
+    return {"report": report}
+
+
+HANDLERS = {
+    "sell": _sell,
+    "hold": _hold,
+    "confirm": _confirm,
+    "release": _release,
+    "get": _get,
+    "list": _list,
+    "report": _report
+}
+
+
+def handle_request(request):
+    """Run one decoded request and build its reply"""
+    handler = HANDLERS.get(request.get("op"))
+    if handler is None:
+        reply = {"ok": False, "error": f"Unknown op: {request.get('op')}"}
+    else:
+        try:
+            reply = {"ok": True, **handler(request)}
+        except NotEnoughTicketsError as err:
+            reply = {"ok": False, "error": str(err), "tickets_left": err.tickets_left}
+        except HoldNotFoundError:
+            reply = {"ok": False, "error": "Giữ chỗ không tồn tại hoặc đã hết hạn!"}
+        except KeyError as err:
+            reply = {"ok": False, "error": f"Thiếu trường {err} trong yêu cầu"}
+        except LookupError:
+            reply = {"ok": False, "error": "Không tìm thấy sự kiện!"}
+        except (TypeError, ValueError) as err:
+            reply = {"ok": False, "error": f"Yêu cầu không hợp lệ: {err}"}
+    if "id" in request:
+        reply["id"] = request["id"]
+    return reply
+
+
+async def handle_client(reader, writer):
+    """Serve one connection until the client disconnects"""
+    try:
+        while line := await reader.readline():
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError
+            except ValueError:
+                reply = {"ok": False, "error": "Invalid JSON request"}
+            else:
+                reply = handle_request(request)
+            writer.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+            # Only wait for the socket when the client is not reading fast enough
+            if writer.transport.get_write_buffer_size() > 64 * 1024:
+                await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def expire_holds_periodically(interval=1.0):
+    """Give tickets from abandoned carts back to their events"""
+    while True:
+        await asyncio.sleep(interval)
+        index.ticket_service.expire_holds()
+
+
+def add_demo_events(count, tickets):
+    """Add synthetic events (DEMO00001, ...) for load testing"""
+    for i in range(1, count + 1):
+        index.events.add({
+            "id": f"DEMO{i:05d}",
+            "name": f"Sự kiện thử tải {i}",
+            "ticket_price": 100000.0,
+            "tickets_left": tickets
+        })
+
+
+async def serve(host="127.0.0.1", port=8765, unix_path=None):
+    """Start the server and run until cancelled"""
+    if unix_path:
+        server = await asyncio.start_unix_server(handle_client, path=unix_path)
+    else:
+        server = await asyncio.start_server(handle_client, host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Đang phục vụ bán vé tại {addresses}", flush=True)
+
+    expirer = asyncio.create_task(expire_holds_periodically())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        expirer.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio ticket-sale server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--demo-events", type=int, default=0, help="Number of synthetic events to add")
+    parser.add_argument("--demo-tickets", type=int, default=1_000_000, help="Tickets per synthetic event")
+    args = parser.parse_args()
+
+    add_demo_events(args.demo_events, args.demo_tickets)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Thread-safe ticket sales.
+
+Checking `tickets_left` and decrementing it must happen as one step, or two
+sellers can both see the last tickets and oversell. Each event gets its own
+lock, so sales for different events never wait on each other. Ticket IDs come
+from a monotonic counter instead of `len(ticket_history) + 1`, so they stay
+unique even when transactions are removed from the history.
+
+Carts use hold/confirm: a hold takes the tickets out of `tickets_left`
+immediately, and either becomes a sale (confirm) or gives them back
+(release, or expiry after its time-to-live).
+
+All methods only hold a lock for a few dict operations, so they can be
+called from worker threads or directly from asyncio tasks.
+"""
+
+import itertools
+import threading
+import time
+
+
+class TicketError(Exception):
+    """Base class for ticket sale errors"""
+
+
+class EventNotFoundError(TicketError, LookupError):
+    """The event ID does not exist"""
+
+
+class NotEnoughTicketsError(TicketError):
+    """The event has fewer tickets left than requested"""
+
+    def __init__(self, event_id, tickets_left):
+        super().__init__(f"Chỉ còn {tickets_left} vé cho sự kiện này!")
+        self.event_id = event_id
+        self.tickets_left = tickets_left
+
+
+class HoldNotFoundError(TicketError, LookupError):
+    """The hold does not exist, was already confirmed, or has expired"""
+
+
+class TicketService:
+    """Sells tickets for events in an EventRegistry"""
+
+    def __init__(self, events, history=None, events_with_sales=None,
+                 hold_ttl=600.0, clock=time.monotonic):
+        """
+        events: EventRegistry, notified whenever tickets_left changes
+        history / events_with_sales: TicketLog (or list) and set to record confirmed sales in
+        hold_ttl: seconds before an unconfirmed hold is released
+        """
+        self.events = events
+        self.history = [] if history is None else history
+        self.events_with_sales = set() if events_with_sales is None else events_with_sales
+        self.hold_ttl = hold_ttl
+        self._clock = clock
+
+        self._event_locks = {}
+        self._locks_guard = threading.Lock()
+        self._holds = {}  # hold_id -> (event_id, quantity, expires_at)
+        self._holds_lock = threading.Lock()
+        # A TicketLog remembers its highest ticket number even after compaction
+        last_number = getattr(self.history, "last_ticket_number", len(self.history))
+        self._ticket_numbers = itertools.count(last_number + 1)
+        self._hold_numbers = itertools.count(1)
+        self._counter_lock = threading.Lock()
+        self._sale_listeners = []
+
+    def subscribe(self, callback):
+        """Call callback(transaction) after every confirmed sale"""
+        self._sale_listeners.append(callback)
+
+    def lock_for(self, event_id):
+        """Return the lock that guards an event's ticket count"""
+        lock = self._event_locks.get(event_id)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._event_locks.setdefault(event_id, threading.Lock())
+        return lock
+
+    def _next_ticket_id(self):
+        with self._counter_lock:
+            return f"TICKET_{next(self._ticket_numbers):03d}"
+
+    def _take(self, event_id, quantity):
+        """Atomically remove tickets from an event"""
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+            raise ValueError("Số lượng vé phải lớn hơn 0!")
+        with self.lock_for(event_id):
+            event = self.events.get(event_id)
+            if event is None:
+                raise EventNotFoundError(event_id)
+            if quantity > event['tickets_left']:
+                raise NotEnoughTicketsError(event_id, event['tickets_left'])
+            event['tickets_left'] -= quantity
+            self.events.notify(event_id)
+
+    def _give_back(self, event_id, quantity):
+        with self.lock_for(event_id):
+            event = self.events.get(event_id)
+            if event is not None:
+                event['tickets_left'] += quantity
+                self.events.notify(event_id)
+
+    def _record_sale(self, event_id, quantity):
+        transaction = {
+            "event_id": event_id,
+            "ticket_id": self._next_ticket_id(),
+            "quantity": quantity
+        }
+        # list.append and set.add are atomic, no extra lock needed
+        self.events_with_sales.add(event_id)
+        self.history.append(transaction)
+        for callback in self._sale_listeners:
+            callback(transaction)
+        return transaction
+
+    def sell(self, event_id, quantity):
+        """Sell tickets immediately; returns the transaction dict"""
+        self._take(event_id, quantity)
+        return self._record_sale(event_id, quantity)
+
+    def hold(self, event_id, quantity, ttl=None):
+        """Reserve tickets for a cart; returns a hold ID"""
+        if ttl is None:
+            ttl = self.hold_ttl
+        # Checked before taking the tickets, so a bad ttl cannot strand them
+        if not isinstance(ttl, (int, float)) or isinstance(ttl, bool) or not ttl > 0:
+            raise ValueError("Thời gian giữ vé phải là số dương!")
+        self._take(event_id, quantity)
+        expires_at = self._clock() + ttl
+        with self._holds_lock:
+            hold_id = f"HOLD_{next(self._hold_numbers):03d}"
+            self._holds[hold_id] = (event_id, quantity, expires_at)
+        return hold_id
+
+    def _pop_hold(self, hold_id):
+        with self._holds_lock:
+            hold = self._holds.pop(hold_id, None)
+        if hold is None:
+            raise HoldNotFoundError(hold_id)
+        return hold
+
+    def confirm(self, hold_id):
+        """Turn a hold into a sale; returns the transaction dict"""
+        event_id, quantity, expires_at = self._pop_hold(hold_id)
+        if self._clock() >= expires_at:
+            self._give_back(event_id, quantity)
+            raise HoldNotFoundError(hold_id)
+        return self._record_sale(event_id, quantity)
+
+    def release(self, hold_id):
+        """Cancel a hold and return its tickets to the event"""
+        event_id, quantity, _ = self._pop_hold(hold_id)
+        self._give_back(event_id, quantity)
+
+    def expire_holds(self):
+        """Release every hold past its expiry time; returns how many were released"""
+        now = self._clock()
+        with self._holds_lock:
+            expired = [(hold_id, hold) for hold_id, hold in self._holds.items() if hold[2] <= now]
+            for hold_id, _ in expired:
+                del self._holds[hold_id]
+        for _, (event_id, quantity, _) in expired:
+            self._give_back(event_id, quantity)
+        return len(expired)
+
+    def held_tickets(self, event_id):
+        """Number of tickets currently on hold for an event"""
+        with self._holds_lock:
+            return sum(quantity for ev, quantity, _ in self._holds.values() if ev == event_id)
+
+    def set_tickets(self, event_id, tickets_left):
+        """Overwrite an event's ticket count; returns the old count"""
+        with self.lock_for(event_id):
+            event = self.events.get(event_id)
+            if event is None:
+                raise EventNotFoundError(event_id)
+            old = event['tickets_left']
+            event['tickets_left'] = tickets_left
+            self.events.notify(event_id)
+            return old
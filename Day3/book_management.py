@@ -1,9 +1,82 @@
+import sys
+import weakref
+from enum import Enum
+
+
+class TrangThai(str, Enum):
+    MOI = "Mới"
+    CU = "Cũ"
+    TRUNG_BINH = "Trung bình"
+
+    def __str__(self):
+        return self.value
+
+
+class DinhDang(str, Enum):
+    PDF = "PDF"
+    EPUB = "EPUB"
+    MOBI = "MOBI"
+
+    def __str__(self):
+        return self.value
+
+
+def _chuan_hoa(gia_tri, kieu):
+    # Giá trị đã biết dùng chung một thành viên enum, giá trị khác được intern
+    try:
+        return kieu(gia_tri)
+    except ValueError:
+        return sys.intern(gia_tri) if isinstance(gia_tri, str) else gia_tri
+
+
+_theo_doi_ton_kho = []
+
+
+def theo_doi_ton_kho(ham):
+    # Gọi ham(sach, so_luong_cu, so_luong_moi) khi tồn kho tăng hoặc về 0 (giảm
+    # mà vẫn còn sách, như mỗi lần cho mượn, thì không gọi).
+    # Giữ tham chiếu yếu tới phương thức để thư viện cũ không bị giữ lại mãi
+    _theo_doi_ton_kho.append(weakref.WeakMethod(ham) if hasattr(ham, "__self__") else (lambda: ham))
+
+
 class Book:
+    # __slots__ bỏ __dict__ riêng của từng đối tượng để tiết kiệm bộ nhớ
+    __slots__ = ("__ma_sach", "tieu_de", "_tac_gia", "_so_luong_ton")
+
     def __init__(self, ma_sach, tieu_de, tac_gia, so_luong_ton):
         self.__ma_sach = ma_sach
         self.tieu_de = tieu_de
         self.tac_gia = tac_gia
-        self.so_luong_ton = so_luong_ton if so_luong_ton >= 0 else 0
+        self._so_luong_ton = so_luong_ton if so_luong_ton >= 0 else 0
+    
+    @property
+    def ma_sach(self):
+        return self.__ma_sach
+    
+    @property
+    def so_luong_ton(self):
+        return self._so_luong_ton
+    
+    @so_luong_ton.setter
+    def so_luong_ton(self, so_luong_moi):
+        so_luong_cu = self._so_luong_ton
+        self._so_luong_ton = so_luong_moi
+        if (so_luong_moi > so_luong_cu or (so_luong_moi <= 0 < so_luong_cu)) and _theo_doi_ton_kho:
+            for tham_chieu in list(_theo_doi_ton_kho):
+                ham = tham_chieu()
+                if ham is None:
+                    if tham_chieu in _theo_doi_ton_kho:
+                        _theo_doi_ton_kho.remove(tham_chieu)
+                else:
+                    ham(self, so_luong_cu, so_luong_moi)
+    
+    @property
+    def tac_gia(self):
+        return self._tac_gia
+    
+    @tac_gia.setter
+    def tac_gia(self, tac_gia):
+        self._tac_gia = sys.intern(tac_gia) if isinstance(tac_gia, str) else tac_gia
     
     def get_info(self):
         return f"Mã sách: {self.__ma_sach}, Tiêu đề: {self.tieu_de}, Tác giả: {self.tac_gia}, Tồn kho: {self.so_luong_ton}"
@@ -15,17 +88,37 @@ class Book:
             print("Số lượng tồn kho không thể âm")
 
 class PhysicalBook(Book):
+    __slots__ = ("_trang_thai",)
+
     def __init__(self, ma_sach, tieu_de, tac_gia, so_luong_ton, trang_thai):
         super().__init__(ma_sach, tieu_de, tac_gia, so_luong_ton)
         self.trang_thai = trang_thai
     
+    @property
+    def trang_thai(self):
+        return self._trang_thai
+    
+    @trang_thai.setter
+    def trang_thai(self, trang_thai):
+        self._trang_thai = _chuan_hoa(trang_thai, TrangThai)
+    
     def get_info(self):
         return f"{super().get_info()}, Trạng thái: {self.trang_thai}"
 
 class EBook(Book):
+    __slots__ = ("_dinh_dang",)
+
     def __init__(self, ma_sach, tieu_de, tac_gia, so_luong_ton, dinh_dang):
         super().__init__(ma_sach, tieu_de, tac_gia, so_luong_ton)
         self.dinh_dang = dinh_dang
     
+    @property
+    def dinh_dang(self):
+        return self._dinh_dang
+    
+    @dinh_dang.setter
+    def dinh_dang(self, dinh_dang):
+        self._dinh_dang = _chuan_hoa(dinh_dang, DinhDang)
+    
     def get_info(self):
         return f"{super().get_info()}, Định dạng: {self.dinh_dang}"
\ No newline at end of file
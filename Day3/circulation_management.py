@@ -0,0 +1,109 @@
+import threading
+
+from book_management import theo_doi_ton_kho
+
+
+class LuuThong:
+    def __init__(self, thu_vien):
+        self.thu_vien = thu_vien
+        # RLock: cho mượn/trả thay đổi tồn kho, và _doi_ton_kho được gọi lại ngay
+        # trong luồng đang giữ khóa
+        self._khoa = threading.RLock()
+        # ma_sach -> {ma_nguoi_dung: User}, dict giữ thứ tự như một set có thứ tự
+        self._nguoi_muon = {}
+        self._hang_cho = {}
+        theo_doi_ton_kho(self._doi_ton_kho)
+
+    def _cho_muon(self, nguoi_dung, sach):
+        sach.so_luong_ton -= 1
+        self._nguoi_muon.setdefault(sach.ma_sach, {})[nguoi_dung.ma_nguoi_dung] = nguoi_dung
+        nguoi_dung.danh_sach_muon[sach.ma_sach] = self.thu_vien
+
+    def muon(self, nguoi_dung, ma_sach):
+        with self._khoa:
+            sach = self.thu_vien.tim_sach(ma_sach)
+            if sach is None or ma_sach in nguoi_dung.danh_sach_muon:
+                return False
+            # Chỉ giữ lại cho hàng chờ số bản bằng số người đang chờ
+            hang_cho = self._hang_cho.get(ma_sach)
+            if hang_cho and nguoi_dung.ma_nguoi_dung not in hang_cho:
+                if sach.so_luong_ton <= len(hang_cho):
+                    return False
+            elif sach.so_luong_ton <= 0:
+                return False
+            if hang_cho:
+                del hang_cho[nguoi_dung.ma_nguoi_dung]
+                if not hang_cho:
+                    del self._hang_cho[ma_sach]
+            self._cho_muon(nguoi_dung, sach)
+            return True
+
+    def tra(self, nguoi_dung, ma_sach):
+        with self._khoa:
+            dang_muon = self._nguoi_muon.get(ma_sach)
+            if not dang_muon or dang_muon.pop(nguoi_dung.ma_nguoi_dung, None) is None:
+                return False
+            if not dang_muon:
+                del self._nguoi_muon[ma_sach]
+            del nguoi_dung.danh_sach_muon[ma_sach]
+            sach = self.thu_vien.tim_sach(ma_sach)
+            if sach is None:
+                return True
+            # Tồn kho tăng nên _doi_ton_kho chuyển ngay bản vừa trả cho người đầu hàng chờ
+            sach.so_luong_ton += 1
+            return True
+
+    def _doi_ton_kho(self, sach, so_luong_cu, so_luong_moi):
+        # Tồn kho tăng vì bất kỳ lý do gì (trả sách, update_stock): phục vụ hàng chờ
+        if so_luong_moi <= so_luong_cu:
+            return
+        with self._khoa:
+            hang_cho = self._hang_cho.get(sach.ma_sach)
+            if not hang_cho or self.thu_vien.tim_sach(sach.ma_sach) is not sach:
+                return
+            while hang_cho and sach.so_luong_ton > 0:
+                ma_nguoi_dung = next(iter(hang_cho))
+                self._cho_muon(hang_cho.pop(ma_nguoi_dung), sach)
+            if not hang_cho:
+                del self._hang_cho[sach.ma_sach]
+
+    def dat_cho(self, nguoi_dung, ma_sach):
+        with self._khoa:
+            sach = self.thu_vien.tim_sach(ma_sach)
+            if sach is None or ma_sach in nguoi_dung.danh_sach_muon:
+                return False
+            hang_cho = self._hang_cho.get(ma_sach, {})
+            if nguoi_dung.ma_nguoi_dung in hang_cho:
+                return False
+            if sach.so_luong_ton > len(hang_cho):
+                self._cho_muon(nguoi_dung, sach)
+                return True
+            self._hang_cho.setdefault(ma_sach, {})[nguoi_dung.ma_nguoi_dung] = nguoi_dung
+            return True
+
+    def huy_cho(self, nguoi_dung, ma_sach):
+        with self._khoa:
+            hang_cho = self._hang_cho.get(ma_sach)
+            if not hang_cho or hang_cho.pop(nguoi_dung.ma_nguoi_dung, None) is None:
+                return False
+            if not hang_cho:
+                del self._hang_cho[ma_sach]
+            return True
+
+    def so_ban_con(self, ma_sach):
+        sach = self.thu_vien.tim_sach(ma_sach)
+        return sach.so_luong_ton if sach is not None else 0
+
+    def con_sach(self, ma_sach):
+        return self.so_ban_con(ma_sach) > 0
+
+    def nguoi_dang_muon(self, ma_sach):
+        with self._khoa:
+            return list(self._nguoi_muon.get(ma_sach, {}).values())
+
+    def so_nguoi_muon(self, ma_sach):
+        return len(self._nguoi_muon.get(ma_sach, ()))
+
+    def hang_cho(self, ma_sach):
+        with self._khoa:
+            return list(self._hang_cho.get(ma_sach, {}).values())
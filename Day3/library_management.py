@@ -1,40 +1,134 @@
+from bisect import bisect_left, bisect_right
+from itertools import count
+
 from book_management import Book
+from circulation_management import LuuThong
+from search_management import ChiMucTimKiem
 
 class User:
     def __init__(self, ma_nguoi_dung, ten):
         self.__ma_nguoi_dung = ma_nguoi_dung
         self.ten = ten
-        self.danh_sach_muon = []
+        # ma_sach -> thư viện đã mượn; dict giữ thứ tự mượn và cho phép kiểm tra/xóa O(1)
+        self.danh_sach_muon = {}
+    
+    @property
+    def ma_nguoi_dung(self):
+        return self.__ma_nguoi_dung
     
     def borrow_book(self, ma_sach, thu_vien):
-        # Kiểm tra mã sách hợp lệ và tồn tại trong thư viện
-        if isinstance(ma_sach, str) and ma_sach not in self.danh_sach_muon:
-            if any(sach._Book__ma_sach == ma_sach for sach in thu_vien.ds_sach):
-                self.danh_sach_muon.append(ma_sach)
+        # Kiểm tra mã sách hợp lệ, tồn tại trong thư viện và còn bản để mượn
+        if isinstance(ma_sach, str):
+            return thu_vien.luu_thong.muon(self, ma_sach)
+        return False
     
     def return_book(self, ma_sach):
-        if ma_sach in self.danh_sach_muon:
-            self.danh_sach_muon.remove(ma_sach)
+        thu_vien = self.danh_sach_muon.get(ma_sach)
+        if thu_vien is None:
+            return False
+        return thu_vien.luu_thong.tra(self, ma_sach)
     
     def get_borrowed_books(self):
-        return self.danh_sach_muon.copy()
+        return list(self.danh_sach_muon)
 
 class Library:
     def __init__(self, ds_sach):
-        self.ds_sach = ds_sach
-    
+        # Chỉ mục theo tiêu đề, giữ sắp xếp khi thêm/xóa thay vì sort mỗi lần duyệt
+        self._khoa = []
+        self._sach_theo_ten = []
+        self._khoa_cua_sach = {}
+        # ma_sach -> sách, dict giữ thứ tự thêm vào nên không cần thêm một list riêng
+        self._theo_ma = {}
+        self.chi_muc_tim_kiem = ChiMucTimKiem()
+        self._thu_tu = count()
+        if not self.them_nhieu_sach(ds_sach):
+            raise ValueError("Mã sách bị trùng")
+        self.luu_thong = LuuThong(self)
+
+    def them_sach(self, sach):
+        # Mã sách là khóa của _theo_ma và chỉ mục tìm kiếm nên không được trùng
+        if sach.ma_sach in self._theo_ma:
+            return False
+        # Số thứ tự giúp sách trùng tiêu đề giữ thứ tự thêm vào
+        khoa = (sach.tieu_de, next(self._thu_tu))
+        vi_tri = bisect_right(self._khoa, khoa)
+        self._khoa.insert(vi_tri, khoa)
+        self._sach_theo_ten.insert(vi_tri, sach)
+        self._khoa_cua_sach[id(sach)] = khoa
+        self._theo_ma[sach.ma_sach] = sach
+        self.chi_muc_tim_kiem.them(sach)
+        return True
+
+    def them_nhieu_sach(self, ds_sach):
+        # Thêm hàng loạt: sắp xếp một lần thay vì chèn từng cuốn
+        ds_sach = list(ds_sach)
+        # Tất cả hoặc không: có mã trùng (với thư viện hoặc trong lô) thì không thêm cuốn nào
+        cac_ma = {sach.ma_sach for sach in ds_sach}
+        if len(cac_ma) < len(ds_sach) or not cac_ma.isdisjoint(self._theo_ma):
+            return False
+        cap = [((sach.tieu_de, next(self._thu_tu)), sach) for sach in ds_sach]
+        cap.extend(zip(self._khoa, self._sach_theo_ten))
+        cap.sort(key=lambda x: x[0])
+        self._khoa = [khoa for khoa, _ in cap]
+        self._sach_theo_ten = [sach for _, sach in cap]
+        self._khoa_cua_sach.update((id(sach), khoa) for khoa, sach in cap)
+        self._theo_ma.update((sach.ma_sach, sach) for sach in ds_sach)
+        for sach in ds_sach:
+            self.chi_muc_tim_kiem.them(sach)
+        return True
+
+    def xoa_sach(self, sach):
+        khoa = self._khoa_cua_sach.pop(id(sach), None)
+        if khoa is None:
+            return False
+        vi_tri = bisect_left(self._khoa, khoa)
+        del self._khoa[vi_tri]
+        del self._sach_theo_ten[vi_tri]
+        if self._theo_ma.get(sach.ma_sach) is sach:
+            del self._theo_ma[sach.ma_sach]
+            self.chi_muc_tim_kiem.xoa(sach)
+        return True
+
+    @property
+    def ds_sach(self):
+        return list(self._theo_ma.values())
+
+    def tim_sach(self, ma_sach):
+        return self._theo_ma.get(ma_sach)
+
+    def tim_kiem(self, truy_van, chi_con_sach=False, gioi_han=20):
+        return self.chi_muc_tim_kiem.tim(truy_van, chi_con_sach, gioi_han)
+
+    def __contains__(self, ma_sach):
+        return ma_sach in self._theo_ma
+
+    def __len__(self):
+        return len(self._khoa)
+
     def __iter__(self):
-        self.index = 0
-        self.sorted_books = sorted(self.ds_sach, key=lambda x: x.tieu_de)
-        return self
-    
-    def __next__(self):
-        if self.index < len(self.sorted_books):
-            result = self.sorted_books[self.index]
-            self.index += 1
-            return result
-        else:
-            raise StopIteration
+        return self._duyet(0)
+
+    def _duyet(self, vi_tri, tien_to=None):
+        # Mỗi lần duyệt là một generator riêng; nếu thư viện thay đổi giữa chừng
+        # thì tìm lại vị trí theo khóa cuối cùng đã trả về
+        khoa_cuoi = None
+        while True:
+            if khoa_cuoi is not None and (vi_tri > len(self._khoa) or self._khoa[vi_tri - 1] != khoa_cuoi):
+                vi_tri = bisect_right(self._khoa, khoa_cuoi)
+            if vi_tri >= len(self._khoa):
+                return
+            khoa_cuoi = self._khoa[vi_tri]
+            if tien_to is not None and not khoa_cuoi[0].startswith(tien_to):
+                return
+            yield self._sach_theo_ten[vi_tri]
+            vi_tri += 1
+
+    def tim_theo_tien_to(self, tien_to):
+        return self._duyet(bisect_left(self._khoa, (tien_to,)), tien_to)
+
+    def trang(self, so_trang, kich_thuoc=20):
+        bat_dau = max(so_trang - 1, 0) * kich_thuoc
+        return self._sach_theo_ten[bat_dau:bat_dau + kich_thuoc]
 
 def display_books(ds_sach):
     for sach in ds_sach:
@@ -0,0 +1,139 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from book_management import theo_doi_ton_kho
+
+TRONG_SO_TIEU_DE = 2.0
+TRONG_SO_TAC_GIA = 1.0
+# Khớp tiền tố (gõ dở một từ) được ít điểm hơn khớp nguyên từ
+HE_SO_TIEN_TO = 0.5
+
+_TU = re.compile(r"\w+")
+
+
+def bo_dau(van_ban):
+    van_ban = unicodedata.normalize("NFD", van_ban.lower()).replace("đ", "d")
+    return "".join(ky_tu for ky_tu in van_ban if not unicodedata.combining(ky_tu))
+
+
+def tach_tu(van_ban):
+    return _TU.findall(bo_dau(van_ban)) if van_ban else []
+
+
+class ChiMucTimKiem:
+    def __init__(self):
+        self._khoa = threading.Lock()
+        # tu -> {ma_sach: điểm}
+        self._chi_muc = {}
+        self._ds_tu = []
+        self._sach = {}
+        self._tu_cua_sach = {}
+        self._con_sach = set()
+        theo_doi_ton_kho(self._doi_ton_kho)
+
+    def __len__(self):
+        return len(self._sach)
+
+    def them(self, sach):
+        # Mã sách đã có trong chỉ mục thì không thêm; muốn đánh chỉ mục lại dùng cap_nhat
+        diem = self._diem_cua_sach(sach)
+        with self._khoa:
+            if sach.ma_sach in self._sach:
+                return False
+            self._them(sach, diem)
+            return True
+
+    def cap_nhat(self, sach):
+        # Đánh chỉ mục lại sau khi tiêu đề/tác giả thay đổi, hoặc thay sách cùng mã
+        diem = self._diem_cua_sach(sach)
+        with self._khoa:
+            self._xoa(sach.ma_sach)
+            self._them(sach, diem)
+
+    def _diem_cua_sach(self, sach):
+        diem = {}
+        for tu in tach_tu(sach.tieu_de):
+            diem[tu] = diem.get(tu, 0) + TRONG_SO_TIEU_DE
+        for tu in tach_tu(sach.tac_gia):
+            diem[tu] = diem.get(tu, 0) + TRONG_SO_TAC_GIA
+        return diem
+
+    def _them(self, sach, diem):
+        ma_sach = sach.ma_sach
+        for tu, gia_tri in diem.items():
+            ds = self._chi_muc.get(tu)
+            if ds is None:
+                ds = self._chi_muc[tu] = {}
+                insort(self._ds_tu, tu)
+            ds[ma_sach] = gia_tri
+        self._sach[ma_sach] = sach
+        self._tu_cua_sach[ma_sach] = tuple(diem)
+        if sach.so_luong_ton > 0:
+            self._con_sach.add(ma_sach)
+
+    def xoa(self, sach):
+        with self._khoa:
+            if self._sach.get(sach.ma_sach) is sach:
+                self._xoa(sach.ma_sach)
+
+    def _xoa(self, ma_sach):
+        for tu in self._tu_cua_sach.pop(ma_sach, ()):
+            ds = self._chi_muc[tu]
+            del ds[ma_sach]
+            if not ds:
+                del self._chi_muc[tu]
+                del self._ds_tu[bisect_left(self._ds_tu, tu)]
+        self._sach.pop(ma_sach, None)
+        self._con_sach.discard(ma_sach)
+
+    def _doi_ton_kho(self, sach, so_luong_cu, so_luong_moi):
+        if (so_luong_cu > 0) == (so_luong_moi > 0):
+            return
+        with self._khoa:
+            if self._sach.get(sach.ma_sach) is not sach:
+                return
+            if so_luong_moi > 0:
+                self._con_sach.add(sach.ma_sach)
+            else:
+                self._con_sach.discard(sach.ma_sach)
+
+    def _diem_cua_tu(self, tu):
+        # Điểm tốt nhất của mỗi sách cho một từ trong truy vấn: nguyên từ hoặc tiền tố
+        diem = dict(self._chi_muc.get(tu, {}))
+        vi_tri = bisect_left(self._ds_tu, tu)
+        while vi_tri < len(self._ds_tu) and self._ds_tu[vi_tri].startswith(tu):
+            tu_khac = self._ds_tu[vi_tri]
+            vi_tri += 1
+            if tu_khac == tu:
+                continue
+            for ma_sach, gia_tri in self._chi_muc[tu_khac].items():
+                gia_tri *= HE_SO_TIEN_TO
+                if gia_tri > diem.get(ma_sach, 0):
+                    diem[ma_sach] = gia_tri
+        return diem
+
+    def tim(self, truy_van, chi_con_sach=False, gioi_han=20):
+        tu_truy_van = list(dict.fromkeys(tach_tu(truy_van)))
+        if not tu_truy_van:
+            return []
+        with self._khoa:
+            ket_qua = None
+            # Sách phải khớp mọi từ; bắt đầu từ tập nhỏ nhất để giao nhanh
+            for diem in sorted((self._diem_cua_tu(tu) for tu in tu_truy_van), key=len):
+                if ket_qua is None:
+                    ket_qua = {ma_sach: gia_tri for ma_sach, gia_tri in diem.items()
+                               if not chi_con_sach or ma_sach in self._con_sach}
+                else:
+                    ket_qua = {ma_sach: gia_tri + diem[ma_sach] for ma_sach, gia_tri in ket_qua.items()
+                               if ma_sach in diem}
+                if not ket_qua:
+                    return []
+            thu_tu = lambda x: (-x[1], self._sach[x[0]].tieu_de, x[0])
+            if gioi_han is None:
+                xep_hang = sorted(ket_qua.items(), key=thu_tu)
+            else:
+                xep_hang = heapq.nsmallest(gioi_han, ket_qua.items(), key=thu_tu)
+            return [self._sach[ma_sach] for ma_sach, _ in xep_hang]